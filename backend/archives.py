@@ -0,0 +1,114 @@
+"""
+Bulk ingestion of ZIP and tar archives of resumes.
+
+An uploaded archive is spooled to disk and unpacked member by member in a
+background thread: each PDF member is streamed into content-addressed
+storage and handed to the ingestion pool in small batches, so extraction
+starts while the archive is still being read. Unpacking pauses while too
+many members are waiting for extraction, and the ingestion writer commits
+rows in batches, so peak memory does not depend on the size of the archive.
+"""
+import os
+import tarfile
+import threading
+import time
+import zipfile
+
+import ingestion
+import uploads
+
+
+# Largest accepted archive (bytes)
+ARCHIVE_MAX_BYTES = int(os.getenv("ARCHIVE_MAX_BYTES", str(2 * 1024 * 1024 * 1024)))
+
+# PDF members handed to the ingestion pool at a time
+ARCHIVE_SUBMIT_BATCH = int(os.getenv("ARCHIVE_SUBMIT_BATCH", "64"))
+
+# Unpacking waits while this many members of the archive are still waiting for extraction
+ARCHIVE_MAX_PENDING = int(os.getenv("ARCHIVE_MAX_PENDING", "512"))
+
+
+def is_archive(path):
+    return zipfile.is_zipfile(path) or tarfile.is_tarfile(path)
+
+
+def iter_members(path):
+    """
+    Yield (name, size, file object) for every regular file in a ZIP or tar
+    (optionally gzip/bz2/xz-compressed) archive, reading each member as a stream
+    """
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            for info in archive.infolist():
+                if info.is_dir():
+                    continue
+                with archive.open(info) as member:
+                    yield info.filename, info.file_size, member
+    else:
+        # Stream mode ("r|*"): members are read in order without seeking back
+        with tarfile.open(path, mode="r|*") as archive:
+            for member in archive:
+                if member.isfile():
+                    yield member.name, member.size, archive.extractfile(member)
+
+
+def ingest_archive(job, archive_path):
+    """
+    Unpack an archive into an open-ended job; the archive file is removed afterwards
+    """
+    batch = []  # Members stored but not yet handed to the ingestion pool
+    created = []  # Paths of the batch's members that were new to storage
+    try:
+        for name, size, member in iter_members(archive_path):
+            if not name.lower().endswith(".pdf"):
+                job.add_files([name], status="skipped", error="Not a PDF")
+                continue
+            if size > uploads.MAX_UPLOAD_FILE_BYTES:
+                job.add_files([name], status="skipped", error=f"Larger than {uploads.MAX_UPLOAD_FILE_BYTES} bytes")
+                continue
+            try:
+                info = uploads.store_stream(member, name)
+            except Exception as e:  # A corrupt or encrypted member only fails itself
+                job.add_files([name], status="failed", error=str(e) or e.__class__.__name__)
+                continue
+            batch.append((name, info["path"], info["content_hash"]))
+            if info["created"]:
+                created.append(info["path"])
+
+            if len(batch) >= ARCHIVE_SUBMIT_BATCH:
+                submitting, batch, created = batch, [], []
+                ingestion.submit_job(submitting, job=job)  # Duplicates are linked to stored resumes, not re-parsed
+                # Backpressure: let extraction catch up before unpacking more
+                while job.pending > ARCHIVE_MAX_PENDING:
+                    time.sleep(0.1)
+        if batch:
+            submitting, batch, created = batch, [], []
+            ingestion.submit_job(submitting, job=job)
+    except Exception as e:
+        job.error = f"Archive could not be read: {e}"
+        # Members stored before a read error (a truncated or corrupt archive) are still ingested;
+        # if even that fails, the files they added to storage are removed rather than left unreferenced
+        if batch:
+            try:
+                ingestion.submit_job(batch, job=job)
+            except Exception as submit_error:
+                print(f"Could not queue the members read before the error: {submit_error}")
+                for file_path in created:
+                    if os.path.exists(file_path):
+                        os.remove(file_path)
+    finally:
+        job.close()
+        ingestion.save_job(job, force=True)
+        if os.path.exists(archive_path):
+            os.remove(archive_path)
+
+
+def start_archive_job(archive_path, trace=False):
+    """
+    Create an open-ended job and unpack the archive into it in a background thread
+    """
+    job = ingestion.start_job(open_ended=True, trace=trace)
+    threading.Thread(
+        target=ingest_archive, args=(job, archive_path), name=f"archive-{job.id[:8]}", daemon=True
+    ).start()
+    return job
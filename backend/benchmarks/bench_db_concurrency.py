@@ -0,0 +1,187 @@
+"""
+Mix ingestion-style writes with /rank/-style reads on the same SQLite database
+and compare journal modes.
+
+A writer thread commits batches of synthetic resumes the way the ingestion
+writer does (insert, index skills, bump the dataset version), while reader
+threads run uncached rankings (load candidates, score, describe the top 10).
+Each journal mode runs in a fresh process on a fresh database.
+
+Usage (from the backend directory):
+    python benchmarks/bench_db_concurrency.py [--modes WAL DELETE] [--seed-resumes 5000]
+        [--readers 4] [--duration 10] [--json results.json]
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_scoring import make_candidates  # noqa: E402
+
+
+CRITERIA = [
+    SimpleNamespace(qualification="MBA", skills="Python, SQL, Leadership", experience=3, min_skill_overlap=None),
+    SimpleNamespace(qualification="B.Tech", skills="java,docker,kubernetes", experience=5, min_skill_overlap=None),
+    SimpleNamespace(qualification="Bachelor", skills="Machine Learning,TensorFlow", experience=2, min_skill_overlap=None),
+]
+
+
+def extracted_resumes(count, rng):
+    # Dictionaries shaped like extract_entities output
+    return [
+        {"name": f"Candidate {rng.randrange(10 ** 9)}", "phone": f"{rng.randrange(10 ** 10):010d}",
+         "email": f"c{rng.randrange(10 ** 9)}@example.com", "qualification": c.qualification,
+         "skills": c.skills, "experience": c.experience}
+        for c in make_candidates(count, rng)
+    ]
+
+
+def write_batch(resumes):
+    # Same statements as ingestion._write_results, for one batch
+    from database import SessionLocal, bump_dataset_version
+    from ingestion import resume_from_extracted
+    from skill_index import index_resume_skills
+
+    db = SessionLocal()
+    try:
+        rows = [resume_from_extracted(extracted, "bench.pdf") for extracted in resumes]
+        db.add_all(rows)
+        db.flush()
+        index_resume_skills(db, rows)
+        bump_dataset_version(db)
+        db.commit()
+    finally:
+        db.close()
+
+
+def rank_once(criteria):
+    # Same work as an uncached /rank/ call
+    import numpy as np
+    from database import SessionLocal
+    import ranking
+    from scoring import score_candidates
+
+    db = SessionLocal()
+    try:
+        candidates = ranking.load_candidates(db, criteria)
+        ids = np.fromiter((c.id for c in candidates), dtype=np.int64, count=len(candidates))
+        result = ranking.Ranking(ids, np.array(score_candidates(candidates, criteria), dtype=np.float64))
+        ranking.describe(db, result, result.window(10))
+    finally:
+        db.close()
+
+
+def percentile(values, q):
+    if not values:
+        return None
+    values = sorted(values)
+    return round(values[min(len(values) - 1, int(q * len(values)))] * 1000, 2)
+
+
+def run_child(args):
+    rng = random.Random(args.seed)
+    for start in range(0, args.seed_resumes, 500):
+        write_batch(extracted_resumes(min(500, args.seed_resumes - start), rng))
+
+    deadline = time.perf_counter() + args.duration
+    write_times, read_times, errors = [], [], []
+    written = [0]
+
+    def writer():
+        writer_rng = random.Random(args.seed + 1)
+        while time.perf_counter() < deadline:
+            batch = extracted_resumes(args.write_batch, writer_rng)
+            start = time.perf_counter()
+            try:
+                write_batch(batch)
+                written[0] += len(batch)
+                write_times.append(time.perf_counter() - start)
+            except Exception as e:
+                errors.append(f"write: {e}")
+            time.sleep(args.write_interval)
+
+    def reader(number):
+        reader_rng = random.Random(args.seed + 100 + number)
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                rank_once(reader_rng.choice(CRITERIA))
+                read_times.append(time.perf_counter() - start)
+            except Exception as e:
+                errors.append(f"rank: {e}")
+
+    threads = [threading.Thread(target=writer)] + [threading.Thread(target=reader, args=(n,)) for n in range(args.readers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    print(json.dumps({
+        "journal_mode": os.environ["SQLITE_JOURNAL_MODE"],
+        "resumes_written": written[0],
+        "write_batches": len(write_times),
+        "write_ms_p50": percentile(write_times, 0.5),
+        "write_ms_p95": percentile(write_times, 0.95),
+        "rank_calls": len(read_times),
+        "rank_calls_per_second": round(len(read_times) / args.duration, 2),
+        "rank_ms_p50": percentile(read_times, 0.5),
+        "rank_ms_p95": percentile(read_times, 0.95),
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modes", nargs="+", default=["WAL", "DELETE"], help="SQLite journal modes to compare")
+    parser.add_argument("--seed-resumes", type=int, default=5000, help="Resumes stored before the mixed load starts")
+    parser.add_argument("--readers", type=int, default=4, help="Threads issuing rank calls")
+    parser.add_argument("--write-batch", type=int, default=50, help="Resumes per write commit")
+    parser.add_argument("--write-interval", type=float, default=0.05, help="Pause between write commits (s)")
+    parser.add_argument("--duration", type=float, default=10, help="Seconds of mixed load per mode")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", help="Also write the results to this JSON file")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args)
+        return
+
+    results = []
+    for mode in args.modes:
+        with tempfile.TemporaryDirectory() as workdir:
+            env = dict(os.environ, SQLITE_JOURNAL_MODE=mode,
+                       DATABASE_URL=f"sqlite:///{os.path.join(workdir, 'bench.db')}")
+            child = ["--child", "--seed-resumes", str(args.seed_resumes), "--readers", str(args.readers),
+                     "--write-batch", str(args.write_batch), "--write-interval", str(args.write_interval),
+                     "--duration", str(args.duration), "--seed", str(args.seed)]
+            output = subprocess.run([sys.executable, os.path.abspath(__file__)] + child,
+                                    env=env, check=True, capture_output=True, text=True).stdout
+            results.append(json.loads(output.strip().splitlines()[-1]))
+
+    header = f"{'mode':<8}{'written':>9}{'write p50':>11}{'write p95':>11}{'ranks/s':>9}{'rank p50':>10}{'rank p95':>10}{'errors':>8}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(f"{r['journal_mode']:<8}{r['resumes_written']:>9}{r['write_ms_p50'] or 0:>11}{r['write_ms_p95'] or 0:>11}"
+              f"{r['rank_calls_per_second']:>9}{r['rank_ms_p50'] or 0:>10}{r['rank_ms_p95'] or 0:>10}{r['errors']:>8}")
+    if any(r["first_error"] for r in results):
+        print("\nFirst errors: " + "; ".join(f"{r['journal_mode']}: {r['first_error']}" for r in results if r["first_error"]))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"seed_resumes": args.seed_resumes, "readers": args.readers,
+                       "duration": args.duration, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Time duplicate grouping (duplicates.py) as a synthetic corpus grows in a
+temporary database, and check it against planted duplicates: re-uploads of a
+resume with a few lines changed and a new email and phone (found by text
+only), and different resumes sent with the same email (found by contact only).
+
+Reports the grouping cost per upload as the corpus grows, which should stay
+flat since each upload only looks at its LSH buckets and indexed contacts,
+and how many planted duplicates were grouped (recall) and how many resumes
+were grouped with someone else's (false merges).
+
+Usage (from the backend directory):
+    python benchmarks/bench_duplicates.py [--resumes 20000] [--json results.json]
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Imported first: bench_search points DATABASE_URL at its temporary directory before
+# anything imports database
+from bench_search import WORKDIR  # noqa: E402
+from database import SessionLocal, Resume  # noqa: E402
+from generate_corpus import _sections, load_vocabulary, make_profile  # noqa: E402
+import duplicates  # noqa: E402
+import minhash  # noqa: E402
+
+
+# Resumes grouped per timed batch, as one upload job would
+UPLOAD_BATCH = 50
+
+# Share of uploads that re-send an earlier resume with edits, and that reuse an earlier email
+TEXT_DUPLICATE_RATE = 0.05
+CONTACT_DUPLICATE_RATE = 0.02
+
+
+def render(profile):
+    return "\n".join([profile["name"], f"{profile['email']} | {profile['phone']} | {profile['city']}", "",
+                      "SKILLS", ", ".join(profile["skills"]), ""] + _sections(profile))
+
+
+def edited(profile, rng, vocabulary):
+    # The same resume a while later: new contact details, a skill or two more, one duty reworded
+    copy = dict(profile, positions=[dict(p, duties=list(p["duties"])) for p in profile["positions"]])
+    copy["email"] = profile["email"].replace("@", ".work@")
+    copy["phone"] = "".join(str(rng.randint(0, 9)) for _ in range(10))
+    copy["skills"] = profile["skills"] + rng.sample(vocabulary["skills"], 2)
+    copy["positions"][0]["duties"][0] = "Took over " + copy["positions"][0]["duties"][0].lower()
+    return copy
+
+
+def make_uploads(count, rng, vocabulary):
+    # [(person, profile)] in upload order; person identifies the candidate behind each resume
+    uploads = []
+    for i in range(count):
+        if uploads and rng.random() < TEXT_DUPLICATE_RATE:
+            person, profile = rng.choice(uploads)
+            uploads.append((person, edited(profile, rng, vocabulary)))
+            continue
+        profile = make_profile(rng, vocabulary)
+        profile["email"] = profile["email"].replace("@", f"{i}@")  # Namesakes are different people
+        person = i
+        if uploads and rng.random() < CONTACT_DUPLICATE_RATE:
+            person, earlier = rng.choice(uploads)
+            profile["email"] = earlier["email"].upper()
+        uploads.append((person, profile))
+    return uploads
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resumes", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    vocabulary = load_vocabulary()
+    uploads = make_uploads(args.resumes, rng, vocabulary)
+    texts = [render(profile) for _, profile in uploads]
+
+    start = time.perf_counter()
+    signatures = [minhash.signature(text) for text in texts]
+    signature_us = (time.perf_counter() - start) / len(texts) * 1e6
+    print(f"{args.resumes} resumes; MinHash signature: {signature_us:.0f} us/resume (in the extraction workers)\n")
+
+    db = SessionLocal()
+    person_of = {}
+    batches = []
+    print(f"{'stored':>8}{'ms/upload':>11}")
+    for offset in range(0, len(uploads), UPLOAD_BATCH):
+        batch = uploads[offset:offset + UPLOAD_BATCH]
+        resumes = [Resume(name=profile["name"], email=profile["email"], phone=profile["phone"],
+                          qualification="", skills="", experience=0) for _, profile in batch]
+        db.add_all(resumes)
+        db.flush()
+        start = time.perf_counter()
+        duplicates.group_resumes(db, [
+            (resume.id, resume.email, resume.phone, signatures[offset + i]) for i, resume in enumerate(resumes)
+        ])
+        db.commit()
+        batches.append((offset, (time.perf_counter() - start) / len(batch) * 1000))
+        person_of.update((resume.id, person) for resume, (person, _) in zip(resumes, batch))
+        if len(batches) % max(1, len(uploads) // UPLOAD_BATCH // 10) == 0:
+            print(f"{offset + len(batch):>8}{batches[-1][1]:>11.2f}")
+
+    # Ground truth: resumes of the same person should share a group, and no one else's
+    group_of = dict(db.query(Resume.id, Resume.duplicate_group))
+    groups = {}
+    for resume_id, group in group_of.items():
+        groups.setdefault(group, []).append(resume_id)
+    first_of = {}
+    planted = found = false_merges = 0
+    for resume_id in sorted(person_of):
+        person = person_of[resume_id]
+        if person in first_of:
+            planted += 1
+            found += group_of[resume_id] == group_of[first_of[person]]
+        else:
+            first_of[person] = resume_id
+    for members in groups.values():
+        people = {person_of[m] for m in members}
+        if len(people) > 1:
+            false_merges += len(members) - max(sum(person_of[m] == p for m in members) for p in people)
+    db.close()
+    shutil.rmtree(WORKDIR, ignore_errors=True)
+
+    tenth = max(1, len(batches) // 10)
+    early = statistics.median(ms for _, ms in batches[:tenth])
+    late = statistics.median(ms for _, ms in batches[-tenth:])
+    results = {
+        "resumes": args.resumes,
+        "signature_us_per_resume": round(signature_us, 1),
+        "group_ms_per_upload_first_tenth": round(early, 3),
+        "group_ms_per_upload_last_tenth": round(late, 3),
+        "planted_duplicates": planted,
+        "found": found,
+        "recall": round(found / planted, 4) if planted else None,
+        "false_merges": false_merges,
+    }
+    print(f"\nGrouping: {early:.2f} ms/upload in the first tenth, {late:.2f} ms/upload in the last")
+    print(f"Planted duplicates found: {found}/{planted}; resumes grouped with someone else: {false_merges}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
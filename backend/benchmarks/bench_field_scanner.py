@@ -0,0 +1,165 @@
+"""
+Compare the single-pass field scanner (extraction.scan_fields) with the
+per-field functions it replaced, one regex scan per field, on synthetic
+resume texts laid out like generate_corpus.py's. Reports the time per resume
+of each and how close each one's experience is to the ground truth (the
+per-field functions added up overlapping and restated experience).
+
+Before timing, it checks the qualifications found in QUALIFICATION_CASES
+(short abbreviations such as "be", "me" and "CA" are only degrees in a degree
+context) and exits with status 1 if any comes out different.
+
+Usage (from the backend directory):
+    python benchmarks/bench_field_scanner.py [--resumes 2000] [--repeat 5] [--json results.json]
+"""
+import argparse
+import datetime
+import json
+import os
+import random
+import re
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from extraction import FIELD_EXTRACTORS, JOB_TITLE_PATTERN, QUALIFICATION_PATTERN, scan_fields  # noqa: E402
+from generate_corpus import _sections, load_vocabulary, make_profile  # noqa: E402
+from qualifications import highest_level  # noqa: E402
+
+
+# The per-field extraction as it was before the scanner, kept here as the baseline
+PHONE_PATTERN = re.compile(r'\b\d{10}\b')
+EMAIL_PATTERN = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
+
+
+# (text, qualifications scan_fields must find, level of the stored qualification string)
+QUALIFICATION_CASES = [
+    ("…love to be part of a team. Contact me at x. Worked in CA…", [], 0),
+    ("789 Westwood Blvd | Los Angeles, CA 90210 | 3105550198\nEXPERIENCE\nGreenTech Solutions | Los Angeles, CA\n"
+     "EDUCATION\nMaster’s in Human Resource Management\nUniversity of California, Berkeley | Berkeley, CA\n",
+     ["Master"], 7),
+    ("Skills: MS Office, MD5 hashing, CS:GO. Be quick, ma. RN fan.", [], 0),
+    ("Qualification\nUniversity of Texas, MS Business Analytics\n\nSkills\nMS Excel", ["MS"], 7),
+    ("MS in Computer Science, 2018", ["MS"], 7),
+    ("BE (Mechanical), 2016", ["BE"], 5),
+    ("M.A. English, 2012", ["M.A"], 7),
+    ("Degree: MD", ["MD"], 8),
+    ("B.Tech, MS", ["B.Tech", "MS"], 7),
+    ("Certifications\nRN, BLS", ["RN"], 3),
+]
+
+
+def check_qualifications():
+    """
+    The QUALIFICATION_CASES that come out different, as (text, found, level)
+    """
+    failures = []
+    for text, expected, expected_level in QUALIFICATION_CASES:
+        found = scan_fields(text)["qualifications"]
+        level = highest_level(FIELD_EXTRACTORS["qualification"](text)["qualification"])
+        if found != expected or level != expected_level:
+            failures.append((text, found, level))
+    return failures
+
+
+def _first_match(pattern, text):
+    match = pattern.search(text)
+    return match.group() if match else "Not Found"
+
+
+def reference_experience(text):
+    exp_years = 0
+    exp_match = re.search(r'(\d+)\s*(?:years?|yrs?)\s*(?:of\s+)?experience', text, re.IGNORECASE)
+    if exp_match:
+        exp_years += int(exp_match.group(1))
+    date_ranges = re.findall(
+        r'(?:(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Sept|Oct|Nov|Dec)\s+)?(\d{4})\s*[-–to]+\s*(?:(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Sept|Oct|Nov|Dec)\s+)?(\d{4}|Present|Current)',
+        text,
+        re.IGNORECASE
+    )
+    current_year = datetime.datetime.now().year
+    for start_year, end_year in date_ranges:
+        start_year = int(start_year)
+        end_year = current_year if end_year.lower() in ["present", "current"] else int(end_year)
+        if end_year >= start_year:
+            exp_years += end_year - start_year
+    return exp_years
+
+
+def reference_fields(text):
+    return {
+        "phone": _first_match(PHONE_PATTERN, text),
+        "email": _first_match(EMAIL_PATTERN, text),
+        "experience": reference_experience(text),
+        "qualifications": list(set(QUALIFICATION_PATTERN.findall(text))),
+        "job_titles": list(set(JOB_TITLE_PATTERN.findall(text))),
+    }
+
+
+def make_resume(rng, vocabulary):
+    # (text, ground truth) of one resume, with overlapping jobs now and then
+    profile = make_profile(rng, vocabulary)
+    if rng.random() < 0.3:
+        job = profile["positions"][-1]
+        profile["positions"].append(dict(job, title=rng.choice(vocabulary["job_titles"]), company="Freelance"))
+    lines = [profile["name"], f"{profile['email']} | {profile['phone']} | {profile['city']}", "",
+             "SKILLS", ", ".join(profile["skills"]), ""] + _sections(profile)
+    return "\n".join(lines), profile
+
+
+def timed_per_resume(function, texts, repeat):
+    # Median over the runs of the time per resume, in microseconds
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in texts:
+            function(text)
+        timings.append((time.perf_counter() - start) / len(texts))
+    return statistics.median(timings) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resumes", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5, help="Runs over all the resumes")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    failures = check_qualifications()
+    for text, found, level in failures:
+        print(f"Qualification check failed: {text!r} -> {found} (level {level})")
+    if failures:
+        sys.exit(1)
+
+    rng = random.Random(args.seed)
+    vocabulary = load_vocabulary()
+    resumes = [make_resume(rng, vocabulary) for _ in range(args.resumes)]
+    texts = [text for text, _ in resumes]
+    print(f"{args.resumes} resumes, {statistics.mean(len(text) for text in texts):.0f} characters on average\n")
+
+    results = {"resumes": args.resumes, "repeat": args.repeat}
+    print(f"{'':<22}{'us/resume':>10}{'exact exp.':>12}{'contacts ok':>13}")
+    for label, function in (("per-field functions", reference_fields), ("field scanner", scan_fields)):
+        us = timed_per_resume(function, texts, args.repeat)
+        outputs = [function(text) for text in texts]
+        exact = sum(out["experience"] == profile["experience"] for out, (_, profile) in zip(outputs, resumes))
+        contacts = sum(out["phone"] == profile["phone"] and out["email"] == profile["email"]
+                       for out, (_, profile) in zip(outputs, resumes))
+        results[label.replace(" ", "_").replace("-", "_")] = {
+            "us_per_resume": round(us, 1), "exact_experience": exact, "contacts_found": contacts,
+        }
+        print(f"{label:<22}{us:>10.0f}{exact:>12}{contacts:>13}")
+    speedup = results["per_field_functions"]["us_per_resume"] / results["field_scanner"]["us_per_resume"]
+    results["speedup"] = round(speedup, 2)
+    print(f"\nSpeedup: {speedup:.1f}x")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
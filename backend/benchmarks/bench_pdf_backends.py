@@ -0,0 +1,102 @@
+"""
+Compare the PDF text-extraction backends on a corpus of resumes.
+
+For every backend this reports throughput (files and pages per second), how
+many files produced usable text, and the mean text quality score. The
+configured fallback chain is measured as well.
+
+Usage (from the backend directory):
+    python benchmarks/bench_pdf_backends.py [--corpus uploaded_resumes] [--repeat 3] [--json results.json]
+"""
+import argparse
+import glob
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pdf_text  # noqa: E402
+
+
+def count_pages(pdf_path):
+    import fitz
+    with fitz.open(pdf_path) as pdf:
+        return len(pdf)
+
+
+def bench_backend(name, extract, files, repeat):
+    timings = []
+    qualities = []
+    usable = 0
+    failures = 0
+    for pdf_path in files:
+        best = None
+        text = ""
+        for _ in range(repeat):
+            start = time.perf_counter()
+            try:
+                text = extract(pdf_path)
+            except Exception:
+                failures += 1
+                text = ""
+                break
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        timings.append(best or 0.0)
+        qualities.append(pdf_text.text_quality(text))
+        usable += pdf_text.is_usable(text)
+
+    total_time = sum(timings)
+    return {
+        "backend": name,
+        "files": len(files),
+        "seconds": round(total_time, 4),
+        "files_per_second": round(len(files) / total_time, 2) if total_time else None,
+        "median_ms_per_file": round(statistics.median(timings) * 1000, 2) if timings else None,
+        "usable": usable,
+        "failures": failures,
+        "mean_quality": round(statistics.mean(qualities), 4) if qualities else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default="uploaded_resumes", help="Directory of PDF files")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per file; the fastest run is kept")
+    parser.add_argument("--json", help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    files = sorted(glob.glob(os.path.join(args.corpus, "**", "*.pdf"), recursive=True))
+    if not files:
+        sys.exit(f"No PDF files found in {args.corpus}")
+    pages = sum(count_pages(pdf_path) for pdf_path in files)
+
+    candidates = dict(pdf_text.BACKENDS)
+    candidates["chain(" + ",".join(pdf_text.PDF_BACKENDS) + ")"] = pdf_text.extract_text_from_pdf
+
+    results = []
+    for name, extract in candidates.items():
+        result = bench_backend(name, extract, files, args.repeat)
+        result["pages_per_second"] = round(pages / result["seconds"], 2) if result["seconds"] else None
+        results.append(result)
+
+    print(f"{len(files)} files, {pages} pages, best of {args.repeat} runs\n")
+    header = f"{'backend':<36}{'files/s':>10}{'pages/s':>10}{'ms/file':>10}{'usable':>8}{'failed':>8}{'quality':>9}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(
+            f"{r['backend']:<36}{r['files_per_second'] or 0:>10}{r['pages_per_second'] or 0:>10}"
+            f"{r['median_ms_per_file'] or 0:>10}{r['usable']:>8}{r['failures']:>8}{r['mean_quality'] or 0:>9}"
+        )
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"files": len(files), "pages": pages, "repeat": args.repeat, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Time a /reextract/ job over a synthetic corpus of stored resume texts in a
+temporary database, as after a skill dictionary change: every resume's skills
+are stale and re-extracted from its stored text, in the ingestion worker pool.
+
+Usage (from the backend directory):
+    python benchmarks/bench_reextract.py [--resumes 100000] [--fields skills] [--json results.json]
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Imported first: bench_search points DATABASE_URL at its temporary directory before
+# anything imports database, and the resumes are written there as well
+from bench_search import WORKDIR, make_text  # noqa: E402
+from bench_scoring import make_candidates  # noqa: E402
+from database import SessionLocal, Resume  # noqa: E402
+from extraction import FIELD_EXTRACTORS, field_versions  # noqa: E402
+import ingestion  # noqa: E402
+import reextraction  # noqa: E402
+import search  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resumes", type=int, default=100_000)
+    parser.add_argument("--fields", default="skills", help="Comma-separated fields made stale (default: skills)")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", help="Also write the results to this JSON file")
+    args = parser.parse_args()
+    fields = [name.strip() for name in args.fields.split(",") if name.strip()]
+    unknown = set(fields) - set(FIELD_EXTRACTORS)
+    if unknown:
+        sys.exit(f"Unknown fields: {', '.join(sorted(unknown))}")
+
+    # Stored versions as an older dictionary would have left them
+    stale = json.dumps(dict(field_versions(), **{field: "old" for field in fields}), sort_keys=True)
+    rng = random.Random(args.seed)
+    db = SessionLocal()
+    start = time.perf_counter()
+    for offset in range(0, args.resumes, 5000):
+        candidates = make_candidates(min(5000, args.resumes - offset), rng)
+        resumes = [Resume(name="Candidate", qualification=c.qualification, skills=c.skills, experience=c.experience,
+                          extractor_versions=stale)
+                   for c in candidates]
+        db.add_all(resumes)
+        db.flush()
+        search.index_texts(db, {r.id: make_text(c, rng) for r, c in zip(resumes, candidates)})
+        db.commit()
+    db.close()
+    print(f"Stored {args.resumes} resumes in {time.perf_counter() - start:.1f}s")
+
+    job = reextraction.ReextractionJob(fields)
+    start = time.perf_counter()
+    reextraction.run_job(job)
+    elapsed = time.perf_counter() - start
+    ingestion.shutdown()
+    result = job.to_dict()
+    print(f"Re-extracted {', '.join(fields)} of {result['processed']} resumes with {ingestion.INGEST_WORKERS} workers "
+          f"in {elapsed:.1f}s ({result['processed'] / elapsed:.0f} resumes/s): "
+          f"{result['changed']} changed, {result['unchanged']} unchanged, {result['failed']} failed")
+    shutil.rmtree(WORKDIR, ignore_errors=True)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"resumes": args.resumes, "fields": fields, "workers": ingestion.INGEST_WORKERS,
+                       "seconds": round(elapsed, 2), "job": result}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Check that the vectorized score_candidates matches calculate_score exactly,
+and compare their speed on synthetic candidate sets.
+
+Usage (from the backend directory):
+    python benchmarks/bench_scoring.py [--sizes 10000 100000] [--seed 7]
+
+Exits with status 1 if any score differs from the reference implementation.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scoring import calculate_score, score_candidates  # noqa: E402
+from skill_matcher import SKILL_DICTIONARY_PATH, load_dictionary  # noqa: E402
+
+
+QUALIFICATIONS = [
+    "B.Tech", "M.Tech", "MBA", "BCA", "MCA", "B.Sc", "M.Sc", "PhD", "Diploma",
+    "Bachelor of Engineering", "Master", "CA", "B.Com", "Not Found",
+]
+JOB_TITLES = ["Software Engineer", "Data Scientist", "Project Manager", "Business Analyst", "Supervisor"]
+
+
+def make_candidates(count, rng):
+    vocabulary = list(load_dictionary(SKILL_DICTIONARY_PATH)) + JOB_TITLES
+    candidates = []
+    for _ in range(count):
+        qualification = ", ".join(rng.sample(QUALIFICATIONS, rng.randint(1, 3)))
+        skills = ",".join(rng.sample(vocabulary, rng.randint(0, 15)))
+        candidates.append(SimpleNamespace(qualification=qualification, skills=skills, experience=rng.randint(0, 15)))
+    return candidates
+
+
+CRITERIA = [
+    SimpleNamespace(qualification="MBA", skills="Python, SQL, Leadership", experience=3),
+    SimpleNamespace(qualification="B.Tech", skills="java,react native,  docker,kubernets", experience=8),
+    SimpleNamespace(qualification="Bachelor", skills="", experience=0),
+    SimpleNamespace(qualification="PhD", skills="Machine Learning Engineer,TensorFlow,PyTorch,python,python", experience=12),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    mismatches = 0
+    print(f"{'candidates':>10}  {'criteria':<60}{'scalar s':>10}{'batch s':>10}{'speedup':>9}")
+    for size in args.sizes:
+        candidates = make_candidates(size, rng)
+        for criteria in CRITERIA:
+            start = time.perf_counter()
+            expected = [calculate_score(c, criteria) for c in candidates]
+            scalar = time.perf_counter() - start
+
+            start = time.perf_counter()
+            actual = score_candidates(candidates, criteria)
+            batch = time.perf_counter() - start
+
+            differing = sum(1 for a, b in zip(expected, actual) if a != b)
+            mismatches += differing
+            label = f"{criteria.qualification} / {criteria.skills} / {criteria.experience}y"
+            print(f"{size:>10}  {label[:58]:<60}{scalar:>10.3f}{batch:>10.3f}{scalar / batch:>8.1f}x"
+                  + (f"  {differing} MISMATCHES" if differing else ""))
+
+    if mismatches:
+        sys.exit(f"{mismatches} scores differ from calculate_score")
+    print("\nAll scores identical to calculate_score")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Time full-text searches (and the /rank/ search pre-filter) over a synthetic
+corpus of resume texts indexed in a temporary database.
+
+Usage (from the backend directory):
+    python benchmarks/bench_search.py [--resumes 100000] [--repeat 20] [--json results.json]
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Index into a temporary database; set before anything imports database
+WORKDIR = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(WORKDIR, 'bench.db')}"
+
+from bench_scoring import make_candidates  # noqa: E402
+from database import SessionLocal, Resume  # noqa: E402
+import search  # noqa: E402
+
+
+QUERIES = ["python", '"machine learning"', "kubernetes docker", "manag*", '"project manager" agile', "haskell"]
+
+FILLER = (
+    "experienced team player responsible for delivering projects on time with strong communication "
+    "skills worked closely with stakeholders to improve processes and led cross functional initiatives "
+    "education university college bachelor master certified award volunteer references available"
+).split()
+
+
+def make_text(candidate, rng):
+    words = rng.choices(FILLER, k=rng.randint(150, 400))
+    for skill in candidate.skills.split(","):
+        if skill:
+            words.insert(rng.randrange(len(words) + 1), skill)
+    return f"Candidate Name\n{candidate.qualification}\n{candidate.experience} years\n" + " ".join(words)
+
+
+def timed(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - start)
+    return result, timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resumes", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=20, help="Runs per query")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    start = time.perf_counter()
+    db = SessionLocal()
+    for offset in range(0, args.resumes, 5000):
+        candidates = make_candidates(min(5000, args.resumes - offset), rng)
+        resumes = [Resume(name="Candidate", qualification=c.qualification, skills=c.skills, experience=c.experience)
+                   for c in candidates]
+        db.add_all(resumes)
+        db.flush()
+        search.index_texts(db, {r.id: make_text(c, rng) for r, c in zip(resumes, candidates)})
+        db.commit()
+    print(f"Indexed {args.resumes} resumes in {time.perf_counter() - start:.1f}s\n")
+
+    results = []
+    print(f"{'query':<28}{'matches':>9}{'search p50 ms':>15}{'search p95 ms':>15}{'filter p50 ms':>15}")
+    for query in QUERIES:
+        (total, _), search_times = timed(lambda: search.search(db, query, limit=20), args.repeat)
+        _, filter_times = timed(lambda: search.matching_ids(db, query), args.repeat)
+        result = {
+            "query": query,
+            "matches": total,
+            "search_ms_p50": round(statistics.median(search_times) * 1000, 2),
+            "search_ms_p95": round(sorted(search_times)[int(0.95 * (len(search_times) - 1))] * 1000, 2),
+            "filter_ms_p50": round(statistics.median(filter_times) * 1000, 2),
+        }
+        results.append(result)
+        print(f"{query:<28}{total:>9}{result['search_ms_p50']:>15}{result['search_ms_p95']:>15}{result['filter_ms_p50']:>15}")
+    db.close()
+    shutil.rmtree(WORKDIR, ignore_errors=True)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"resumes": args.resumes, "repeat": args.repeat, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Time job description matching (semantic.py) over a synthetic corpus of resume
+texts vectorized in a temporary database: loading the term matrix, scoring a
+description against every resume, and catching up with a batch of new uploads.
+
+Usage (from the backend directory):
+    python benchmarks/bench_semantic.py [--resumes 100000] [--repeat 20] [--json results.json]
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Imported first: bench_search points DATABASE_URL at its temporary directory before
+# anything imports database, and the vectors are written there as well
+from bench_search import WORKDIR, make_text, timed  # noqa: E402
+from bench_scoring import make_candidates  # noqa: E402
+from database import SessionLocal, Resume, bump_dataset_version  # noqa: E402
+import semantic  # noqa: E402
+
+
+DESCRIPTIONS = [
+    "Data scientist with Python, machine learning and SQL experience",
+    "Senior Java developer to build Spring microservices on Kubernetes and Docker",
+    "Project manager running agile teams, experienced with stakeholders and delivery",
+    "Haskell compiler engineer",
+]
+
+# Resumes added between the two timed syncs, as one upload batch would
+UPLOAD_BATCH = 50
+
+
+def add_resumes(db, count, rng):
+    for offset in range(0, count, 5000):
+        candidates = make_candidates(min(5000, count - offset), rng)
+        resumes = [Resume(name="Candidate", qualification=c.qualification, skills=c.skills, experience=c.experience)
+                   for c in candidates]
+        db.add_all(resumes)
+        db.flush()
+        semantic.index_texts(db, {r.id: make_text(c, rng) for r, c in zip(resumes, candidates)})
+        bump_dataset_version(db)
+        db.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resumes", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=20, help="Runs per description")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    db = SessionLocal()
+    start = time.perf_counter()
+    add_resumes(db, args.resumes, rng)
+    print(f"Vectorized {args.resumes} resumes in {time.perf_counter() - start:.1f}s")
+
+    index = semantic.SemanticIndex()
+    _, load_times = timed(lambda: index.sync(db), 1)
+    matrix_mb = sum(m.data.nbytes + m.indices.nbytes + m.indptr.nbytes for _, m in index.blocks) / 2 ** 20
+    print(f"Loaded the term matrix in {load_times[0] * 1000:.0f} ms ({matrix_mb:.0f} MiB)")
+
+    add_resumes(db, UPLOAD_BATCH, rng)
+    _, append_times = timed(lambda: index.sync(db), 1)
+    print(f"Caught up with {UPLOAD_BATCH} new resumes in {append_times[0] * 1000:.1f} ms\n")
+
+    results = []
+    print(f"{'description':<70}{'related':>9}{'p50 ms':>9}{'p95 ms':>9}")
+    for description in DESCRIPTIONS:
+        (_, similarities), query_times = timed(lambda: index.similarities(db, description), args.repeat)
+        result = {
+            "description": description,
+            "related": int((similarities > 0).sum()),
+            "ms_p50": round(statistics.median(query_times) * 1000, 2),
+            "ms_p95": round(sorted(query_times)[int(0.95 * (len(query_times) - 1))] * 1000, 2),
+        }
+        results.append(result)
+        print(f"{description[:68]:<70}{result['related']:>9}{result['ms_p50']:>9}{result['ms_p95']:>9}")
+    db.close()
+    shutil.rmtree(WORKDIR, ignore_errors=True)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({
+                "resumes": args.resumes, "repeat": args.repeat,
+                "load_ms": round(load_times[0] * 1000, 1), "append_ms": round(append_times[0] * 1000, 1),
+                "matrix_mb": round(matrix_mb, 1), "results": results,
+            }, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
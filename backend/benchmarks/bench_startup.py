@@ -0,0 +1,119 @@
+"""
+Measure how long a fresh server process takes to answer requests.
+
+Each run starts uvicorn in a new process and reports:
+  - import: time to import main (the app module) in a fresh interpreter
+  - first response: time from launch until the server answers any request
+  - ready: time from launch until /ready/ returns 200 (NLP model loaded)
+
+Usage (from the backend directory):
+    python benchmarks/bench_startup.py [--repeat 5] [--no-warmup] [--json results.json]
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def get_status(url):
+    # HTTP status of a GET request, or None while nothing is listening yet
+    try:
+        with urllib.request.urlopen(url, timeout=1) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+    except (urllib.error.URLError, ConnectionError, socket.timeout):
+        return None
+
+
+def measure_import(env):
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "import main"], cwd=BACKEND_DIR, env=env, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def measure_server(env, timeout):
+    port = free_port()
+    url = f"http://127.0.0.1:{port}/ready/"
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    first_response = ready = None
+    try:
+        while time.perf_counter() - start < timeout:
+            status = get_status(url)
+            now = time.perf_counter() - start
+            if status is not None and first_response is None:
+                first_response = now
+            if status == 200:
+                ready = now
+                break
+            time.sleep(0.01)
+    finally:
+        server.terminate()
+        server.wait()
+    return first_response, ready
+
+
+def summarize(values):
+    values = [v for v in values if v is not None]
+    if not values:
+        return None
+    return {"median": round(statistics.median(values), 3), "min": round(min(values), 3), "max": round(max(values), 3)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="Number of cold starts to measure")
+    parser.add_argument("--no-warmup", action="store_true", help="Start with WARMUP_ON_STARTUP=false")
+    parser.add_argument("--timeout", type=float, default=120, help="Seconds to wait for readiness per run")
+    parser.add_argument("--json", help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    env = dict(os.environ, WARMUP_ON_STARTUP="false" if args.no_warmup else "true")
+    imports, firsts, readies = [], [], []
+    for run in range(args.repeat):
+        imports.append(measure_import(env))
+        first_response, ready = measure_server(env, args.timeout)
+        firsts.append(first_response)
+        readies.append(ready)
+        print(f"run {run + 1}: import {imports[-1]:.3f}s, first response "
+              f"{first_response if first_response is None else round(first_response, 3)}s, "
+              f"ready {ready if ready is None else round(ready, 3)}s")
+
+    results = {
+        "warm_up": not args.no_warmup,
+        "runs": args.repeat,
+        "import_seconds": summarize(imports),
+        "first_response_seconds": summarize(firsts),
+        "ready_seconds": summarize(readies),
+    }
+    print()
+    for name in ("import_seconds", "first_response_seconds", "ready_seconds"):
+        r = results[name]
+        print(f"{name:<24}" + (f"median {r['median']}s (min {r['min']}s, max {r['max']}s)" if r else "n/a"))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""
+Generate a corpus of synthetic PDF resumes for benchmarks.
+
+Every resume gets a name, contact details, skills from the skill dictionary
+(skills.json), degrees from QUALIFICATION_PATTERN, job titles from
+JOB_TITLE_PATTERN and employment date ranges, laid out in one of several
+styles (name at the top, "Name:" header, two columns). Resumes are seeded by
+index, so the same seed always produces the same corpus, whatever the
+number of worker processes. A manifest.jsonl with the ground truth of each
+file is written next to the PDFs.
+
+Usage (from the backend directory):
+    python benchmarks/generate_corpus.py --out corpus --count 1000 [--seed 7] [--workers 4]
+"""
+import argparse
+import datetime
+import json
+import os
+import random
+import re
+import sys
+import textwrap
+import time
+from multiprocessing import Pool
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from extraction import JOB_TITLE_PATTERN, QUALIFICATION_PATTERN  # noqa: E402
+from skill_matcher import SKILL_DICTIONARY_PATH, load_dictionary  # noqa: E402
+
+
+FIRST_NAMES = [
+    "Aarav", "Aisha", "Alex", "Ananya", "Carlos", "Chen", "Daniel", "Divya", "Elena", "Emma", "Fatima", "Gabriel",
+    "Hannah", "Ibrahim", "Isabella", "Jordan", "Julia", "Kenji", "Lakshmi", "Liam", "Maria", "Mateo", "Mei",
+    "Michael", "Nadia", "Noah", "Olivia", "Omar", "Priya", "Rahul", "Sara", "Sofia", "Taylor", "Thomas", "Wei",
+    "Yusuf", "Zara", "Arjun", "Grace", "Samuel",
+]
+LAST_NAMES = [
+    "Anderson", "Bose", "Castillo", "Chowdhury", "Dubois", "Fernandez", "Garcia", "Gupta", "Hassan", "Ito",
+    "Johnson", "Kapoor", "Kim", "Kowalski", "Lee", "Martinez", "Mehta", "Nair", "Nguyen", "Okafor", "Patel",
+    "Rao", "Reed", "Rivera", "Rodriguez", "Rossi", "Sato", "Schmidt", "Shah", "Silva", "Singh", "Smith",
+    "Sultana", "Tanaka", "Thomas", "Wang", "Williams", "Yilmaz", "Zhang", "Royce",
+]
+COMPANIES = [
+    "Horizon Technologies", "Bright Solutions", "Northwind Traders", "Acme Corporation", "Blue River Analytics",
+    "Summit Health", "Globex Systems", "Initech", "Vertex Labs", "Pioneer Finance", "Crescent Retail",
+    "Orbit Logistics", "Nimbus Cloud", "Evergreen Consulting", "Apex Manufacturing",
+]
+CITIES = ["Mumbai", "Bengaluru", "Pune", "London", "New York", "Toronto", "Berlin", "Singapore", "Dubai", "Sydney"]
+UNIVERSITIES = [
+    "University of Mumbai", "Anna University", "Delhi University", "State University", "Institute of Technology",
+    "National College", "City University", "Technical University",
+]
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+DUTIES = [
+    "Led a team of {n} engineers delivering customer-facing features on schedule",
+    "Improved reporting turnaround by {n}% through automation",
+    "Worked closely with stakeholders to gather requirements and prioritise the roadmap",
+    "Designed and maintained internal tools used by {n} teams",
+    "Reduced operating costs by {n}% by streamlining processes",
+    "Mentored junior colleagues and ran weekly knowledge-sharing sessions",
+]
+LAYOUTS = ["classic", "labeled", "two_column"]
+
+PAGE_WIDTH, PAGE_HEIGHT = 595, 842  # A4 in points
+MARGIN = 50
+
+
+def pattern_alternatives(pattern):
+    # "B\.?Tech|M\.?Tech|..." -> ["B.Tech", "M.Tech", ...]
+    body = pattern.pattern
+    body = body[body.index("(") + 1:body.rindex(")")]
+    return sorted({re.sub(r"\\\.\?", ".", alternative) for alternative in body.split("|") if alternative})
+
+
+def load_vocabulary():
+    return {
+        "skills": sorted(load_dictionary(SKILL_DICTIONARY_PATH)),
+        "qualifications": [q for q in pattern_alternatives(QUALIFICATION_PATTERN) if len(q) > 3],
+        "job_titles": pattern_alternatives(JOB_TITLE_PATTERN),
+    }
+
+
+def make_profile(rng, vocabulary):
+    """
+    A random resume as a dictionary (also the ground truth written to the manifest)
+    """
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    this_year = datetime.date.today().year
+    positions = []
+    year = this_year
+    for i in range(rng.randint(1, 5)):
+        end = "Present" if i == 0 and rng.random() < 0.6 else str(year)
+        start = (year if end == "Present" else int(end)) - rng.randint(1, 4)
+        positions.append({
+            "title": rng.choice(vocabulary["job_titles"]),
+            "company": rng.choice(COMPANIES),
+            "start": f"{rng.choice(MONTHS)} {start}" if rng.random() < 0.5 else str(start),
+            "end": end,
+            "duties": [duty.format(n=rng.randint(2, 40)) for duty in rng.sample(DUTIES, rng.randint(2, 4))],
+        })
+        year = start - rng.randint(0, 1)
+    experience = sum(
+        (this_year if p["end"] == "Present" else int(p["end"])) - int(p["start"][-4:]) for p in positions
+    )
+    return {
+        "name": f"{first} {last}",
+        "email": f"{first.lower()}.{last.lower()}@example.com",
+        "phone": "".join(str(rng.randint(0, 9)) for _ in range(10)),
+        "city": rng.choice(CITIES),
+        "qualifications": rng.sample(vocabulary["qualifications"], rng.randint(1, 2)),
+        "university": rng.choice(UNIVERSITIES),
+        "skills": rng.sample(vocabulary["skills"], rng.randint(4, 14)),
+        "positions": positions,
+        "experience": experience,
+        "layout": rng.choice(LAYOUTS),
+    }
+
+
+def _sections(profile):
+    # Body lines shared by every layout
+    lines = ["PROFESSIONAL SUMMARY",
+             f"{profile['positions'][0]['title']} with {profile['experience']} years of experience.", "",
+             "EXPERIENCE"]
+    for p in profile["positions"]:
+        lines.append(f"{p['title']}, {p['company']}    {p['start']} - {p['end']}")
+        lines.extend(f"  - {duty}" for duty in p["duties"])
+        lines.append("")
+    lines.append("EDUCATION")
+    for qualification in profile["qualifications"]:
+        lines.append(f"{qualification}, {profile['university']}")
+    return lines
+
+
+def _write_lines(doc, page, lines, x, y, width_chars=90, fontsize=10):
+    # Write wrapped lines top to bottom, one insert_text call per page, starting
+    # new pages as needed; returns the current page
+    wrapped = [part for line in lines for part in (textwrap.wrap(line, width_chars, subsequent_indent="    ") or [""])]
+    line_height = fontsize * 1.5
+    while wrapped:
+        fits = max(1, int((PAGE_HEIGHT - MARGIN - y) // line_height) + 1)
+        page.insert_text((x, y), wrapped[:fits], fontsize=fontsize, fontname="helv", lineheight=1.5)
+        wrapped = wrapped[fits:]
+        if wrapped:
+            page = doc.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT)
+            y = MARGIN
+    return page
+
+
+def render_pdf(profile, path):
+    import fitz
+
+    doc = fitz.open()
+    page = doc.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT)
+    contact = f"{profile['phone']} | {profile['email']} | {profile['city']}"
+    skills = ", ".join(profile["skills"])
+
+    if profile["layout"] == "classic":
+        page.insert_text((MARGIN, 70), profile["name"].upper(), fontsize=22, fontname="hebo")
+        page.insert_text((MARGIN, 92), contact, fontsize=10, fontname="helv")
+        _write_lines(doc, page, ["", "SKILLS", skills, ""] + _sections(profile), MARGIN, 125)
+    elif profile["layout"] == "labeled":
+        header = ["CURRICULUM VITAE", "", f"Name: {profile['name']}", f"Phone: {profile['phone']}",
+                  f"Email: {profile['email']}", f"Location: {profile['city']}", ""]
+        _write_lines(doc, page, header + _sections(profile) + ["", "SKILLS AND ABILITIES", skills], MARGIN, 70)
+    else:
+        # Sidebar with contact details and skills, main column with the rest
+        sidebar = ["CONTACT", profile["phone"], profile["email"], profile["city"], "", "SKILLS"] + profile["skills"]
+        page.insert_text((MARGIN, 70), profile["name"], fontsize=20, fontname="hebo")
+        _write_lines(doc, page, sidebar, MARGIN, 110, width_chars=24)
+        _write_lines(doc, page, _sections(profile), 220, 110, width_chars=60)
+
+    doc.save(path, deflate=True)
+    doc.close()
+
+
+def _generate(args):
+    # Worker: render the resumes with the given indexes
+    out, seed, indexes = args
+    vocabulary = load_vocabulary()
+    entries = []
+    for index in indexes:
+        profile = make_profile(random.Random(seed * 1_000_003 + index), vocabulary)
+        filename = f"resume_{index:06d}.pdf"
+        render_pdf(profile, os.path.join(out, filename))
+        entries.append(dict(profile, file=filename))
+    return entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", default="corpus", help="Directory to write the PDFs and manifest.jsonl to")
+    parser.add_argument("--count", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    chunk = 200
+    tasks = [(args.out, args.seed, range(start, min(start + chunk, args.count))) for start in range(0, args.count, chunk)]
+    start = time.perf_counter()
+    with open(os.path.join(args.out, "manifest.jsonl"), "w") as manifest, Pool(args.workers) as pool:
+        for entries in pool.imap(_generate, tasks):
+            for entry in entries:
+                manifest.write(json.dumps(entry) + "\n")
+    print(f"Wrote {args.count} resumes to {args.out} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+"""
+End-to-end benchmark suite.
+
+Times the stages a resume goes through, on a corpus produced by
+generate_corpus.py:
+
+    pdf_text         extract_text_from_pdf, per file
+    extract_entities text + name + fields, per file (skipped if the NLP model is missing)
+    extract_skills   skill matching on the extracted text, per file
+    calculate_score  the scalar reference scorer, per candidate set size
+    score_candidates the vectorized scorer, per candidate set size
+    rank             POST /rank/ against a database of that many resumes, cold and cached
+    rank_description POST /rank/ with a job description (TF-IDF matching), cold and cached
+    rank_qualified   POST /rank/ with minimum qualification level and degree filters, cold and cached
+
+The per-file stages run once over at most --pdf-limit files of the corpus
+(a small corpus is generated in a temporary directory if --corpus is not
+given). The scoring and /rank/ stages run at every --sizes value, on resumes
+built from the same synthetic profiles. Everything is written to a temporary
+database and storage directory, never the real ones.
+
+Results are written as JSON with --json; --compare checks them against an
+earlier run and exits with status 1 if any timing got slower by more than
+--threshold (a fraction, 0.1 = 10%).
+
+Usage (from the backend directory):
+    python benchmarks/run_suite.py [--corpus corpus] [--sizes 1000 10000 100000] [--pdf-limit 1000]
+                                   [--json results.json] [--compare previous.json] [--threshold 0.1]
+"""
+import argparse
+import datetime
+import itertools
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Work in a temporary database and storage directory; set before anything imports database
+WORKDIR = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(WORKDIR, 'bench.db')}"
+os.environ["UPLOAD_DIR"] = os.path.join(WORKDIR, "storage")
+os.environ["WARMUP_ON_STARTUP"] = "false"
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from database import SessionLocal, bump_dataset_version  # noqa: E402
+from extraction import extract_entities, extract_skills  # noqa: E402
+from generate_corpus import _generate, _sections, load_vocabulary, make_profile  # noqa: E402
+from ingestion import resume_from_extracted  # noqa: E402
+from pdf_text import extract_text_from_pdf  # noqa: E402
+from scoring import calculate_score, score_candidates  # noqa: E402
+from qualification_index import index_resume_qualifications  # noqa: E402
+from skill_index import index_resume_skills  # noqa: E402
+import main as app_module  # noqa: E402
+import search  # noqa: E402
+import semantic  # noqa: E402
+
+
+# Criteria used for the scoring and /rank/ stages
+CRITERIA = {
+    "qualification": "B.Tech",
+    "skills": "Python, SQL, Machine Learning, Docker, Project Management",
+    "experience": 3,
+    "resumes_selected": 50,
+}
+DESCRIPTION_CRITERIA = dict(
+    CRITERIA, job_description="Backend engineer building Python and SQL services, with Docker and machine learning",
+)
+QUALIFIED_CRITERIA = dict(CRITERIA, min_qualification_level="master", qualification_degrees="MBA, M.Tech, MS")
+
+# Rows inserted per transaction while filling the benchmark database
+INSERT_BATCH = 5000
+
+
+def summarize(timings):
+    """
+    Latency summary of per-item timings (seconds), in milliseconds
+    """
+    ordered = sorted(timings)
+    return {
+        "count": len(ordered),
+        "total_s": round(sum(ordered), 4),
+        "ms_p50": round(statistics.median(ordered) * 1000, 3),
+        "ms_p95": round(ordered[int(0.95 * (len(ordered) - 1))] * 1000, 3),
+        "ms_max": round(ordered[-1] * 1000, 3),
+    }
+
+
+def timed_each(function, items):
+    results, timings = [], []
+    for item in items:
+        start = time.perf_counter()
+        results.append(function(item))
+        timings.append(time.perf_counter() - start)
+    return results, timings
+
+
+def corpus_files(corpus, limit):
+    if corpus is None:
+        # No corpus given: generate just enough resumes for the per-file stages
+        corpus = os.path.join(WORKDIR, "corpus")
+        os.makedirs(corpus)
+        _generate((corpus, 7, range(limit)))
+    files = sorted(os.path.join(corpus, f) for f in os.listdir(corpus) if f.lower().endswith(".pdf"))
+    return files[:limit]
+
+
+def file_stages(files):
+    results = {}
+    extract_text_from_pdf(files[0])  # Imports the PDF backends
+    texts, timings = timed_each(extract_text_from_pdf, files)
+    results["pdf_text"] = summarize(timings)
+
+    try:
+        extract_entities(files[0])  # Loads the NLP model, which is not what is being timed
+        _, timings = timed_each(extract_entities, files)
+        results["extract_entities"] = summarize(timings)
+    except (ImportError, OSError) as e:
+        results["extract_entities"] = {"error": f"NLP model unavailable: {e}"}
+
+    _, timings = timed_each(extract_skills, texts)
+    results["extract_skills"] = summarize(timings)
+    return results
+
+
+def extracted_from_profile(profile):
+    # What extract_entities would return for this profile
+    return {
+        "name": profile["name"],
+        "phone": profile["phone"],
+        "email": profile["email"],
+        "qualification": ", ".join(profile["qualifications"]),
+        "skills": ",".join(profile["skills"]),
+        "experience": profile["experience"],
+        "text": "\n".join([profile["name"], "SKILLS", ", ".join(profile["skills"])] + _sections(profile)),
+    }
+
+
+def fill_database(db, profiles):
+    for offset in range(0, len(profiles), INSERT_BATCH):
+        extracted = [extracted_from_profile(p) for p in profiles[offset:offset + INSERT_BATCH]]
+        resumes = [resume_from_extracted(e, None) for e in extracted]
+        db.add_all(resumes)
+        db.flush()
+        index_resume_skills(db, resumes)
+        index_resume_qualifications(db, resumes)
+        search.index_texts(db, {r.id: e["text"] for r, e in zip(resumes, extracted)})
+        semantic.index_texts(db, {r.id: e["text"] for r, e in zip(resumes, extracted)})
+        bump_dataset_version(db)
+        db.commit()
+
+
+def size_stages(client, candidates):
+    criteria = SimpleNamespace(**CRITERIA)
+    results = {}
+
+    start = time.perf_counter()
+    expected = [calculate_score(c, criteria) for c in candidates]
+    results["calculate_score"] = {"total_s": round(time.perf_counter() - start, 4)}
+
+    start = time.perf_counter()
+    actual = score_candidates(candidates, criteria)
+    results["score_candidates"] = {"total_s": round(time.perf_counter() - start, 4)}
+    if list(actual) != expected:
+        sys.exit("score_candidates differs from calculate_score")
+
+    for stage, criteria in (("rank", CRITERIA), ("rank_description", DESCRIPTION_CRITERIA),
+                            ("rank_qualified", QUALIFIED_CRITERIA)):
+        app_module.ranking_module.ranking_cache.clear()
+        start = time.perf_counter()
+        response = client.post("/rank/", json=criteria)
+        cold = time.perf_counter() - start
+        response.raise_for_status()
+        _, warm = timed_each(lambda _: client.post("/rank/", json=criteria), range(20))
+        results[stage] = {"cold_ms": round(cold * 1000, 3), "cached_ms_p50": round(statistics.median(warm) * 1000, 3)}
+    return results
+
+
+def metadata():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def flatten(results):
+    """
+    {"pdf_text.ms_p50": ..., "rank.10000.cold_ms": ...}: every timing of a run, keyed for comparison
+    """
+    metrics = {}
+    for stage, values in results["files"].items():
+        for name, value in values.items():
+            if name.endswith(("_s", "_ms", "_p50", "_p95")):
+                metrics[f"{stage}.{name}"] = value
+    for size, stages in results["sizes"].items():
+        for stage, values in stages.items():
+            for name, value in values.items():
+                metrics[f"{stage}.{size}.{name}"] = value
+    return metrics
+
+
+def compare(current, previous, threshold):
+    """
+    Print every timing next to the previous run's; returns the metrics that regressed
+    """
+    before, after = flatten(previous), flatten(current)
+    regressions = []
+    print(f"\n{'metric':<40}{'previous':>12}{'current':>12}{'change':>10}")
+    for name in sorted(set(before) & set(after)):
+        if not before[name]:
+            continue
+        change = after[name] / before[name] - 1
+        regressed = change > threshold
+        if regressed:
+            regressions.append(name)
+        print(f"{name:<40}{before[name]:>12}{after[name]:>12}{change:>+9.0%}" + ("  REGRESSION" if regressed else ""))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", help="Directory of PDFs from generate_corpus.py (default: generate a small one)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--pdf-limit", type=int, default=1000, help="Files timed by the per-file stages")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", help="Write the results to this JSON file")
+    parser.add_argument("--compare", help="Results of an earlier run to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Slowdown reported as a regression")
+    args = parser.parse_args()
+
+    try:
+        results = {"metadata": metadata(), "criteria": CRITERIA, "files": {}, "sizes": {}}
+        files = corpus_files(args.corpus, args.pdf_limit)
+        print(f"Per-file stages over {len(files)} PDFs")
+        results["files"] = file_stages(files)
+        for stage, values in results["files"].items():
+            print(f"  {stage:<18}" + ("  ".join(f"{k}={v}" for k, v in values.items())))
+
+        # Profiles are drawn in the same order for every size, so size N holds the first N resumes
+        vocabulary = load_vocabulary()
+        rng = random.Random(args.seed)
+        profiles = [make_profile(rng, vocabulary) for _ in range(max(args.sizes))]
+        client = TestClient(app_module.app)  # Not entered as a context manager: no startup hooks
+        db = SessionLocal()
+        stored = 0
+        for size in sorted(args.sizes):
+            fill_database(db, profiles[stored:size])
+            stored = size
+            candidates = [
+                SimpleNamespace(qualification=", ".join(p["qualifications"]), skills=",".join(p["skills"]),
+                                experience=p["experience"])
+                for p in itertools.islice(profiles, size)
+            ]
+            results["sizes"][str(size)] = size_stages(client, candidates)
+            print(f"{size:>8} resumes  " + "  ".join(
+                f"{stage}: " + ", ".join(f"{k}={v}" for k, v in values.items())
+                for stage, values in results["sizes"][str(size)].items()
+            ))
+        db.close()
+    finally:
+        shutil.rmtree(WORKDIR, ignore_errors=True)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            sys.exit(f"{len(regressions)} timings regressed by more than {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
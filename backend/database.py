@@ -0,0 +1,276 @@
+"""
+Database engine, session factory and ORM models.
+"""
+import datetime
+
+from sqlalchemy import inspect, text, Column, Integer, String, Float, Text, DateTime, ForeignKey, Index, LargeBinary, func
+from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import sessionmaker
+
+from db_config import DATABASE_URL, create_db_engine
+from qualifications import highest_level
+
+
+# Create a base class for defining database models
+Base = declarative_base()
+
+# Create a database engine (URL, pool and SQLite pragmas are configured in db_config)
+engine = create_db_engine(DATABASE_URL)
+
+# Create a session factory to interact with the database
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def _qualification_level_default(context):
+    return highest_level(context.get_current_parameters().get("qualification"))
+
+
+def normalize_email(email):
+    """
+    Lowercased email, or None if there is none ("Not Found")
+    """
+    email = (email or "").strip().lower()
+    return email if "@" in email else None
+
+
+def normalize_phone(phone):
+    """
+    Last 10 digits of a phone number, or None if it has too few digits to identify anyone
+    """
+    digits = "".join(char for char in (phone or "") if char.isdigit())
+    return digits[-10:] if len(digits) >= 7 else None
+
+
+def _normalized_email_default(context):
+    return normalize_email(context.get_current_parameters().get("email"))
+
+
+def _normalized_phone_default(context):
+    return normalize_phone(context.get_current_parameters().get("phone"))
+
+
+# Define a database model for storing resume details
+class Resume(Base):
+    __tablename__ = "resumes"  # Name of the database table
+
+    id = Column(Integer, primary_key=True, index=True)  # Unique ID for each resume
+    name = Column(String)  # Candidate's name
+    phone = Column(String)  # Contact number
+    email = Column(String, index=True)  # Email address
+    qualification = Column(String)  # Candidate's highest qualification
+    # Level of the highest qualification (qualifications.LEVELS, 0 if none is known), for "at least" filters
+    qualification_level = Column(Integer, index=True, default=_qualification_level_default)
+    skills = Column(String)  # Extracted skills from the resume
+    experience = Column(Integer, index=True)  # Years of work experience
+    file_path = Column(String)  # Path to the uploaded resume file
+    score = Column(Float, default=0.0)  # Score assigned after analysis
+    content_hash = Column(String, index=True)  # SHA-256 of the uploaded file, used to detect re-uploads
+    # JSON of extraction.field_versions() when the fields were extracted; /reextract/ refreshes stale fields
+    extractor_versions = Column(Text)
+    # Normalized contact details, filled in on insert; resumes sharing one are the same candidate
+    email_normalized = Column(String, index=True, default=_normalized_email_default)
+    phone_normalized = Column(String, index=True, default=_normalized_phone_default)
+    # Id of the first resume of this candidate's duplicate group (see duplicates.py); None until grouped
+    duplicate_group = Column(Integer, index=True)
+
+
+# Vocabulary of distinct (normalized) skills
+class Skill(Base):
+    __tablename__ = "skills"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String, unique=True, index=True, nullable=False)  # Lowercased skill name
+
+
+# Candidate-skill association table; its (skill_id, resume_id) index is the
+# inverted index /rank/ uses to find candidates by skill
+class ResumeSkill(Base):
+    __tablename__ = "resume_skills"
+
+    resume_id = Column(Integer, ForeignKey("resumes.id", ondelete="CASCADE"), primary_key=True)
+    skill_id = Column(Integer, ForeignKey("skills.id", ondelete="CASCADE"), primary_key=True)
+
+    __table_args__ = (Index("ix_resume_skills_skill_resume", "skill_id", "resume_id"),)
+
+
+# Canonical degrees of each resume's qualification (see qualifications.py); the
+# (degree, resume_id) index lets /rank/ keep only the holders of given degrees
+class ResumeQualification(Base):
+    __tablename__ = "resume_qualifications"
+
+    resume_id = Column(Integer, ForeignKey("resumes.id", ondelete="CASCADE"), primary_key=True)
+    degree = Column(String, primary_key=True)  # Canonical degree, e.g. "MBA"
+    field = Column(String)  # Field of study, when the degree names one
+    level = Column(Integer)  # Ordinal level (qualifications.LEVELS)
+
+    __table_args__ = (Index("ix_resume_qualifications_degree_resume", "degree", "resume_id"),)
+
+
+# Full text of each resume, zlib-compressed; the FTS5 index (resume_fts) only holds its terms
+class ResumeText(Base):
+    __tablename__ = "resume_texts"
+
+    resume_id = Column(Integer, ForeignKey("resumes.id", ondelete="CASCADE"), primary_key=True)
+    text = Column(LargeBinary)  # zlib-compressed UTF-8 text extracted from the PDF
+
+
+# Hashed term counts of each resume's text, the rows of the semantic matching matrix (see semantic.py)
+class ResumeVector(Base):
+    __tablename__ = "resume_vectors"
+
+    resume_id = Column(Integer, ForeignKey("resumes.id", ondelete="CASCADE"), primary_key=True)
+    model = Column(String, index=True)  # semantic.MODEL_KEY of the vectorizer that produced the vector
+    terms = Column(LargeBinary)  # Feature indices (int32) followed by their counts (float32)
+
+
+# MinHash signature of each resume's text (see minhash.py), compared with the resumes it shares an LSH bucket with
+class ResumeSignature(Base):
+    __tablename__ = "resume_signatures"
+
+    resume_id = Column(Integer, ForeignKey("resumes.id", ondelete="CASCADE"), primary_key=True)
+    version = Column(String)  # minhash.MINHASH_VERSION of the signature
+    signature = Column(LargeBinary)  # NUM_PERMUTATIONS little-endian uint32 values
+
+
+# LSH buckets: one row per band of each resume's signature; the primary key's
+# bucket prefix finds the resumes sharing a band with a new one
+class ResumeBucket(Base):
+    __tablename__ = "resume_buckets"
+
+    bucket = Column(Integer, primary_key=True)  # minhash.band_keys() value of one band (the band is hashed into it)
+    resume_id = Column(Integer, ForeignKey("resumes.id", ondelete="CASCADE"), primary_key=True, index=True)
+
+
+# Persistent cache of extract_entities results, keyed by file content and extractor version
+class ExtractionCache(Base):
+    __tablename__ = "extraction_cache"
+
+    content_hash = Column(String, primary_key=True)  # SHA-256 of the PDF bytes
+    extractor_version = Column(String, primary_key=True)  # extraction.EXTRACTOR_VERSION that produced the result
+    result = Column(Text)  # JSON-encoded extract_entities output, without the text and its MinHash signature
+    text = Column(LargeBinary)  # zlib-compressed extracted text, like resume_texts (which /reset/ clears)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+
+
+# Single-row table holding a counter that changes whenever the set of resumes
+# changes; cached rankings are only valid for the version they were computed on
+class DatasetState(Base):
+    __tablename__ = "dataset_state"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    # Bumped (with the version) when resumes are deleted: SQLite may hand their ids to new resumes
+    removals = Column(Integer, default=0)
+
+
+# Progress of an upload job, saved when the server runs several worker processes
+# (see server.py) so /jobs/{id} can be answered by any of them
+class IngestionJobState(Base):
+    __tablename__ = "ingestion_jobs"
+
+    id = Column(String, primary_key=True)  # IngestionJob.id
+    data = Column(Text)  # JSON-encoded IngestionJob.to_dict()
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow, index=True)
+
+
+# Named leases (see leases.py): work that only one server process may do at a time
+class Lease(Base):
+    __tablename__ = "leases"
+
+    name = Column(String, primary_key=True)  # What the lease covers, e.g. leases.WRITE_LEASE
+    holder = Column(String, nullable=False)  # leases.new_holder() of the process and task holding it
+    info = Column(String)  # Shown to those waiting for it, e.g. the id of the running job
+    expires_at = Column(DateTime, nullable=False)  # Free for the taking after this, unless renewed
+
+
+# Create the database tables based on the defined models
+Base.metadata.create_all(bind=engine)
+
+
+def add_missing_columns():
+    """
+    create_all does not alter existing tables, so add any model columns
+    (and their indexes) that an older resumes.db is missing
+    """
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN "{column.name}" {column_type}'))
+            # Indexes added to existing columns (or on new columns) are created as well
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+
+
+# Indexes of columns the models no longer use (qualification_normalized gave way to
+# qualification_level and resume_qualifications); dropped so inserts stop maintaining them
+RETIRED_INDEXES = ("ix_resumes_qualification_normalized",)
+
+
+def drop_retired_indexes():
+    """
+    Drop the RETIRED_INDEXES an older resumes.db still has (the columns stay, unused)
+    """
+    with engine.begin() as conn:
+        for name in RETIRED_INDEXES:
+            conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+
+
+def create_search_index():
+    """
+    Create the FTS5 full-text index over resume text (SQLite only). It is
+    contentless: rowid is the resume id and the text lives in resume_texts.
+    """
+    if engine.dialect.name != "sqlite":
+        return
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS resume_fts "
+            "USING fts5(text, content='', tokenize='unicode61 remove_diacritics 2')"
+        ))
+
+add_missing_columns()
+drop_retired_indexes()
+create_search_index()
+
+
+def get_dataset_version(db):
+    """
+    Current dataset version (0 until the first change)
+    """
+    return db.query(DatasetState.version).filter(DatasetState.id == 1).scalar() or 0
+
+
+def get_dataset_removals(db):
+    """
+    Number of times resumes were deleted (0 until the first deletion)
+    """
+    return db.query(DatasetState.removals).filter(DatasetState.id == 1).scalar() or 0
+
+
+def bump_dataset_version(db, removed=False):
+    """
+    Mark the resume set as changed; call inside the transaction that adds or deletes resumes
+    (with removed=True when it deletes any, so in-memory indexes do not trust their ids)
+    """
+    values = {DatasetState.version: DatasetState.version + 1}
+    if removed:
+        values[DatasetState.removals] = func.coalesce(DatasetState.removals, 0) + 1
+    updated = db.query(DatasetState).filter(DatasetState.id == 1).update(values, synchronize_session=False)
+    if not updated:
+        db.add(DatasetState(id=1, version=1, removals=int(removed)))
+
+
+# Dependency to get the database session
+def get_db():
+    db = SessionLocal()  # Create a new database session
+    try:
+        yield db  # Provide the session to the request
+    finally:
+        db.close()  # Ensure the session is closed after use
@@ -0,0 +1,70 @@
+"""
+Database engine configuration.
+
+The database URL, connection pool and SQLite pragmas all come from the
+environment. SQLite runs in WAL mode, so /rank/ and other readers keep
+working while the ingestion writer commits, instead of queuing behind the
+database lock.
+"""
+import os
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.pool import QueuePool
+
+
+# Database to connect to (any SQLAlchemy URL; the pragmas below only apply to SQLite)
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./resumes.db")
+
+# SQLite journal mode and durability: WAL lets readers run alongside the writer, and
+# synchronous=NORMAL only syncs at checkpoints, which is safe in WAL mode
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+
+# Page cache per connection in KiB, and bytes of the file memory-mapped for reads
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+
+# How long (ms) a connection waits for a lock before failing with "database is locked"
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+
+# Connections kept open: one per request thread plus the ingestion writer.
+# 0 sizes the pool from the CPU count, like the ingestion worker pool.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "0")) or (os.cpu_count() or 1) * 2 + 1
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+
+
+def is_sqlite(url):
+    return url.startswith("sqlite")
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    # Pragmas are per connection (except journal_mode, which is stored in the file)
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"PRAGMA journal_mode={SQLITE_JOURNAL_MODE}")
+        cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}")  # Negative = size in KiB
+        cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+    finally:
+        cursor.close()
+
+
+def create_db_engine(url=DATABASE_URL):
+    """
+    Create the engine for `url`, with a sized connection pool and, for SQLite, the tuned pragmas
+    """
+    if not is_sqlite(url):
+        return create_engine(url, pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW, pool_pre_ping=True)
+
+    engine = create_engine(
+        url,
+        # Sessions are used from request threads and the ingestion writer thread
+        connect_args={"check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000},
+        poolclass=QueuePool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+    )
+    event.listen(engine, "connect", _set_sqlite_pragmas)
+    return engine
@@ -0,0 +1,249 @@
+"""
+Duplicate candidate detection.
+
+The same candidate often arrives as several slightly different PDFs. Every
+stored resume belongs to a duplicate group, identified by the id of the
+group's first resume. A new resume joins the group of any stored resume that
+has the same normalized email or phone number, or nearly the same text: a
+MinHash similarity (see minhash.py) of at least DUPLICATE_THRESHOLD. Only
+resumes sharing an LSH bucket with the new one are compared, so grouping an
+upload costs a few indexed lookups however many resumes are stored. A resume
+that links two groups merges them into the older one.
+
+Groups are assigned when a resume is stored (contact details changed later
+by /reextract/ do not regroup it); /rank/ can collapse each group to its
+best-scoring resume and /duplicates/ lists the groups.
+"""
+import os
+
+import numpy as np
+from sqlalchemy import func, insert, or_, update
+
+from database import Resume, ResumeBucket, ResumeSignature, ResumeText, normalize_email, normalize_phone
+import minhash
+import search
+
+
+# Estimated text similarity (Jaccard of word shingles) at which two resumes are the same candidate
+DUPLICATE_THRESHOLD = float(os.getenv("DUPLICATE_THRESHOLD", "0.7"))
+
+# Bucket neighbours compared with a new resume at most, those sharing the most bands first,
+# so boilerplate shared by many resumes cannot make one upload compare against all of them
+DUPLICATE_MAX_CANDIDATES = 50
+
+# Resumes with the same email or phone number looked at, at most
+CONTACT_MATCH_LIMIT = 50
+
+# SQLite limits the number of bound parameters in one statement
+QUERY_CHUNK_SIZE = 900
+
+# Group updates skip matching them against every Resume loaded in the session, which would
+# make an upload's cost grow with its batch; the writer commits (expiring them) right after
+NO_SYNC = {"synchronize_session": False}
+
+
+def _signature_bytes(sig):
+    return sig.astype("<u4").tobytes()
+
+
+def _signature_from_bytes(value):
+    return np.frombuffer(value, dtype="<u4")
+
+
+def _similar_resumes(db, resume_id, sig):
+    # {resume id: similarity} of stored resumes whose text is nearly the same
+    keys = minhash.band_keys(sig)
+    neighbours = [
+        neighbour for neighbour, _ in
+        db.query(ResumeBucket.resume_id, func.count())
+        .filter(ResumeBucket.bucket.in_(keys))  # Looked up in the primary key
+        .filter(ResumeBucket.resume_id != resume_id)
+        .group_by(ResumeBucket.resume_id)
+        .order_by(func.count().desc())
+        .limit(DUPLICATE_MAX_CANDIDATES)
+    ]
+    if not neighbours:
+        return {}
+    similar = {}
+    for neighbour, stored in db.query(ResumeSignature.resume_id, ResumeSignature.signature).filter(
+        ResumeSignature.resume_id.in_(neighbours), ResumeSignature.version == minhash.MINHASH_VERSION
+    ):
+        similarity = minhash.similarity(sig, _signature_from_bytes(stored))
+        if similarity >= DUPLICATE_THRESHOLD:
+            similar[neighbour] = similarity
+    return similar
+
+
+def _same_contact(db, resume_id, email, phone):
+    # Ids of stored resumes with the same normalized email or phone number
+    conditions = []
+    if email:
+        conditions.append(Resume.email_normalized == email)
+    if phone:
+        conditions.append(Resume.phone_normalized == phone)
+    if not conditions:
+        return []
+    return [
+        other for other, in
+        db.query(Resume.id).filter(or_(*conditions), Resume.id != resume_id).limit(CONTACT_MATCH_LIMIT)
+    ]
+
+
+def group_resume(db, resume_id, email, phone, sig):
+    """
+    Put a stored (flushed) resume into its duplicate group and index its
+    signature; returns the group id. email and phone are the raw extracted
+    values, sig its minhash.signature() or None.
+    """
+    email, phone = normalize_email(email), normalize_phone(phone)
+    matches = set(_same_contact(db, resume_id, email, phone))
+    if sig is not None:
+        matches.update(_similar_resumes(db, resume_id, sig))
+
+    groups = set()
+    if matches:
+        groups = {
+            group for group, in
+            db.query(Resume.duplicate_group)
+            .filter(Resume.id.in_(matches), Resume.duplicate_group.isnot(None))
+            .distinct()
+        }
+    group = min(groups | {resume_id})
+    merged = groups - {group}
+    if merged:
+        # This resume links groups that were apart: they become one, under the oldest id
+        db.execute(update(Resume).where(Resume.duplicate_group.in_(merged)).values(duplicate_group=group),
+                   execution_options=NO_SYNC)
+    db.execute(
+        update(Resume).where(Resume.id == resume_id)
+        .values(duplicate_group=group, email_normalized=email, phone_normalized=phone),
+        execution_options=NO_SYNC,
+    )
+
+    if sig is not None:
+        db.execute(insert(ResumeSignature),
+                   [{"resume_id": resume_id, "version": minhash.MINHASH_VERSION, "signature": _signature_bytes(sig)}])
+        db.execute(insert(ResumeBucket),
+                   [{"bucket": key, "resume_id": resume_id} for key in minhash.band_keys(sig)])
+    return group
+
+
+def group_resumes(db, resumes):
+    """
+    Group a batch of stored resumes, given as (id, email, phone, signature or None),
+    in order; resumes of the same batch are found as duplicates of each other too
+    """
+    for resume_id, email, phone, sig in resumes:
+        group_resume(db, resume_id, email, phone, sig)
+
+
+def clear(db):
+    """
+    Drop every signature and bucket (the groups go with the resumes)
+    """
+    db.query(ResumeBucket).delete()
+    db.query(ResumeSignature).delete()
+
+
+def backfill_groups(db, batch_size=500):
+    """
+    Group the resumes stored before duplicate detection existed, in id order,
+    from their stored text. Signatures of another MINHASH_VERSION cannot be
+    compared with new ones, so if there are any, every resume is regrouped.
+    Returns the number of resumes grouped.
+    """
+    if db.query(ResumeSignature.resume_id).filter(ResumeSignature.version != minhash.MINHASH_VERSION).first():
+        clear(db)
+        db.query(Resume).update({Resume.duplicate_group: None}, synchronize_session=False)
+        db.commit()
+
+    grouped = 0
+    while True:
+        rows = (
+            db.query(Resume.id, Resume.email, Resume.phone, ResumeText.text)
+            .outerjoin(ResumeText, ResumeText.resume_id == Resume.id)
+            .filter(Resume.duplicate_group.is_(None))
+            .order_by(Resume.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not rows:
+            return grouped
+        group_resumes(db, [
+            (resume_id, email, phone, minhash.signature(search.decompress_text(text)) if text else None)
+            for resume_id, email, phone, text in rows
+        ])
+        db.commit()
+        grouped += len(rows)
+
+
+def group_members(db, group_ids):
+    """
+    {group id: [(id, name, email, phone)]} of the resumes in the given groups, in id order
+    """
+    members = {}
+    group_ids = list(group_ids)
+    for start in range(0, len(group_ids), QUERY_CHUNK_SIZE):
+        chunk = group_ids[start:start + QUERY_CHUNK_SIZE]
+        for row in (
+            db.query(Resume.duplicate_group, Resume.id, Resume.name, Resume.email, Resume.phone)
+            .filter(Resume.duplicate_group.in_(chunk))
+            .order_by(Resume.id)
+        ):
+            members.setdefault(row.duplicate_group, []).append(row)
+    return members
+
+
+def _matched_on(first, member, signatures):
+    # What makes a member a duplicate of its group's first resume; empty when it was linked through another member
+    reasons = []
+    email, phone = normalize_email(member.email), normalize_phone(member.phone)
+    if email and email == normalize_email(first.email):
+        reasons.append("email")
+    if phone and phone == normalize_phone(first.phone):
+        reasons.append("phone")
+    similarity = None
+    if first.id in signatures and member.id in signatures:
+        similarity = round(minhash.similarity(signatures[first.id], signatures[member.id]), 3)
+        if similarity >= DUPLICATE_THRESHOLD:
+            reasons.append("text")
+    return reasons, similarity
+
+
+def duplicate_report(db, limit=50, offset=0):
+    """
+    (number of groups with more than one resume, one page of those groups with
+    their resumes and what matched each of them to the first)
+    """
+    groups = (
+        db.query(Resume.duplicate_group)
+        .filter(Resume.duplicate_group.isnot(None))
+        .group_by(Resume.duplicate_group)
+        .having(func.count() > 1)
+    )
+    total = groups.count()
+    page = [group for group, in groups.order_by(Resume.duplicate_group).limit(limit).offset(offset)]
+    members = group_members(db, page)
+    ids = [member.id for group in page for member in members.get(group, [])]
+    signatures = {}
+    for start in range(0, len(ids), QUERY_CHUNK_SIZE):
+        signatures.update(
+            (resume_id, _signature_from_bytes(value))
+            for resume_id, value in db.query(ResumeSignature.resume_id, ResumeSignature.signature).filter(
+                ResumeSignature.resume_id.in_(ids[start:start + QUERY_CHUNK_SIZE]),
+                ResumeSignature.version == minhash.MINHASH_VERSION,
+            )
+        )
+
+    report = []
+    for group in page:
+        if group not in members:
+            continue  # Deleted since the page was selected
+        first, *others = members[group]
+        resumes = [{"id": first.id, "name": first.name, "email": first.email, "phone": first.phone}]
+        for member in others:
+            matched_on, similarity = _matched_on(first, member, signatures)
+            resumes.append({"id": member.id, "name": member.name, "email": member.email, "phone": member.phone,
+                            "matched_on": matched_on, "similarity": similarity})
+        report.append({"group": group, "size": len(resumes), "resumes": resumes})
+    return total, report
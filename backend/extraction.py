@@ -0,0 +1,860 @@
+"""
+Resume text extraction and entity parsing.
+
+Kept separate from the FastAPI app so that ingestion worker processes can
+import the extraction pipeline without importing the web application.
+spaCy is only imported when the NLP model is first needed (or warmed up),
+so importing this module stays cheap.
+"""
+import hashlib
+import os
+import re
+import sys
+import threading
+import time
+import datetime
+import io
+import zlib
+from collections import Counter
+from itertools import islice
+
+from metrics import Trace, stage
+from pdf_text import extract_pages_from_pdf, extract_text_from_pdf
+from skill_matcher import SkillMatcher, trie_pattern
+import minhash
+import qualifications
+
+# Version of the extraction pipeline. Bump it whenever a change alters what
+# extract_entities returns, so cached results from the old version are ignored.
+EXTRACTOR_VERSION = "6"
+
+# Define a regex pattern to extract qualifications from resumes
+QUALIFICATION_PATTERN = re.compile(
+    r'\b('
+    r'Bachelor|Master|Doctorate|PhD|Diploma|Associate|Certification|'
+    r'B\.?Tech|M\.?Tech|B\.?E|M\.?E|B\.?Sc|M\.?Sc|BCA|MCA|BBA|MBA|PGDM|PG Diploma|'
+    r'B\.?Com|M\.?Com|B\.?A|M\.?A|BFA|MFA|BMS|'
+    r'B\.?Pharm|M\.?Pharm|D\.?Pharm|Pharm\.?D|'
+    r'B\.?Ed|M\.?Ed|D\.?Ed|'
+    r'LLB|LLM|JD|'
+    r'CA|CPA|CS|ICWA|CFA|CMA|CFP|ACCA|CISA|'
+    r'BDS|MDS|MBBS|MD|MS|BHMS|BAMS|BUMS|BVSc|MVSc|BPT|MPT|'
+    r'B\.?Arch|M\.?Arch|'
+    r'GNIIT|NIIT Certification|CCNA|CCNP|CCIE|AWS Certified|Azure Certified|Google Cloud Certified|PMP|Six Sigma|'
+    r'SSLC|Plus Two|Higher Secondary|High School|Secondary School|Intermediate|10th|12th|HSC|SSC|IGCSE|GCSE|IB Diploma|A Levels|O Levels|'
+    r'Polytechnic|ITI|Vocational Diploma|'
+    r'RN|BSN|MSN|CNA|'
+    r'Chartered Engineer|Professional Engineer|'
+    r'Executive MBA|Online MBA|'
+    r'MPH|MHA|'
+    r'PG Certificate|Graduate Certificate|Advanced Diploma|'
+    r'Artificial Intelligence Certification|Data Science Certification|Digital Marketing Certification|'
+    r'Cybersecurity Certification|Blockchain Certification|'
+    r'Film Making Diploma|Photography Diploma|Animation Diploma|'
+    r'Fashion Designing|Interior Designing|'
+    r'Event Management Diploma|Hotel Management Diploma|'
+    r'Fire and Safety Diploma|'
+    r'Environment Management Certification|'
+    r'Automotive Engineering|Aerospace Engineering|Marine Engineering|'
+    r'Industrial Training|Technical Certification|'
+    r'Cloud Computing Diploma|Machine Learning Certification|AI Certification|'
+    r'Graphic Design Certification|UI/UX Certification|Web Development Certification|'
+    r'Full Stack Development Certification|DevOps Certification|Data Analytics Certification|Business Analytics Certification|'
+    r'Foreign Language Diploma|TEFL|TESOL|'
+    r'Food Technology Diploma|Agriculture Diploma|'
+    r'Journalism Diploma|Mass Communication Diploma|'
+    r'Supply Chain Management Certification|Logistics Certification|'
+    r'Entrepreneurship Certification|'
+    r'Public Relations Certification|'
+    r'Forex Certification|Investment Banking Certification|Stock Market Certification|'
+    r'Clinical Research Certification|Phlebotomy Certification|'
+    r'Legal Assistant Certification|Paralegal Certification|'
+    r'Occupational Therapy Certification|Speech Therapy Certification|'
+    r'Counseling Certification|'
+    r'Yoga Certification|Fitness Trainer Certification|Sports Management Diploma|'
+    r'Artificial Intelligence Diploma|Big Data Certification|'
+    r'Electrical Engineering|Civil Engineering|Mechanical Engineering|'
+    r'Biomedical Engineering|Biotechnology Engineering|Chemical Engineering|'
+    r'Nursing Diploma|Healthcare Management Diploma|'
+    r'Law Enforcement Diploma|Criminal Justice Diploma|'
+    r'Psychology Diploma|Sociology Diploma|Philosophy Diploma|'
+    r'Library Science Diploma|'
+    r'Statistics Certification|Mathematics Diploma|'
+    r'Tourism and Hospitality Diploma|'
+    r'Culinary Arts Diploma|'
+    r'Software Testing Certification|Penetration Testing Certification|Ethical Hacking Certification|'
+    r'UI/UX Design Diploma|Game Development Diploma|'
+    r'Sound Engineering Diploma|Music Production Diploma|'
+    r'Agribusiness Diploma|'
+    r'Nanotechnology Diploma|Geology Diploma|'
+    r'Actuarial Science Certification|Risk Management Certification|'
+    r'Child Development Certification|Social Work Diploma|'
+    r'Corporate Law Certification|'
+    r'Veterinary Science Diploma|'
+    r'Environmental Science Diploma|'
+    r'Renewable Energy Diploma|Solar Energy Certification|Wind Energy Certification|'
+    r'Construction Management Diploma|Real Estate Management Diploma|'
+    r'Aviation Management Diploma|Pilot Training Certification|Cabin Crew Training Certification|'
+    
+    # Added Comprehensive Bachelor Degrees
+    r'Bachelor of Arts|Bachelor of Science|Bachelor of Commerce|Bachelor of Business Administration|Bachelor of Computer Applications|'
+    r'Bachelor of Engineering|Bachelor of Technology|Bachelor of Architecture|Bachelor of Fine Arts|'
+    r'Bachelor of Pharmacy|Bachelor of Education|Bachelor of Laws|Bachelor of Dental Surgery|'
+    r'Bachelor of Medicine|Bachelor of Surgery|Bachelor of Physiotherapy|Bachelor of Occupational Therapy|'
+    r'Bachelor of Veterinary Science|Bachelor of Social Work|Bachelor of Hospitality Management|'
+    r'Bachelor of Hotel Management|Bachelor of Tourism and Travel Management|'
+    r'Bachelor of Journalism and Mass Communication|Bachelor of Performing Arts|Bachelor of Visual Arts|'
+    r'Bachelor of Ayurvedic Medicine and Surgery|Bachelor of Homeopathic Medicine and Surgery|'
+    r'Bachelor of Unani Medicine and Surgery|Bachelor of Business Studies|Bachelor of Management Studies|'
+    r'Bachelor of International Business|Bachelor of Financial Services|'
+    r'Bachelor of Computer Science|Bachelor of Information Technology|Bachelor of Data Science|'
+    r'Bachelor of Cybersecurity|Bachelor of Cloud Computing|Bachelor of Artificial Intelligence|'
+    r'Bachelor of Machine Learning|Bachelor of Digital Marketing|Bachelor of Event Management|'
+    r'Bachelor of Fashion Design|Bachelor of Interior Design|Bachelor of Product Design|'
+    r'Bachelor of Animation|Bachelor of Multimedia|Bachelor of Film Making|'
+    r'Bachelor of Sports Management|Bachelor of Physical Education|Bachelor of Fitness Management|'
+    r'Bachelor of Agriculture|Bachelor of Forestry|Bachelor of Fisheries Science|'
+    r'Bachelor of Biotechnology|Bachelor of Environmental Science|'
+    r'Bachelor of Industrial Design|Bachelor of Marine Engineering|Bachelor of Naval Architecture|'
+    r'Bachelor of Aviation|Bachelor of Aircraft Maintenance Engineering|'
+    r'Bachelor of Economics|Bachelor of Statistics|Bachelor of Mathematics|'
+    r'Bachelor of Political Science|Bachelor of Philosophy|Bachelor of Sociology|Bachelor of Psychology|'
+    r'Bachelor of Anthropology|Bachelor of History|Bachelor of Public Administration|'
+    r'Bachelor of Criminology|Bachelor of Forensic Science'
+    r')\b',
+    re.IGNORECASE
+)
+
+
+# Skills are matched against the external dictionary in skills.json
+# (canonical names plus aliases), compiled into a single-pass matcher
+skill_matcher = SkillMatcher()
+
+# Define a regex pattern to extract job titles from resumes
+JOB_TITLE_PATTERN = re.compile(
+    r"(Software Engineer|Data Scientist|Machine Learning Engineer|Project Manager|"
+    r"DevOps Engineer|Web Developer|Frontend Developer|Backend Developer|Full Stack Developer|"
+    r"Business Analyst|Product Manager|System Administrator|Network Engineer|Cyber Security Analyst|"
+    r"AI Engineer|Cloud Engineer|Technical Lead|Software Architect|QA Engineer|Data Analyst|Supervisor)",
+    re.IGNORECASE  # Make the pattern case-insensitive
+)
+
+
+# spaCy model used to find PERSON entities in extract_name
+SPACY_MODEL = os.getenv("SPACY_MODEL", "en_core_web_sm")
+
+# Number of texts spaCy processes together in extract_names, and the number
+# of processes nlp.pipe may fork (ingestion already runs in a process pool)
+NER_BATCH_SIZE = int(os.getenv("NER_BATCH_SIZE", "32"))
+NER_PROCESSES = int(os.getenv("NER_PROCESSES", "1"))
+
+# Skip NER for a resume when a rule-based name candidate already scores at
+# least this much. NER candidates never score above 60 and lose ties to the
+# rules, so the default of 60 skips NER without changing any extracted name.
+NER_SKIP_SCORE = int(os.getenv("NER_SKIP_SCORE", "60"))
+
+# Take the name from the first-page typography (font size, bold, position) when it is
+# unambiguous, before the text heuristics and NER (see _layout_name)
+NAME_FROM_LAYOUT = os.getenv("NAME_FROM_LAYOUT", "true").lower() in ("1", "true", "yes")
+
+# Only lines in this top fraction of the first page, set at least this many times
+# larger than the body text, can be picked as the name by _layout_name
+LAYOUT_TOP_FRACTION = float(os.getenv("LAYOUT_NAME_TOP_FRACTION", "0.35"))
+LAYOUT_MIN_SIZE_RATIO = float(os.getenv("LAYOUT_NAME_MIN_SIZE_RATIO", "1.3"))
+
+# Lines containing these words are titles or contact details, never a name
+NON_NAME_INDICATORS = ["resume", "cv", "curriculum", "vitae", "profile", "application",
+                       "address", "phone", "email", "github", "linkedin"]
+
+# Section headings that can be set as large as a name
+SECTION_HEADINGS = {
+    "summary", "professional summary", "profile summary", "objective", "career objective", "experience",
+    "work experience", "professional experience", "employment history", "education", "skills",
+    "technical skills", "key skills", "projects", "certifications", "achievements", "contact",
+    "personal details", "personal information", "languages", "hobbies", "interests", "references",
+}
+
+# The name rules and NER only look at this many non-empty lines from the top
+NAME_SECTION_LINES = 35
+
+# Name patterns used by _rule_based_candidates, compiled once
+LEFT_ALIGNED_NAME_PATTERN = re.compile(r'^([A-Z][a-z]+(?:\s(?:[A-Z]\.?|[A-Z][a-z]+)){1,3})(?:\s*\n|\s{3,})')
+RIGHT_ALIGNED_NAME_PATTERN = re.compile(r'(?:\n\s*|\s{3,})([A-Z][a-z]+(?:\s(?:[A-Z]\.?|[A-Z][a-z]+)){1,3})$')
+CAPITALIZED_NAME_PATTERN = re.compile(r'\b([A-Z][a-z]+(?:\s+(?:[A-Z]\.?|[A-Z][a-z]+)){1,4})\b')
+RESUME_OF_PATTERN = re.compile(r'(?:resume|cv|curriculum vitae)\s+(?:of|for|by)\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+){1,3})', re.IGNORECASE)
+EMAIL_NAME_PATTERN = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+
+# A word of a name: letters, plus the dots, apostrophes and hyphens of initials and compound names
+NAME_WORD_PATTERN = re.compile(r"^[^\W\d_]+(?:[.'\-][^\W\d_]*)*$")
+
+
+def load_nlp(model=SPACY_MODEL):
+    """
+    Load the spaCy model with every component except NER disabled
+    """
+    import spacy  # Heavy import, deferred until the model is actually needed
+
+    try:
+        # Attempt to load the pre-trained English NLP model from spaCy
+        nlp = spacy.load(model)
+    except OSError:
+        # If the model is not found, download it dynamically
+        import subprocess
+        subprocess.run([sys.executable, "-m", "spacy", "download", model])
+
+        # Load the model again after installation
+        nlp = spacy.load(model)
+    # Only PERSON entities are used: the tagger, parser, lemmatizer etc. are
+    # skipped (a transformer is kept for models whose NER listens to it)
+    nlp.select_pipes(enable=[name for name in nlp.pipe_names if name in ("ner", "transformer")])
+    return nlp
+
+
+_nlp = None  # Loaded on first use by get_nlp
+_nlp_lock = threading.Lock()
+
+# Progress of the optional background warm-up (see start_warm_up)
+_warm_up = {"status": "idle", "error": None, "seconds": None}
+
+
+def _reset_nlp_lock():
+    # A worker process forked while another thread was loading the model must
+    # not inherit the held lock; it simply loads the model itself if needed
+    global _nlp_lock
+    _nlp_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):  # POSIX only; Windows starts worker processes without forking
+    os.register_at_fork(after_in_child=_reset_nlp_lock)
+
+
+def get_nlp():
+    """
+    Return the spaCy pipeline, loading it on first use
+    """
+    global _nlp
+    if _nlp is None:
+        with _nlp_lock:
+            if _nlp is None:
+                _nlp = load_nlp()
+    return _nlp
+
+
+def nlp_loaded():
+    return _nlp is not None
+
+
+def warm_up():
+    """
+    Load the NLP model now instead of on the first upload. Worker processes
+    forked afterwards share the loaded model instead of loading their own.
+    """
+    _warm_up.update(status="loading", error=None)
+    start = time.perf_counter()
+    try:
+        get_nlp()
+    except Exception as e:
+        _warm_up.update(status="failed", error=str(e) or e.__class__.__name__)
+        print(f"NLP warm-up failed: {_warm_up['error']}")
+        return
+    _warm_up.update(status="done", seconds=round(time.perf_counter() - start, 3))
+
+
+def start_warm_up():
+    """
+    Run warm_up in a background thread, so the server keeps answering requests meanwhile
+    """
+    _warm_up.update(status="loading")
+    threading.Thread(target=warm_up, name="nlp-warm-up", daemon=True).start()
+
+
+def warm_up_status():
+    return {"nlp_loaded": nlp_loaded(), "warm_up": _warm_up["status"],
+            "warm_up_seconds": _warm_up["seconds"], "error": _warm_up["error"]}
+
+
+def _cleaned_lines(text, limit=NAME_SECTION_LINES):
+    # Read the text line by line and stop after `limit` non-empty lines (the name is at the top),
+    # removing leading/trailing spaces from each line
+    lines = (line.strip() for line in io.StringIO(text, newline="\n"))
+    return list(islice((line for line in lines if line), limit))
+
+def _rule_based_candidates(cleaned_lines):
+    """
+    Name candidates found by the layout and regex rules, returned as the
+    candidates that rank before NER ones on equal scores and those that rank after
+    """
+    # Store potential name candidates with their scores
+    name_candidates = []
+    
+    # 1. Check for isolated text blocks at the top - often the name
+    # Names are frequently the most prominent text at the top of the resume
+    top_lines = cleaned_lines[:7]  # Examine more top lines
+    for i, line in enumerate(top_lines):
+        line = line.strip()
+        # Labeled lines ("Name: John Doe") are left to the header rule below, which strips the
+        # label. Resumes with a "Name:" header have no prominent name line for the layout rule,
+        # so they always fall back to these rules, and this one returned the whole labeled line
+        if 2 <= len(line.split()) <= 4 and len(line) < 40 and ":" not in line:
+            words = line.split()
+            if (all(word[0].isupper() for word in words if word) and 
+                not any(indicator in line.lower() for indicator in NON_NAME_INDICATORS)):
+                # Higher score for lines at the very top
+                score = 100 - (i * 10)
+                name_candidates.append((line, score, "top_isolated"))
+    
+    # 2. Header-based detection for names
+    name_headers = ["Name", "Full Name", "Candidate Name", "Profile", "Personal Information", "Personal Details"]
+    
+    for i, line in enumerate(cleaned_lines[:25]):  # Check more lines
+        # Check for common patterns like "Name: John Doe" or "Name - John Doe"
+        for header in name_headers:
+            if header.lower() in line.lower():
+                for separator in [":", "-", "–", ">"]:  # Check various separators
+                    if separator in line:
+                        parts = line.split(separator)
+                        if len(parts) >= 2:
+                            name_candidate = parts[1].strip()
+                            if 2 <= len(name_candidate.split()) <= 5 and all(len(word) > 1 for word in name_candidate.split()):
+                                score = 90
+                                name_candidates.append((name_candidate, score, "header_based"))
+    
+    # 3. Look for left-aligned or right-aligned name patterns
+    # This helps with two-column resumes or stylized layouts
+    combined_text = "\n".join(cleaned_lines[:15])
+    
+    # Check for left-aligned names
+    left_matches = LEFT_ALIGNED_NAME_PATTERN.findall(combined_text)
+    for match in left_matches:
+        if 2 <= len(match.split()) <= 4 and not any(word.lower() in ["resume", "cv"] for word in match.split()):
+            score = 80
+            name_candidates.append((match, score, "left_aligned"))
+    
+    # Check for right-aligned names
+    right_matches = RIGHT_ALIGNED_NAME_PATTERN.findall(combined_text)
+    for match in right_matches:
+        if 2 <= len(match.split()) <= 4 and not any(word.lower() in ["resume", "cv"] for word in match.split()):
+            score = 80
+            name_candidates.append((match, score, "right_aligned"))
+    
+    # 4. Improved regex for capitalized names with various formats
+    # This catches names in different positions within the text
+    for i, line in enumerate(cleaned_lines[:20]):
+        matches = CAPITALIZED_NAME_PATTERN.findall(line.strip())
+        for match in matches:
+            if 2 <= len(match.split()) <= 5:
+                # Higher score for matches near the top
+                score = 70 - (i * 2)
+                name_candidates.append((match, score, "regex"))
+    
+    # 5. NER candidates (see _ner_candidates) go here, between rules 1-4 and 6-7
+    later_candidates = []
+    
+    # 6. Look for patterns like "Resume of John Doe" or "CV of John Doe"
+    combined_text = " ".join(cleaned_lines[:15])
+    resume_of_matches = RESUME_OF_PATTERN.findall(combined_text)
+    
+    for match in resume_of_matches:
+        if 2 <= len(match.split()) <= 4 and all(word[0].isupper() for word in match.split()):
+            score = 85
+            later_candidates.append((match, score, "resume_of"))
+    
+    # 7. Email-based detection as fallback
+    for line in cleaned_lines[:30]:
+        email_match = EMAIL_NAME_PATTERN.search(line)
+        if email_match:
+            email = email_match.group(0)
+            username = email.split('@')[0]
+            
+            # Try to convert username to a name (e.g., john.doe → John Doe)
+            if '.' in username:
+                name_parts = username.split('.')
+                candidate = ' '.join(part.capitalize() for part in name_parts)
+                later_candidates.append((candidate, 30, "email"))
+    
+    return name_candidates, later_candidates
+
+def _ner_section(cleaned_lines):
+    # NER only looks at the top of the resume, where the name is
+    return " ".join(cleaned_lines[:35])
+
+def _ner_candidates(doc):
+    # 5. NER for person detection
+    name_candidates = []
+    for i, ent in enumerate(doc.ents):
+        if ent.label_ == "PERSON":
+            # Higher score for earlier mentions
+            score = 60 - (i * 5)
+            if 2 <= len(ent.text.split()) <= 5:
+                name_candidates.append((ent.text, score, "ner"))
+    return name_candidates
+
+def _best_name(name_candidates):
+    # Sort candidates by score and return the best one
+    if name_candidates:
+        # Sort by score (descending); the sort is stable, so earlier rules win ties
+        name_candidates.sort(key=lambda x: x[1], reverse=True)
+        
+        # Return the highest scoring candidate
+        best_name, score, method = name_candidates[0]
+        return best_name
+    
+    return "Name not found"
+
+def _looks_like_name(line):
+    words = line.split()
+    return (
+        2 <= len(words) <= 4 and len(line) < 40
+        and all(NAME_WORD_PATTERN.match(word) for word in words)
+        and not JOB_TITLE_PATTERN.fullmatch(line)
+    )
+
+def _layout_name(lines):
+    """
+    The name from the first-page typography (layout lines from extract_text_from_pdf):
+    the most prominent line near the top, if it is set clearly larger than the
+    body text and looks like a name. Returns None when that is ambiguous, e.g.
+    the most prominent line is not a name or another name-like line is set
+    just as large, so the text heuristics and NER decide instead.
+    """
+    if not lines:
+        return None
+    # Body text size: the size most characters on the page are set in
+    sizes = Counter()
+    for line in lines:
+        sizes[round(line["size"], 1)] += line["chars"]
+    body_size = sizes.most_common(1)[0][0]
+
+    prominent = [
+        line for line in lines
+        if line["y0"] <= line["page_height"] * LAYOUT_TOP_FRACTION
+        and line["size"] >= body_size * LAYOUT_MIN_SIZE_RATIO
+        # Titles ("RESUME") and headings can be as large as the name; they are passed over
+        and not any(indicator in line["text"].lower() for indicator in NON_NAME_INDICATORS)
+        and line["text"].lower().strip(" :") not in SECTION_HEADINGS
+    ]
+    if not prominent:
+        return None
+    # Largest first, then bold, then highest on the page (then leftmost, for two columns)
+    prominent.sort(key=lambda line: (-line["size"], not line["bold"], line["y0"], line["x0"]))
+    best = prominent[0]
+    if not _looks_like_name(best["text"]):
+        return None
+    rivals = [
+        line for line in prominent[1:]
+        if abs(line["size"] - best["size"]) < 0.5 and line["bold"] == best["bold"] and _looks_like_name(line["text"])
+    ]
+    return None if rivals else best["text"]
+
+def extract_names(texts, batch_size=NER_BATCH_SIZE, n_process=NER_PROCESSES, traces=None, layouts=None):
+    """
+    Extract candidate names from many texts at once. When the first-page
+    layout of a text is given (layouts, from extract_text_from_pdf) and
+    singles out a name, that name is used. Otherwise the rule-based candidates
+    are found, and NER runs through nlp.pipe in batches, only for the
+    texts whose best rule-based candidate scores below NER_SKIP_SCORE.
+    With traces (one metrics.Trace per text), the time of each step is recorded;
+    NER time is shared evenly between the texts of the batch.
+    """
+    names = [None] * len(texts)
+    pending = []  # (index, cleaned lines, rule-based candidates) of texts that need NER
+    for index, text in enumerate(texts):
+        if not text or len(text.strip()) == 0: # If text extraction fails
+            names[index] = "Text extraction failed"
+            continue
+        if layouts and layouts[index]:
+            with stage(traces[index] if traces else None, "name_layout"):
+                name = _layout_name(layouts[index])
+            if name:
+                names[index] = name
+                continue
+        with stage(traces[index] if traces else None, "name_rules"):
+            cleaned_lines = _cleaned_lines(text)
+            before, after = _rule_based_candidates(cleaned_lines)
+        best_score = max((score for _, score, _ in before + after), default=None)
+        if best_score is not None and best_score >= NER_SKIP_SCORE:
+            names[index] = _best_name(before + after)
+        else:
+            pending.append((index, cleaned_lines, (before, after)))
+
+    if pending:
+        nlp = get_nlp()
+        start = time.perf_counter()
+        docs = nlp.pipe(
+            (_ner_section(cleaned_lines) for _, cleaned_lines, _ in pending),
+            batch_size=batch_size,
+            n_process=n_process,
+        )
+        for (index, _, (before, after)), doc in zip(pending, docs):
+            names[index] = _best_name(before + _ner_candidates(doc) + after)
+        if traces:
+            share = (time.perf_counter() - start) / len(pending)
+            for index, _, _ in pending:
+                traces[index].add("ner", share)
+    return names
+
+def extract_name(text):
+    """
+    Extract candidate name from text using multiple methods,
+    with improved handling for different resume layouts
+    """
+    return extract_names([text])[0]
+
+def extract_name_from_pdf(pdf_path):
+    """
+    Extract candidate name from a PDF file
+    """
+    layout = [] if NAME_FROM_LAYOUT else None
+    text = extract_text_from_pdf(pdf_path, layout=layout)# Extract text from the given PDF file
+    return extract_names([text], layouts=[layout])[0]
+
+def _pattern_phrases(pattern):
+    """
+    The phrases of a "(A|B\.?C|...)" pattern, lowercased, with each optional
+    dot spelled both ways ("B\.?Tech" -> "btech", "b.tech")
+    """
+    body = pattern.pattern
+    body = body[body.index("(") + 1:body.rindex(")")]
+    phrases = set()
+    for alternative in body.split("|"):
+        spellings = [""]
+        for part in re.split(r"(\\\.\??)", alternative):
+            if part == r"\.?":
+                spellings = [spelling + dot for spelling in spellings for dot in ("", ".")]
+            elif part == r"\.":
+                spellings = [spelling + "." for spelling in spellings]
+            elif re.search(r"[\\()\[\]{}?*+^$]", part):
+                raise ValueError(f"Not a plain phrase in {pattern.pattern[:30]}...: {alternative}")
+            else:
+                spellings = [spelling + part for spelling in spellings]
+        phrases.update(spelling.lower() for spelling in spellings if spelling)
+    return phrases
+
+
+# Optional month before the year of a date range
+_MONTH = r'(?:(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Sept|Oct|Nov|Dec)\s+)?'
+
+# Every field found in running text, as one alternation of named groups, so a
+# resume is scanned once instead of once per pattern. Qualifications and job
+# titles are compiled into tries (as the skill matcher is), so the engine
+# follows one branch per character instead of trying each of several hundred
+# phrases. Matches do not overlap: the first branch that matches at a position
+# wins and the scan resumes after it, so e.g. the "ms" of an email address is
+# not also read as a qualification.
+FIELD_SCANNER = re.compile(
+    # Contact details; an email starts at the start of its local part, not anywhere inside it
+    r'(?P<email>(?<![a-zA-Z0-9._%+-])[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})'
+    r'|(?P<phone>\b\d{10}\b)'  # Expects a 10-digit number
+    # Date ranges ("2018 - 2022", "Jan 2018 - Present") and explicit "5 years of experience"
+    r'|' + _MONTH + r'(?P<start>\d{4})\s*[-–to]+\s*' + _MONTH + r'(?P<end>\d{4}|Present|Current)'
+    r'|(?P<years>\d+)\s*(?:years?|yrs?)\s*(?:of\s+)?experience'
+    r'|\b(?P<qualification>' + trie_pattern(_pattern_phrases(QUALIFICATION_PATTERN)) + r')\b'
+    r'|(?P<job_title>' + trie_pattern(_pattern_phrases(JOB_TITLE_PATTERN)) + r')',
+    re.IGNORECASE
+)
+
+
+# Short degree abbreviations that are also words or places (qualifications.AMBIGUOUS_ABBREVIATIONS)
+# only count in capitals and in a degree context: dotted ("M.A."), followed by a field ("MS in
+# Finance", "BE (Mechanical)"), after "degree", "qualification" or another degree ("B.Tech, MS"), or
+# on a line of an education or certification section. A state after a city ("Los Angeles, CA 90210")
+# never counts.
+_DEGREE_BEFORE = re.compile(r'(?:degree|qualification|graduated with)s?\s*(?:in|of)?\s*[:\-–]?\s*$', re.IGNORECASE)
+_DEGREE_AFTER = re.compile(r'[ \t]*(?:\(|(?:in|of)[ \t]+[A-Z])')
+_ADDRESS_BEFORE = re.compile(r'[A-Za-z][ \t]*,[ \t]*$')
+_ADDRESS_AFTER = re.compile(r'[ \t]*(?:\d{5}\b|[|,•]|$)', re.MULTILINE)
+
+# A section heading: a short line of words alone ("EDUCATION", "Academic Qualifications:")
+_HEADING = re.compile(r'^[ \t]*([A-Za-z][A-Za-z &/]{2,40}?)[ \t]*:?[ \t]*$', re.MULTILINE)
+_QUALIFICATION_HEADING = re.compile(
+    r'\b(?:education(?:al)?|academics?|qualifications?|degrees?|certifications?|certificates?|licen[cs]es?)\b',
+    re.IGNORECASE
+)
+_OTHER_HEADING = re.compile(
+    r'\b(?:experience|employment|work|skills?|abilities|projects?|summary|profile|objective|contacts?|languages?|'
+    r'interests|hobbies|achievements|awards|references|publications|activities|volunteering|personal|strengths|'
+    r'trainings?|internships?|career)\b',
+    re.IGNORECASE
+)
+
+
+def _qualification_sections(text):
+    # (start, end) of every education or certification section: from its heading to the next heading
+    sections = []
+    start = None
+    for heading in _HEADING.finditer(text):
+        title = heading.group(1)
+        if len(title.split()) > 4:
+            continue
+        if _QUALIFICATION_HEADING.search(title):
+            if start is None:
+                start = heading.end()
+        elif _OTHER_HEADING.search(title) and start is not None:
+            sections.append((start, heading.start()))
+            start = None
+    if start is not None:
+        sections.append((start, len(text)))
+    return sections
+
+
+def _in_degree_context(text, match, sections, after_qualification):
+    # Whether an ambiguous abbreviation is meant as a degree (by the rules above _DEGREE_BEFORE);
+    # after_qualification: it follows another qualification, as in "B.Tech, MS"
+    name = match.group()
+    if not name.replace(".", "").isupper():
+        return False
+    if "." in name or after_qualification:
+        return True
+    start, end = match.span()
+    line_start = text.rfind("\n", 0, start) + 1
+    if _ADDRESS_BEFORE.search(text, line_start, start) and _ADDRESS_AFTER.match(text, end):
+        return False
+    if _DEGREE_AFTER.match(text, end) or _DEGREE_BEFORE.search(text, line_start, start):
+        return True
+    return any(section_start <= start < section_end for section_start, section_end in sections)
+
+
+def _merged_years(ranges):
+    # Years covered by (start, end) ranges, with overlapping ranges merged so that
+    # concurrent jobs (or a job listed twice) are counted once
+    total = 0
+    merged_start = merged_end = None
+    for start, end in sorted(ranges):
+        if merged_end is not None and start <= merged_end:
+            merged_end = max(merged_end, end)
+            continue
+        if merged_end is not None:
+            total += merged_end - merged_start
+        merged_start, merged_end = start, end
+    if merged_end is not None:
+        total += merged_end - merged_start
+    return total
+
+
+def scan_fields(text):
+    """
+    Scan the text once for contact details, experience, qualifications and job
+    titles. Returns a dict with the first phone and email ("Not Found" if
+    none), the years of experience, and the distinct qualifications and job
+    titles in the order they appear.
+    """
+    phone = email = None
+    explicit_years = None
+    ranges = []
+    found_qualifications = {}  # Used as an ordered set
+    sections = None  # Education sections, found once an ambiguous abbreviation needs them
+    qualification_end = None  # End of the last qualification taken
+    job_titles = {}
+    current_year = datetime.datetime.now().year  # End year of "Present" or "Current"
+    for match in FIELD_SCANNER.finditer(text):
+        kind = match.lastgroup
+        if kind == "qualification":
+            name = match.group(kind)
+            if qualifications.is_ambiguous(name):
+                if sections is None:
+                    sections = _qualification_sections(text)
+                after_qualification = (qualification_end is not None
+                                       and text[qualification_end:match.start()].strip() in (",", "/", "&"))
+                if not _in_degree_context(text, match, sections, after_qualification):
+                    continue
+            found_qualifications[name] = None
+            qualification_end = match.end()
+        elif kind == "job_title":
+            job_titles[match.group(kind)] = None
+        elif kind == "email":
+            email = email or match.group(kind)
+        elif kind == "phone":
+            phone = phone or match.group(kind)
+        elif kind == "years":
+            if explicit_years is None:  # The first statement, usually the summary's
+                explicit_years = int(match.group(kind))
+        else:
+            start_year = int(match.group("start"))
+            end = match.group("end")
+            end_year = current_year if end.lower() in ("present", "current") else int(end)
+            if end_year >= start_year:  # Skip ranges that end before they start
+                ranges.append((start_year, end_year))
+
+    # A summary's "N years of experience" usually restates the listed jobs, so the
+    # two are not added up; the larger one is kept
+    experience = max(explicit_years or 0, _merged_years(ranges))
+    return {
+        "phone": phone or "Not Found",
+        "email": email or "Not Found",
+        "experience": experience,
+        "qualifications": list(found_qualifications),
+        "job_titles": list(job_titles),
+    }
+
+def extract_qualifications(text):
+    return scan_fields(text)["qualifications"]
+
+def extract_skills(text):
+    # One scan over the text finds every dictionary skill (and alias) at once
+    return skill_matcher.find(text)
+
+def extract_job_titles(text):
+    return scan_fields(text)["job_titles"]
+
+def extract_experience(text):
+    """
+    Extracts total years of experience from resume text.
+    Handles:
+    - Explicit mentions like "5 years of experience"
+    - Date ranges (e.g., "2018 - 2022", "Jan 2018 - Present"), with overlapping ranges counted once
+    - Both year-only and month-year formats
+    Returns: Total years of experience (integer).
+    """
+    return scan_fields(text)["experience"]
+
+# Bump when the experience calculation changes, so /reextract/ recomputes the experience of stored resumes
+EXPERIENCE_EXTRACTOR_VERSION = "2"
+
+# Bump when the qualification rules of scan_fields change (beyond the pattern and the taxonomy)
+QUALIFICATION_EXTRACTOR_VERSION = "2"
+
+
+def _pattern_version(*patterns):
+    # Short hash of regex sources, so adding an entry to a pattern changes the version by itself
+    return hashlib.sha256("\0".join(pattern.pattern for pattern in patterns).encode("utf-8")).hexdigest()[:8]
+
+
+def field_versions(refresh=False):
+    """
+    Version of each field extractor that works from the text alone (see
+    FIELD_EXTRACTORS). Stored with every resume; /reextract/ reruns the
+    extractors whose version differs from the stored one. With refresh, an
+    edited skill dictionary is picked up at once instead of within
+    SKILL_RELOAD_INTERVAL.
+    """
+    if refresh:
+        skill_matcher.refresh()
+    # Every one of them reads the field scanner's matches, which change together
+    scanner = _pattern_version(FIELD_SCANNER)
+    return {
+        "contacts": scanner,
+        "experience": f"{scanner}+{EXPERIENCE_EXTRACTOR_VERSION}",
+        # Stored with the level and canonical degrees of the qualification taxonomy
+        "qualification": f"{scanner}+{QUALIFICATION_EXTRACTOR_VERSION}+taxonomy.{qualifications.VERSION}",
+        "skills": f"{scanner}+dictionary.{skill_matcher.version}",
+    }
+
+
+def get_extractor_version():
+    """
+    Version of the whole pipeline, including every field extractor and the
+    current skill dictionary, so editing skills.json or a pattern also
+    invalidates cached extraction results
+    """
+    return EXTRACTOR_VERSION + "".join(f"+{field}.{version}" for field, version in sorted(field_versions().items()))
+
+# Each field extractor takes the text and its scan_fields() result (scanned when
+# not given), so the extractors of one resume share a single scan
+
+def _contacts(text, scanned=None, trace=None):
+    # Phone number and email: the first of each in the text
+    scanned = scanned or scan_fields(text)
+    return {"phone": scanned["phone"], "email": scanned["email"]}
+
+def _experience(text, scanned=None, trace=None):
+    # Years of experience, from the date ranges and explicit statements
+    scanned = scanned or scan_fields(text)
+    return {"experience": scanned["experience"]}
+
+def _qualification(text, scanned=None, trace=None):
+    scanned = scanned or scan_fields(text)
+    qualifications = scanned["qualifications"]
+    return {"qualification": ", ".join(qualifications) if qualifications else "Not Found"}
+
+def _skills(text, scanned=None, trace=None):
+    scanned = scanned or scan_fields(text)
+     # Extract skills using a predefined function
+    with stage(trace, "skills"):
+        skills = extract_skills(text)
+     # Combine extracted job titles with skills for better matching
+    return {"skills": ",".join(skills + scanned["job_titles"])}  # Convert skill list to a comma-separated string
+
+# Extractors of the fields that only need the text (the name also needs the PDF's layout),
+# by the name used in field_versions(); each returns a dict of Resume column values
+FIELD_EXTRACTORS = {
+    "contacts": _contacts,
+    "experience": _experience,
+    "qualification": _qualification,
+    "skills": _skills,
+}
+
+def _entities_from_text(text, name, trace=None):
+    entities = {"name": name}
+    with stage(trace, "fields"):
+        scanned = scan_fields(text)  # One scan for every field but the skills
+    for extractor in FIELD_EXTRACTORS.values():
+        entities.update(extractor(text, scanned, trace))
+    with stage(trace, "minhash"):
+        # Signature of the text, so the writer finds near-duplicate resumes without reading it again
+        entities["minhash"] = minhash.encode(minhash.signature(text))
+    entities["text"] = text  # Full text, stored compressed for full-text search
+    return entities
+
+def extract_entities(file_path, trace=None):
+    # Extract text with the configured backend chain (PyMuPDF first, falling back on poor output)
+    layout = [] if NAME_FROM_LAYOUT else None  # Filled with the first page's typography
+    pages = extract_pages_from_pdf(file_path, trace=trace, layout=layout)
+    text = "\n".join(pages)
+ # Extract candidate name from the layout, or with the text heuristics and NLP
+    name = extract_names([text], traces=[trace] if trace is not None else None, layouts=[layout])[0]
+    return _entities_from_text(text, name, trace)
+
+def extract_entities_batch(file_paths):
+    """
+    Extract entities from several files, with NER for all of them run as one
+    nlp.pipe batch. Returns one (status, value, stage timings) triple per file,
+    ("ok", entities, ...) or ("error", message, ...), so a file that cannot be
+    read does not fail the rest of the batch. The timings (seconds per stage)
+    are sent back to the server, which keeps the metrics.
+    """
+    traces = [Trace() for _ in file_paths]
+    pages = []
+    layouts = []
+    errors = {}
+    for index, file_path in enumerate(file_paths):
+        layouts.append([] if NAME_FROM_LAYOUT else None)  # Filled with the first page's typography
+        try:
+            pages.append(extract_pages_from_pdf(file_path, trace=traces[index], layout=layouts[index]))
+        except Exception as e:
+            errors[index] = str(e) or e.__class__.__name__
+            pages.append([])
+    texts = ["\n".join(file_pages) for file_pages in pages]
+
+    outcomes = []
+    names = extract_names(texts, traces=traces, layouts=layouts)
+    for index, (text, name) in enumerate(zip(texts, names)):
+        trace = traces[index]
+        if index in errors:
+            outcomes.append(("error", errors[index], trace.stages))
+            continue
+        try:
+            outcomes.append(("ok", _entities_from_text(text, name, trace), trace.stages))
+        except Exception as e:
+            outcomes.append(("error", str(e) or e.__class__.__name__, trace.stages))
+    return outcomes
+
+def reextract_batch(rows):
+    """
+    Rerun field extractors on stored resume text, without the PDFs. rows are
+    (resume id, zlib-compressed text as stored in resume_texts, field names)
+    triples; returns one (resume id, status, value) triple per row, with
+    ("ok", new column values) or ("error", message).
+    """
+    skill_matcher.refresh()  # Match with the dictionary whose version the server stamps on the rows
+    outcomes = []
+    for resume_id, compressed, fields in rows:
+        try:
+            text = zlib.decompress(compressed).decode("utf-8")
+            scanned = scan_fields(text)
+            values = {}
+            for field in fields:
+                values.update(FIELD_EXTRACTORS[field](text, scanned))
+            outcomes.append((resume_id, "ok", values))
+        except Exception as e:
+            outcomes.append((resume_id, "error", str(e) or e.__class__.__name__))
+    return outcomes
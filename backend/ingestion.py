@@ -0,0 +1,548 @@
+"""
+Background ingestion queue for uploaded resumes.
+
+Every upload becomes a job. Files are parsed in batches by
+extract_entities_batch in a pool of worker processes, so PDF parsing and spaCy
+never run on the event loop and NER runs over many resumes per nlp.pipe call.
+A single writer thread stores the results as they come back.
+
+Files are identified by the SHA-256 of their content: a file that is already
+stored is linked to its existing resume, and extraction results are cached per
+(content hash, extractor version) so re-uploads are never parsed twice.
+"""
+import os
+import json
+import math
+import queue
+import threading
+import time
+import uuid
+import datetime
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from database import SessionLocal, Resume, ExtractionCache, IngestionJobState, bump_dataset_version
+from extraction import extract_entities_batch, field_versions, get_extractor_version
+from qualification_index import index_resume_qualifications
+from skill_index import index_resume_skills
+import duplicates
+import leases
+import metrics
+import minhash
+import search
+import semantic
+
+
+# Number of worker processes parsing resumes (defaults to one per CPU core)
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", "0")) or (os.cpu_count() or 1)
+
+# Maximum number of files parsed together by one worker task (their NER runs as one batch).
+# Small uploads are split further so every worker gets a share.
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "16"))
+
+# Maximum number of parsed resumes written in a single database commit
+WRITE_BATCH_SIZE = int(os.getenv("INGEST_WRITE_BATCH_SIZE", "50"))
+
+# Number of finished jobs kept in memory for /jobs/{id} lookups
+MAX_FINISHED_JOBS = int(os.getenv("INGEST_MAX_FINISHED_JOBS", "500"))
+
+# Save job progress in the database, so any server worker process can answer /jobs/{id}
+# (server.py turns this on when it runs more than one worker)
+SHARED_JOB_STATE = os.getenv("INGEST_SHARED_JOB_STATE", "false").lower() in ("1", "true", "yes")
+
+# Seconds between saves of a running job's progress, and hours saved jobs are kept
+JOB_SAVE_INTERVAL = float(os.getenv("INGEST_JOB_SAVE_INTERVAL", "1"))
+JOB_RETENTION_HOURS = float(os.getenv("INGEST_JOB_RETENTION_HOURS", "24"))
+
+# Seconds the server waits at shutdown for queued files to be stored before dropping the rest
+SHUTDOWN_GRACE_SECONDS = float(os.getenv("INGEST_SHUTDOWN_GRACE_SECONDS", "30"))
+
+_executor = None
+_executor_lock = threading.Lock()
+
+_results = queue.Queue()  # Finished futures waiting to be written to the database
+_writer_thread = None
+
+_jobs = {}  # job id -> IngestionJob
+_jobs_lock = threading.Lock()
+_save_lock = threading.Lock()  # Job progress is saved one job at a time, so a newer state is never overwritten
+
+metrics.Gauge(
+    "hireai_ingest_pending_files", "Files of registered jobs still waiting for extraction",
+    lambda: sum(job.pending for job in list(_jobs.values())),
+)
+
+
+class IngestionJob:
+    """
+    Tracks the progress of one upload, file by file
+    """
+
+    def __init__(self, filenames=(), open_ended=False, trace=False):
+        self.id = uuid.uuid4().hex
+        self.created_at = datetime.datetime.utcnow().isoformat()
+        self.finished_at = None
+        self.files = []
+        self.submitted = {}  # content hash -> (future, position), so identical files in one job are parsed once
+        # An open-ended job (e.g. an archive being unpacked) keeps receiving files until close()
+        self.receiving = open_ended
+        self.error = None  # Job-level error, e.g. an unreadable archive
+        self.trace = trace  # Keep the extraction stage timings of every file
+        self.saved_at = 0.0  # When the progress was last saved (see save_job)
+        self._lock = threading.Lock()
+        self.add_files(filenames)
+
+    def add_files(self, filenames, status="queued", error=None):
+        """
+        Append files to the job; returns the index of the first one
+        """
+        with self._lock:
+            start = len(self.files)
+            for filename in filenames:
+                entry = {"filename": filename, "status": status, "resume_id": None, "error": error, "cached": False}
+                if self.trace:
+                    entry["trace"] = None
+                self.files.append(entry)
+                if status != "queued":
+                    metrics.INGESTED_FILES.inc(outcome=status)
+            return start
+
+    def close(self):
+        # No more files will be added
+        with self._lock:
+            self.receiving = False
+            self._check_finished()
+
+    def mark(self, index, status, resume_id=None, error=None, cached=False, timings=None):
+        with self._lock:
+            self.files[index].update(status=status, resume_id=resume_id, error=error, cached=cached)
+            if self.trace and timings:
+                self.files[index]["trace"] = {
+                    "total_ms": round(sum(timings.values()) * 1000, 2),
+                    "stages_ms": {name: round(seconds * 1000, 2) for name, seconds in timings.items()},
+                }
+            self._check_finished()
+        metrics.INGESTED_FILES.inc(outcome=status)
+
+    def _check_finished(self):
+        if not self.receiving and self.processed == len(self.files) and not self.finished_at:
+            self.finished_at = datetime.datetime.utcnow().isoformat()
+
+    @property
+    def processed(self):
+        return sum(1 for f in self.files if f["status"] in ("done", "duplicate", "failed", "skipped"))
+
+    @property
+    def pending(self):
+        return len(self.files) - self.processed
+
+    @property
+    def status(self):
+        processed = self.processed
+        if processed == 0 and not self.receiving:
+            return "queued"
+        if processed < len(self.files) or self.receiving:
+            return "processing"
+        if self.error or any(f["status"] == "failed" for f in self.files):
+            return "completed_with_errors"
+        return "completed"
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                "job_id": self.id,
+                "status": self.status,
+                "total": len(self.files),
+                "processed": self.processed,
+                "failed": sum(1 for f in self.files if f["status"] == "failed"),
+                "duplicates": sum(1 for f in self.files if f["status"] == "duplicate"),
+                "skipped": sum(1 for f in self.files if f["status"] == "skipped"),
+                "created_at": self.created_at,
+                "finished_at": self.finished_at,
+                "error": self.error,
+                "files": [dict(f) for f in self.files],
+            }
+
+
+def get_executor():
+    """
+    Return the shared process pool, creating it on first use
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=INGEST_WORKERS)
+        return _executor
+
+
+def _ensure_writer():
+    # Start the writer thread on first use (or if it has died)
+    global _writer_thread
+    with _executor_lock:
+        if _writer_thread is None or not _writer_thread.is_alive():
+            _writer_thread = threading.Thread(target=_write_results, name="ingestion-writer", daemon=True)
+            _writer_thread.start()
+
+
+def wait_until_idle(timeout=SHUTDOWN_GRACE_SECONDS):
+    """
+    Wait up to timeout seconds until every file queued in this process has
+    been stored; returns whether it has
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        with _jobs_lock:
+            jobs = list(_jobs.values())
+        if not any(job.pending for job in jobs):
+            return True
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(0.2)
+
+
+def shutdown():
+    """
+    Stop the worker processes; queued files that have not started are dropped
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+def reset_broken_executor(executor):
+    # A worker that crashes (e.g. on a malformed PDF) breaks the whole pool,
+    # so drop it and let the next submission start a fresh one
+    global _executor
+    with _executor_lock:
+        if _executor is executor:
+            _executor = None
+
+
+def submit_job(files, job=None, trace=False):
+    """
+    Queue a list of (filename, file_path, content_hash) tuples for extraction and return the job.
+    Passing an open-ended job adds the files to it instead of starting a new one.
+    With trace, the job reports the extraction stage timings of every file it parses.
+    """
+    new_job = job is None
+    if new_job:
+        job = start_job(trace=trace)
+    first_index = job.add_files([filename for filename, _, _ in files])
+
+    # Look up every hash in the upload at once: files already stored or
+    # already extracted by the current extractor skip the worker pool
+    hashes = {content_hash for _, _, content_hash in files}
+    db = SessionLocal()
+    try:
+        stored = {
+            row.content_hash
+            for row in db.query(Resume.content_hash).filter(Resume.content_hash.in_(hashes))
+        }
+        cached = {
+            entry.content_hash: cached_entities(entry)
+            for entry in db.query(ExtractionCache).filter(
+                ExtractionCache.content_hash.in_(hashes - stored),
+                ExtractionCache.extractor_version == get_extractor_version(),
+            )
+        }
+    finally:
+        db.close()
+
+    # Files that need parsing, one per distinct hash so identical files in one job are parsed once
+    submitted = job.submitted  # content hash -> (future, position of the file in the future's batch)
+    to_parse = {}
+    for _, file_path, content_hash in files:
+        if content_hash not in stored and content_hash not in cached and content_hash not in submitted:
+            to_parse.setdefault(content_hash, file_path)
+
+    executor = None
+    if to_parse:
+        executor = get_executor()
+        pending = list(to_parse.items())
+        batch_size = max(1, min(INGEST_BATCH_SIZE, math.ceil(len(pending) / INGEST_WORKERS)))
+        for start in range(0, len(pending), batch_size):
+            chunk = pending[start:start + batch_size]
+            paths = [file_path for _, file_path in chunk]
+            try:
+                future = executor.submit(extract_entities_batch, paths)
+            except BrokenProcessPool:
+                reset_broken_executor(executor)
+                executor = get_executor()
+                future = executor.submit(extract_entities_batch, paths)
+            future.add_done_callback(lambda f, paths=paths: _observe_timings(f, paths))
+            for position, (content_hash, _) in enumerate(chunk):
+                submitted[content_hash] = (future, position)
+
+    for index, (_, file_path, content_hash) in enumerate(files, start=first_index):
+        if content_hash in stored:
+            (future, position), source = (_resolved(None), 0), "existing"
+        elif content_hash in cached:
+            (future, position), source = (_resolved(cached[content_hash]), 0), "cache"
+        else:
+            (future, position), source = submitted[content_hash], "parsed"
+        # Hand the finished future over to the writer thread
+        item = (job, index, file_path, content_hash, source, executor, position)
+        future.add_done_callback(lambda f, item=item: _results.put(item + (f,)))
+    _ensure_writer()
+    save_job(job, force=new_job)
+    return job
+
+
+def _resolved(value):
+    # A finished future shaped like an extract_entities_batch result, for files that need no parsing
+    future = Future()
+    future.set_result([("ok", value, None)])
+    return future
+
+
+def _observe_timings(future, paths):
+    # Record the stage timings of a parsed batch once, however many jobs wait on it
+    if future.cancelled() or future.exception() is not None:
+        return
+    for file_path, (_, _, timings) in zip(paths, future.result()):
+        total = metrics.observe_extraction(timings)
+        if metrics.SLOW_EXTRACTION_SECONDS and total >= metrics.SLOW_EXTRACTION_SECONDS:
+            stages = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in timings.items())
+            print(f"Slow extraction ({total:.1f}s) for {file_path}: {stages}")
+
+
+def start_job(open_ended=False, trace=False):
+    """
+    Create and register an empty job; open-ended jobs receive files until closed
+    """
+    job = IngestionJob(open_ended=open_ended, trace=trace)
+    register_job(job)
+    save_job(job, force=True)
+    return job
+
+
+def get_job(job_id):
+    with _jobs_lock:
+        return _jobs.get(job_id)
+
+
+def get_job_status(job_id):
+    """
+    Progress of a job (IngestionJob.to_dict), or None if it is unknown. Jobs
+    running in another server worker are read from their saved state.
+    """
+    job = get_job(job_id)
+    if job is not None:
+        return job.to_dict()
+    if not SHARED_JOB_STATE:
+        return None
+    db = SessionLocal()
+    try:
+        state = db.get(IngestionJobState, job_id)
+        return json.loads(state.data) if state else None
+    finally:
+        db.close()
+
+
+def save_job(job, force=False):
+    """
+    Save the job's progress for the other server workers (only with SHARED_JOB_STATE).
+    A running job is saved at most once per JOB_SAVE_INTERVAL unless forced;
+    a finished one is always saved.
+    """
+    if not SHARED_JOB_STATE:
+        return
+    with _save_lock:
+        now = time.monotonic()
+        if not force and not job.finished_at and now - job.saved_at < JOB_SAVE_INTERVAL:
+            return
+        job.saved_at = now
+        db = SessionLocal()
+        try:
+            db.merge(IngestionJobState(id=job.id, data=json.dumps(job.to_dict()), updated_at=datetime.datetime.utcnow()))
+            if force:
+                # Saved jobs are only kept for a while; new jobs clear out the old ones
+                cutoff = datetime.datetime.utcnow() - datetime.timedelta(hours=JOB_RETENTION_HOURS)
+                db.query(IngestionJobState).filter(IngestionJobState.updated_at < cutoff).delete()
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            print(f"Could not save the progress of job {job.id}: {e}")  # /jobs/{id} only lags behind
+        finally:
+            db.close()
+
+
+def register_job(job):
+    """
+    Track a job (an IngestionJob, or any job with the same id, finished_at,
+    pending, saved_at and to_dict()) so /jobs/{id} can report it
+    """
+    with _jobs_lock:
+        _jobs[job.id] = job
+        # Forget the oldest finished jobs once too many have piled up
+        finished = [j for j in _jobs.values() if j.finished_at]
+        for old in finished[:max(len(finished) - MAX_FINISHED_JOBS, 0)]:
+            del _jobs[old.id]
+
+
+def cache_entry(content_hash, extracted):
+    """
+    ExtractionCache row for an extract_entities result. The text is kept
+    compressed in its own column rather than a second, plain copy inside the
+    JSON, and the MinHash signature is left out (cached_entities recomputes it).
+    """
+    fields = {key: value for key, value in extracted.items() if key not in ("text", "minhash")}
+    text = extracted.get("text")
+    return ExtractionCache(
+        content_hash=content_hash,
+        extractor_version=get_extractor_version(),
+        result=json.dumps(fields),
+        text=search.compress_text(text) if text else None,
+    )
+
+
+def cached_entities(entry):
+    """
+    The extract_entities result an ExtractionCache row was made from
+    """
+    extracted = json.loads(entry.result)
+    if entry.text is not None:
+        extracted["text"] = search.decompress_text(entry.text)
+    if "minhash" not in extracted:
+        extracted["minhash"] = minhash.encode(minhash.signature(extracted.get("text")))
+    return extracted
+
+
+def resume_from_extracted(extracted, file_path, content_hash=None):
+    """
+    Build a Resume row from the dictionary returned by extract_entities
+    """
+    return Resume(
+        name=extracted["name"],  # Extracted candidate name
+        phone=extracted["phone"],  # Extracted phone number
+        email=extracted["email"],  # Extracted email
+        qualification=extracted["qualification"],  # Extracted qualification
+        skills=extracted["skills"],  # Extracted skills
+        experience=extracted["experience"],  # Extracted experience
+        file_path=file_path,  # Store file path for reference
+        content_hash=content_hash,  # Hash of the file content for de-duplication
+        extractor_versions=json.dumps(field_versions(), sort_keys=True),  # Lets /reextract/ find stale fields
+    )
+
+
+def _discard_duplicate(file_path, kept_path):
+    # The upload was saved before it was known to be a duplicate; keep only the stored copy
+    if os.path.abspath(file_path) != os.path.abspath(kept_path) and os.path.exists(file_path):
+        os.remove(file_path)
+
+
+def _reparse(job, index, file_path, content_hash):
+    # Send one file back through the worker pool; its result returns to the writer as a parsed file
+    if not os.path.exists(file_path):
+        job.mark(index, "failed", error="The stored resume and the uploaded file were both deleted")
+        return
+    executor = get_executor()
+    try:
+        future = executor.submit(extract_entities_batch, [file_path])
+    except BrokenProcessPool:
+        reset_broken_executor(executor)
+        executor = get_executor()
+        future = executor.submit(extract_entities_batch, [file_path])
+    future.add_done_callback(lambda f: _observe_timings(f, [file_path]))
+    item = (job, index, file_path, content_hash, "parsed", executor, 0)
+    future.add_done_callback(lambda f: _results.put(item + (f,)))
+
+
+def _write_results():
+    """
+    Writer loop: store finished extractions in batches, one commit per batch.
+    Each batch is written holding the write lease, which every server worker's
+    writer shares, so it can check for an existing resume and insert a new one
+    without racing other uploads of the same file.
+    """
+    while True:
+        batch = [_results.get()]  # Block until at least one file has finished
+        while len(batch) < WRITE_BATCH_SIZE:
+            try:
+                batch.append(_results.get_nowait())
+            except queue.Empty:
+                break
+
+        holder = leases.new_holder()
+        db = SessionLocal()
+        try:
+            leases.wait(leases.WRITE_LEASE, holder)
+            stored = []  # (job, index, resume, outcome, cached, stage timings)
+            by_hash = {}  # content hash -> Resume stored earlier in this batch
+            texts = {}  # Resume -> extracted text, indexed for full-text search once ids are assigned
+            signatures = {}  # Resume -> encoded MinHash signature of its text (see minhash.py)
+            reparse = []  # (job, index, file_path, content_hash) whose stored resume vanished before linking
+            for job, index, file_path, content_hash, source, executor, position, future in batch:
+                if future.cancelled():
+                    job.mark(index, "failed", error="Cancelled")
+                    continue
+                error = future.exception()
+                if error is not None:
+                    if isinstance(error, BrokenProcessPool):
+                        reset_broken_executor(executor)
+                    job.mark(index, "failed", error=str(error) or error.__class__.__name__)
+                    continue
+                status, extracted, timings = future.result()[position]
+                if status == "error":
+                    job.mark(index, "failed", error=extracted, timings=timings)
+                    continue
+
+                # Link re-uploads to the resume that already holds this content
+                existing = by_hash.get(content_hash) or (
+                    db.query(Resume).filter(Resume.content_hash == content_hash).first()
+                )
+                if existing is not None:
+                    _discard_duplicate(file_path, existing.file_path)
+                    stored.append((job, index, existing, "duplicate", source != "parsed", timings))
+                    continue
+                if extracted is None:
+                    # Was already stored when queued, but deleted since (e.g. by /reset/): parse it after all
+                    reparse.append((job, index, file_path, content_hash))
+                    continue
+
+                if source == "parsed":
+                    # Remember the result so the same content is never parsed again
+                    db.merge(cache_entry(content_hash, extracted))
+                resume = resume_from_extracted(extracted, file_path, content_hash)
+                db.add(resume)
+                by_hash[content_hash] = resume
+                texts[resume] = extracted.get("text")
+                signatures[resume] = extracted.get("minhash")
+                stored.append((job, index, resume, "done", source == "cache", timings))
+
+            if by_hash:
+                with metrics.DB_WRITE_SECONDS.time(phase="index"):
+                    db.flush()  # Assign ids to the new resumes so their skills can be indexed
+                    index_resume_skills(db, by_hash.values())
+                    index_resume_qualifications(db, by_hash.values())
+                    # Near-duplicates and resumes with the same contact details join one group
+                    duplicates.group_resumes(db, [
+                        (resume.id, resume.email, resume.phone, minhash.decode(signatures.get(resume)))
+                        for resume in by_hash.values()
+                    ])
+                    search.index_texts(db, {resume.id: value for resume, value in texts.items()})
+                    semantic.index_texts(db, {resume.id: value for resume, value in texts.items()})
+                    bump_dataset_version(db)  # Cached rankings no longer cover every resume
+            with metrics.DB_WRITE_SECONDS.time(phase="commit"):
+                db.commit()  # Commit the whole batch at once
+            for job, index, resume, outcome, cached, timings in stored:
+                job.mark(index, outcome, resume_id=resume.id, cached=cached, timings=timings)
+            for job, index, file_path, content_hash in reparse:
+                _reparse(job, index, file_path, content_hash)
+            # Stored content is found in the database from now on; drop the finished
+            # futures (and their results) so long-running jobs do not accumulate them
+            for job, _, _, content_hash, source, *_ in batch:
+                if source == "parsed":
+                    job.submitted.pop(content_hash, None)
+        except Exception as e:
+            db.rollback()
+            for job, index, *_ in batch:
+                if job.files[index]["status"] == "queued":
+                    job.mark(index, "failed", error=f"Database error: {e}")
+        finally:
+            db.close()
+            leases.release(leases.WRITE_LEASE, holder)
+        for job in {item[0] for item in batch}:
+            save_job(job)
@@ -0,0 +1,125 @@
+"""
+Named leases kept in the database, held by one process at a time.
+
+The production server runs several worker processes (see server.py), each
+with its own ingestion writer and /reextract/ jobs. Work that must not run
+in two of them at once takes a lease: a row naming its holder until an
+expiry time. Taking a free lease is a single UPDATE or INSERT, so two
+processes can never both get it. A holder that dies without releasing its
+lease blocks the others only until the lease expires; holders that run for
+long renew it.
+"""
+import datetime
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from sqlalchemy import delete, insert, or_, select, update
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+
+from database import Lease, engine
+
+
+# Seconds a lease lasts unless renewed: the longest a crashed holder keeps the others waiting
+LEASE_SECONDS = 60
+
+# Seconds between attempts while waiting for a lease
+LEASE_POLL_SECONDS = 0.05
+
+# Storing resumes and their indexes (ingestion writer batches, /reextract/ batches, /reset/):
+# the existing-content check, new skill rows and the indexes each assume a single writer
+WRITE_LEASE = "resume-writes"
+
+# A running /reextract/ job (its id is the lease info)
+REEXTRACT_LEASE = "reextract"
+
+
+def new_holder():
+    """
+    A holder id unique to this process and call (forked workers share the master's ids otherwise)
+    """
+    return f"{os.getpid()}-{uuid.uuid4().hex}"
+
+
+def acquire(name, holder, info=None, seconds=LEASE_SECONDS):
+    """
+    Take the lease, or renew it if holder has it already; returns False while someone else holds it
+    """
+    now = datetime.datetime.utcnow()
+    values = {"holder": holder, "info": info, "expires_at": now + datetime.timedelta(seconds=seconds)}
+    with engine.begin() as conn:
+        taken = conn.execute(
+            update(Lease)
+            .where(Lease.name == name, or_(Lease.holder == holder, Lease.expires_at < now))
+            .values(**values)
+        ).rowcount
+    if taken:
+        return True
+    try:
+        with engine.begin() as conn:
+            conn.execute(insert(Lease).values(name=name, **values))
+    except IntegrityError:
+        return False  # Held by someone else (or taken between the two statements)
+    return True
+
+
+def wait(name, holder, info=None):
+    """
+    Take the lease, waiting for as long as someone else holds it
+    """
+    while not acquire(name, holder, info):
+        time.sleep(LEASE_POLL_SECONDS)
+
+
+def release(name, holder):
+    """
+    Give the lease up, if holder still has it
+    """
+    try:
+        with engine.begin() as conn:
+            conn.execute(delete(Lease).where(Lease.name == name, Lease.holder == holder))
+    except SQLAlchemyError as e:
+        print(f"Could not release the {name} lease (it expires by itself): {e}")
+
+
+def current_info(name):
+    """
+    The info of the lease's current holder, or None if it is free
+    """
+    with engine.connect() as conn:
+        return conn.execute(
+            select(Lease.info).where(Lease.name == name, Lease.expires_at >= datetime.datetime.utcnow())
+        ).scalar()
+
+
+def _keep_renewed(name, holder, info, stop):
+    # Renew the lease a few times per LEASE_SECONDS until stopped, so a block that runs longer
+    # than a lease (a /reset/ of a large dataset) keeps it. While the block holds SQLite's write
+    # lock the renewal waits or fails, but then nobody else can write the lease row either
+    while not stop.wait(LEASE_SECONDS / 3):
+        try:
+            if not acquire(name, holder, info):
+                print(f"The {name} lease expired and was taken by another holder")
+                return
+        except SQLAlchemyError:
+            continue  # Retried on the next round
+
+
+@contextmanager
+def held(name, info=None):
+    """
+    Wait for the lease, hold it (renewed) for the block, then release it
+    """
+    holder = new_holder()
+    wait(name, holder, info)
+    stop = threading.Event()
+    renewer = threading.Thread(target=_keep_renewed, args=(name, holder, info, stop), name=f"lease-{name}", daemon=True)
+    renewer.start()
+    try:
+        yield holder
+    finally:
+        stop.set()
+        renewer.join()
+        release(name, holder)
@@ -0,0 +1,382 @@
+"""
+In-process metrics in the Prometheus text format.
+
+Counters, gauges and histograms are kept in memory and rendered for the
+/metrics endpoint. Extraction runs in worker processes, so it does not update
+the histograms itself: each file's stage timings are collected in a Trace,
+sent back with its result, and observed by the ingestion writer in the server.
+
+When the production server runs several workers (see server.py), each worker
+saves its metrics to METRICS_DIR every few seconds and when it exits, and
+/metrics adds up the counters and histograms of every worker, including the
+ones already recycled. Gauges are combined over the running workers only.
+"""
+import glob
+import json
+import math
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager, nullcontext
+
+
+# Upper bounds (seconds) of the latency histogram buckets
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Files whose extraction takes at least this long are logged with their stage timings (0 disables)
+SLOW_EXTRACTION_SECONDS = float(os.getenv("SLOW_EXTRACTION_SECONDS", "10"))
+
+# Directory where every server worker saves its metrics, so /metrics covers all of them (set by
+# server.py when it runs several workers; unset, /metrics reports the answering process only)
+METRICS_DIR = os.getenv("METRICS_DIR")
+
+# Seconds between saves of a worker's metrics to METRICS_DIR
+METRICS_SAVE_INTERVAL = float(os.getenv("METRICS_SAVE_INTERVAL", "5"))
+
+# Counters and histograms of exited workers, merged into one file by the master (see retire)
+RETIRED_FILE = "retired.json"
+
+_registry = []  # Every metric, in the order they are rendered
+_saved_path = None  # This process's file in METRICS_DIR, named on the first save (after the fork)
+_save_lock = threading.Lock()
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _number(value):
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}  # label values -> value
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def snapshot(self):
+        # [label values, value] pairs, as saved to METRICS_DIR
+        with self._lock:
+            return [[list(key), value] for key, value in self._values.items()]
+
+    def combine(self, a, b):
+        # Values of the same series from two processes, added up
+        return a + b
+
+    def _samples(self, values=None):
+        if values is None:
+            with self._lock:
+                values = dict(self._values)
+        return [(self.name, _labels(self.labelnames, key), value) for key, value in sorted(values.items())]
+
+    def render(self, values=None):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(f"{name}{labels} {_number(value)}" for name, labels, value in self._samples(values))
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """
+    A value that only goes up (requests served, files ingested)
+    """
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    """
+    A value read from a function every time the metrics are rendered; across
+    server workers, the values of the running ones are combined by `merge`
+    """
+    kind = "gauge"
+
+    def __init__(self, name, documentation, function, merge=sum):
+        super().__init__(name, documentation)
+        self.function = function
+        self.merge = merge
+
+    def snapshot(self):
+        return [[[], self.function()]]
+
+    def _samples(self, values=None):
+        return [(self.name, "", self.function() if values is None else values[()])]
+
+
+class Histogram(_Metric):
+    """
+    Distribution of observed durations, as cumulative bucket counts plus their sum
+    """
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * len(self.buckets), 0.0))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            self._values[key] = (counts, total + value)
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def snapshot(self):
+        with self._lock:
+            return [[list(key), [list(counts), total]] for key, (counts, total) in self._values.items()]
+
+    def combine(self, a, b):
+        return [x + y for x, y in zip(a[0], b[0])], a[1] + b[1]
+
+    def _samples(self, values=None):
+        samples = []
+        if values is None:
+            with self._lock:
+                values = dict(self._values)
+        for key, (counts, total) in sorted(values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                samples.append((f"{self.name}_bucket", _labels(self.labelnames, key, [("le", _number(bound))]), cumulative))
+            samples.append((f"{self.name}_sum", _labels(self.labelnames, key), total))
+            samples.append((f"{self.name}_count", _labels(self.labelnames, key), cumulative))
+        return samples
+
+
+def render():
+    """
+    Every metric in the Prometheus text exposition format
+    """
+    if not METRICS_DIR:
+        return "\n".join(metric.render() for metric in _registry) + "\n"
+    merged = _merge_saved()
+    return "\n".join(metric.render(merged[metric.name]) for metric in _registry) + "\n"
+
+
+def _pid_running(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+@contextmanager
+def _dir_lock(exclusive=False):
+    # Readers share the lock; the master takes it alone while it moves a worker's file into RETIRED_FILE,
+    # so a scrape never counts that worker twice (or not at all). Imported here: fcntl is POSIX-only, and
+    # METRICS_DIR is only set by the preforking server.py, so main.py alone still runs on Windows
+    import fcntl
+
+    with open(os.path.join(METRICS_DIR, ".lock"), "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _read(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}  # Removed (its worker retired) or being replaced since it was listed
+
+
+def _worker_files():
+    # (pid, path) of every worker's saved metrics
+    files = []
+    for path in glob.glob(os.path.join(METRICS_DIR, "*-*.json")):
+        try:
+            files.append((int(os.path.basename(path).split("-")[0]), path))
+        except ValueError:
+            continue
+    return files
+
+
+def _combine(totals, metric, entries):
+    # Add saved [label values, value] pairs of a counter or histogram into totals
+    for key, value in entries:
+        key = tuple(key)
+        if isinstance(metric, Histogram):
+            value = (value[0], value[1])
+        totals[key] = metric.combine(totals[key], value) if key in totals else value
+
+
+def _merge_saved():
+    # metric name -> {label values: value} over every saved file. This process's values are saved
+    # first and read back like the others': each file only ever grows, so the totals never go down
+    # from one scrape to the next, whichever worker answers them (Prometheus would see a reset)
+    save()
+    snapshots = []
+    with _dir_lock():
+        for pid, path in _worker_files():
+            snapshots.append((pid, _read(path)))
+        snapshots.append((None, _read(os.path.join(METRICS_DIR, RETIRED_FILE))))
+
+    merged = {}
+    for metric in _registry:
+        if isinstance(metric, Gauge):
+            running = [snapshot[metric.name][0][1] for pid, snapshot in snapshots
+                       if metric.name in snapshot and pid is not None and _pid_running(pid)]
+            merged[metric.name] = {(): metric.merge(running)}
+            continue
+        totals = {}
+        for _, snapshot in snapshots:
+            _combine(totals, metric, snapshot.get(metric.name, []))
+        merged[metric.name] = totals
+    return merged
+
+
+def save():
+    """
+    Save this process's metrics to METRICS_DIR, for the /metrics of the other workers
+    """
+    global _saved_path
+    with _save_lock:
+        if _saved_path is None:
+            _saved_path = os.path.join(METRICS_DIR, f"{os.getpid()}-{uuid.uuid4().hex}.json")
+        temporary = _saved_path + ".tmp"
+        with open(temporary, "w") as f:
+            json.dump({metric.name: metric.snapshot() for metric in _registry}, f)
+        os.replace(temporary, _saved_path)  # Readers see the old or the new file, never half of one
+
+
+def _save_periodically():
+    while True:
+        time.sleep(METRICS_SAVE_INTERVAL)
+        try:
+            save()
+        except OSError as e:
+            print(f"Could not save the metrics of worker {os.getpid()}: {e}")
+
+
+def start_saving():
+    """
+    Save this worker's metrics every METRICS_SAVE_INTERVAL seconds (call save() once more on exit)
+    """
+    save()
+    threading.Thread(target=_save_periodically, name="metrics-save", daemon=True).start()
+
+
+def retire(pid):
+    """
+    Fold the saved counters and histograms of an exited worker into RETIRED_FILE
+    (called by the master, so the directory holds one file per running worker)
+    """
+    paths = [path for worker, path in _worker_files() if worker == pid]
+    if not paths:
+        return
+    retired_path = os.path.join(METRICS_DIR, RETIRED_FILE)
+    with _dir_lock(exclusive=True):
+        retired = _read(retired_path)
+        for path in paths:
+            saved = _read(path)
+            for metric in _registry:
+                if isinstance(metric, Gauge) or metric.name not in saved:
+                    continue
+                totals = {}
+                _combine(totals, metric, retired.get(metric.name, []))
+                _combine(totals, metric, saved[metric.name])
+                retired[metric.name] = [[list(key), list(value) if isinstance(value, tuple) else value]
+                                        for key, value in totals.items()]
+        with open(retired_path + ".tmp", "w") as f:
+            json.dump(retired, f)
+        os.replace(retired_path + ".tmp", retired_path)
+        for path in paths:
+            os.remove(path)
+
+
+class Trace:
+    """
+    Seconds spent in each extraction stage of one file. Cheap enough to be
+    collected for every file; only kept on the job when tracing was requested.
+    """
+
+    def __init__(self):
+        self.stages = {}
+
+    def add(self, stage, seconds):
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+
+def stage(trace, name):
+    # Time a stage into the trace, if there is one
+    return trace.stage(name) if trace is not None else nullcontext()
+
+
+# Extraction stages of each parsed file (observed by the ingestion writer)
+STAGE_SECONDS = Histogram(
+    "hireai_extraction_stage_seconds", "Time spent in each extraction stage per file", ["stage"]
+)
+EXTRACTION_SECONDS = Histogram("hireai_extraction_seconds", "Total extraction time per file")
+
+# Database writes of the ingestion writer, per batch
+DB_WRITE_SECONDS = Histogram(
+    "hireai_ingest_db_seconds", "Time spent storing a batch of extracted resumes", ["phase"]
+)
+
+# Files that reached a final state, by outcome (done, duplicate, failed, skipped)
+INGESTED_FILES = Counter("hireai_ingested_files_total", "Files processed by the ingestion queue", ["outcome"])
+
+# HTTP requests, by route template so path parameters do not create new series
+HTTP_REQUESTS = Counter("hireai_http_requests_total", "HTTP requests served", ["method", "route", "status"])
+HTTP_LATENCY = Histogram(
+    "hireai_http_request_duration_seconds", "Time until the response headers are sent", ["method", "route"]
+)
+
+
+def observe_extraction(stages):
+    """
+    Record the stage timings of one parsed file; returns its total extraction time
+    """
+    for name, seconds in stages.items():
+        STAGE_SECONDS.observe(seconds, stage=name)
+    total = sum(stages.values())
+    EXTRACTION_SECONDS.observe(total)
+    return total
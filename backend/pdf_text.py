@@ -0,0 +1,235 @@
+"""
+PDF text extraction engine.
+
+Every backend is a generator that takes a PDF path and yields the text of its
+pages one at a time, so a page is only parsed when it is asked for. The
+engine tries the configured backends in order (fastest first) and moves on to
+the next one when a backend fails or its output looks empty or garbled.
+Reading stops after PDF_MAX_PAGES pages, or once the file has used up its
+PDF_TIME_BUDGET_SECONDS, so a huge or adversarial PDF cannot hold a worker.
+
+The backend order is chosen per deployment with the PDF_BACKENDS environment
+variable, e.g. PDF_BACKENDS=pdfplumber,pymupdf.
+"""
+import os
+import re
+import time
+from contextlib import closing
+
+from metrics import stage
+
+
+def iter_pages_pymupdf(pdf_path, layout=None):
+    import fitz  # PyMuPDF library for handling PDFs
+    with fitz.open(pdf_path) as pdf:
+        for number, page in enumerate(pdf):
+            textpage = page.get_textpage(flags=fitz.TEXTFLAGS_TEXT)
+            if number == 0 and layout is not None:
+                # The first page's typography comes from the same parse as its text
+                layout.extend(_layout_lines(page.get_text("dict", textpage=textpage), page.rect.height))
+            yield page.get_text("text", textpage=textpage)
+
+
+def _layout_lines(page_dict, page_height):
+    """
+    Text lines of a page with their typography, from PyMuPDF's "dict" output:
+    dicts of text, size (largest font size in the line), bold, x0/y0 (top left),
+    character count and the page height
+    """
+    lines = []
+    for block in page_dict["blocks"]:
+        for line in block.get("lines", []):
+            spans = [span for span in line["spans"] if span["text"].strip()]
+            if not spans:
+                continue
+            lines.append({
+                "text": " ".join("".join(span["text"] for span in spans).split()),
+                "size": max(span["size"] for span in spans),
+                # Flag bit 4 is bold; some fonts only say so in their name
+                "bold": all(span["flags"] & 16 or "bold" in span["font"].lower() for span in spans),
+                "x0": line["bbox"][0],
+                "y0": line["bbox"][1],
+                "page_height": page_height,
+                "chars": sum(len(span["text"].strip()) for span in spans),
+            })
+    return lines
+
+
+def iter_pages_pdfplumber(pdf_path):
+    import pdfplumber  # Handles complex layouts well, but is the slowest backend
+    with pdfplumber.open(pdf_path) as pdf:
+        for page in pdf.pages:
+            yield page.extract_text() or ""
+            page.close()  # Free the parsed page objects before moving on
+
+
+def iter_pages_pypdf2(pdf_path):
+    import PyPDF2
+    with open(pdf_path, "rb") as file:
+        reader = PyPDF2.PdfReader(file)
+        for page in reader.pages:
+            yield page.extract_text() or ""
+
+
+# Registry of available backends, by the name used in PDF_BACKENDS
+PAGE_BACKENDS = {
+    "pymupdf": iter_pages_pymupdf,
+    "pdfplumber": iter_pages_pdfplumber,
+    "pypdf2": iter_pages_pypdf2,
+}
+
+
+def extract_with_pymupdf(pdf_path):
+    return "\n".join(iter_pages_pymupdf(pdf_path))
+
+
+def extract_with_pdfplumber(pdf_path):
+    return "\n".join(iter_pages_pdfplumber(pdf_path))
+
+
+def extract_with_pypdf2(pdf_path):
+    return "\n".join(iter_pages_pypdf2(pdf_path))
+
+
+# Whole-document text of each backend, without page or time limits (e.g. for benchmarks)
+BACKENDS = {
+    "pymupdf": extract_with_pymupdf,
+    "pdfplumber": extract_with_pdfplumber,
+    "pypdf2": extract_with_pypdf2,
+}
+
+# Backends that can also report the first page's typography (see extract_text_from_pdf)
+LAYOUT_BACKENDS = {"pymupdf"}
+
+# Fallback chain, fastest backend first
+DEFAULT_BACKEND_ORDER = "pymupdf,pdfplumber,pypdf2"
+PDF_BACKENDS = [
+    name.strip().lower()
+    for name in os.getenv("PDF_BACKENDS", DEFAULT_BACKEND_ORDER).split(",")
+    if name.strip()
+]
+for name in PDF_BACKENDS:
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown PDF backend in PDF_BACKENDS: {name}")
+
+# Pages read per file at most; the rest of a long document (e.g. a portfolio) is ignored
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "10"))
+
+# Seconds one file may spend in text extraction, over all backends; no further page is read once it is spent
+PDF_TIME_BUDGET_SECONDS = float(os.getenv("PDF_TIME_BUDGET_SECONDS", "20"))
+
+# Output shorter than this (in non-whitespace characters) counts as empty
+MIN_TEXT_CHARS = int(os.getenv("PDF_MIN_TEXT_CHARS", "50"))
+
+# Output scoring below this quality counts as garbled
+MIN_TEXT_QUALITY = float(os.getenv("PDF_MIN_TEXT_QUALITY", "0.8"))
+
+# Unmapped glyphs show up as "(cid:123)" in pdfminer-based output
+CID_PATTERN = re.compile(r"\(cid:\d+\)")
+
+# Characters that are expected in resume text besides letters and digits
+COMMON_PUNCTUATION = set(".,;:!?@+-_()[]/&'\"%#*|•–—’“”")
+
+
+def text_quality(text):
+    """
+    Score extracted text between 0 (unusable) and 1 (clean).
+    Penalises unmapped glyphs, replacement characters, unusual symbols and
+    run-together words that indicate a backend mangled the text layer.
+    """
+    characters = [c for c in text if not c.isspace()]
+    if not characters:
+        return 0.0
+
+    readable = sum(1 for c in characters if c.isalnum() or c in COMMON_PUNCTUATION)
+    score = readable / len(characters)
+
+    # Every "(cid:N)" stands for one lost character
+    score -= 6 * len(CID_PATTERN.findall(text)) / len(characters)
+    score -= text.count("\ufffd") / len(characters)
+
+    # Words glued together ("JohnDoeSoftwareEngineer") come from missing spaces
+    words = text.split()
+    long_words = sum(1 for word in words if len(word) > 30)
+    score -= long_words / len(words)
+
+    return max(score, 0.0)
+
+
+def is_usable(text):
+    """
+    Whether the text is long enough and clean enough to parse
+    """
+    if len(text) - sum(1 for c in text if c.isspace()) < MIN_TEXT_CHARS:
+        return False
+    return text_quality(text) >= MIN_TEXT_QUALITY
+
+
+def _read_pages(pages, max_pages, deadline):
+    """
+    Consume a page generator until it ends, max_pages pages have been read or
+    the deadline (a time.perf_counter value) has passed. The generator is
+    closed afterwards, which closes the document. Returns (texts, out of time).
+    """
+    texts = []
+    with closing(pages):
+        for text in pages:
+            texts.append(text)
+            if time.perf_counter() >= deadline:
+                return texts, True
+            if len(texts) >= max_pages:
+                break
+    return texts, False
+
+
+def extract_pages_from_pdf(pdf_path, backends=None, trace=None, layout=None, max_pages=None, time_budget=None):
+    """
+    Extract the text of each page of a PDF (up to max_pages, PDF_MAX_PAGES by default)
+    using the first backend in the chain whose output is usable.
+    If none of them produce usable text, the best-scoring output is returned.
+    Once time_budget seconds (PDF_TIME_BUDGET_SECONDS) are spent, no more pages
+    are read and no further backend is tried.
+    Time spent in each backend is added to the trace (a metrics.Trace), if given.
+    If a list is given as layout, the lines of the first page with their font
+    size, weight and position are added to it, when a backend in the chain
+    can read them (PyMuPDF); it stays empty otherwise.
+    """
+    max_pages = max_pages or PDF_MAX_PAGES
+    deadline = time.perf_counter() + (time_budget or PDF_TIME_BUDGET_SECONDS)
+    best_pages, best_quality = [], -1.0
+    for name in backends or PDF_BACKENDS:
+        try:
+            with stage(trace, f"pdf_text.{name}"):
+                if layout is not None and name in LAYOUT_BACKENDS and not layout:
+                    pages = PAGE_BACKENDS[name](pdf_path, layout=layout)
+                else:
+                    pages = PAGE_BACKENDS[name](pdf_path)
+                pages, out_of_time = _read_pages(pages, max_pages, deadline)
+        except Exception as e:
+            print(f"{name} extraction failed for {pdf_path}: {e}")  # Log the error and try the next backend
+            if time.perf_counter() >= deadline:
+                break
+            continue
+
+        text = "\n".join(pages)
+        if out_of_time:
+            print(f"{name} extraction of {pdf_path} stopped after {len(pages)} pages: time budget spent")
+        if is_usable(text):
+            return pages
+
+        quality = text_quality(text)
+        if quality > best_quality:
+            best_pages, best_quality = pages, quality
+        if out_of_time:
+            break
+
+    return best_pages
+
+
+def extract_text_from_pdf(pdf_path, backends=None, trace=None, layout=None):
+    """
+    Extract text from a PDF using the first backend in the chain whose output is usable.
+    If none of them produce usable text, the best-scoring output is returned.
+    Pages are read within the page and time limits of extract_pages_from_pdf.
+    """
+    return "\n".join(extract_pages_from_pdf(pdf_path, backends=backends, trace=trace, layout=layout))
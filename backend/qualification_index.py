@@ -0,0 +1,74 @@
+"""
+Canonical qualification index over the resume_qualifications table.
+
+Every resume's qualification string is mapped through the taxonomy in
+qualifications.py when it is stored: its highest level goes into the
+indexed resumes.qualification_level column and each canonical degree into a
+resume_qualifications row. /rank/ can then keep only the candidates with at
+least a given level, or holding one of a set of degrees, in SQL.
+"""
+from sqlalchemy import insert, select
+
+from database import Resume, ResumeQualification
+from qualifications import canonical_qualifications, highest_level, parse_degrees, parse_level
+
+
+def index_resume_qualifications(db, resumes):
+    """
+    Add resume_qualifications rows for resumes that already have an id (i.e. are flushed)
+    """
+    rows = [
+        {"resume_id": resume.id, "degree": degree, "field": field, "level": level}
+        for resume in resumes
+        for degree, field, level in canonical_qualifications(resume.qualification)
+    ]
+    if rows:
+        db.execute(insert(ResumeQualification), rows)  # One executemany, without building ORM objects
+
+
+def backfill_qualification_index(db, batch_size=1000):
+    """
+    Fill qualification_level and the degree rows of resumes stored before they
+    existed; returns the number of resumes indexed
+    """
+    indexed = 0
+    while True:
+        resumes = (
+            db.query(Resume.id, Resume.qualification)
+            .filter(Resume.qualification_level.is_(None), Resume.qualification.isnot(None))
+            .limit(batch_size)
+            .all()
+        )
+        if not resumes:
+            return indexed
+        db.query(ResumeQualification).filter(
+            ResumeQualification.resume_id.in_([resume.id for resume in resumes])
+        ).delete(synchronize_session=False)
+        db.bulk_update_mappings(
+            Resume, [{"id": resume.id, "qualification_level": highest_level(resume.qualification)} for resume in resumes]
+        )
+        index_resume_qualifications(db, resumes)
+        db.commit()
+        indexed += len(resumes)
+
+
+def parse_filter(min_level=None, degrees=None):
+    """
+    (minimum level number or None, sorted canonical degrees) of /rank/'s qualification
+    filters; raises qualifications.UnknownQualification for names the taxonomy does not know
+    """
+    level = parse_level(min_level) if min_level and min_level.strip() else None
+    return level, parse_degrees(degrees) if degrees else []
+
+
+def filter_conditions(min_level=None, degrees=()):
+    """
+    SQL conditions on Resume for a parsed filter (see parse_filter)
+    """
+    conditions = []
+    if min_level is not None:
+        conditions.append(Resume.qualification_level >= min_level)
+    if degrees:
+        holders = select(ResumeQualification.resume_id).where(ResumeQualification.degree.in_(list(degrees)))
+        conditions.append(Resume.id.in_(holders))
+    return conditions
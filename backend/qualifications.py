@@ -0,0 +1,332 @@
+"""
+Canonical qualification taxonomy.
+
+Every spelling QUALIFICATION_PATTERN can match is mapped to a canonical
+degree, its field of study (when it names one) and an ordinal level, so
+stored qualifications can be filtered by level ("at least a master's") or
+by exact degree ("MBA") in SQL instead of by fuzzy string comparison.
+Spellings are looked up case-insensitively and without dots, so "B.Tech",
+"BTech" and "b.tech" are the same degree. In resume text, the short
+abbreviations that are also words or places (AMBIGUOUS_ABBREVIATIONS) only
+count in capitals and in a degree context; see extraction.scan_fields.
+"""
+import hashlib
+import re
+
+
+# Ordinal levels, lowest first. "postgraduate" covers postgraduate diplomas and
+# the professional qualifications (CA, CPA, ...) usually taken after a bachelor's.
+LEVELS = {
+    "secondary": 1,
+    "higher_secondary": 2,
+    "diploma": 3,  # Diplomas, vocational training and certifications
+    "associate": 4,
+    "bachelor": 5,
+    "postgraduate": 6,
+    "master": 7,
+    "doctorate": 8,
+}
+
+# Level of a resume whose qualification names nothing in the taxonomy
+NO_LEVEL = 0
+
+# Canonical degree -> (field of study, level name)
+DEGREES = {
+    # Generic mentions, without a field
+    "Bachelor": (None, "bachelor"),
+    "Master": (None, "master"),
+    "PhD": (None, "doctorate"),
+    "Diploma": (None, "diploma"),
+    "Associate": (None, "associate"),
+    "Certification": (None, "diploma"),
+    # School
+    "SSLC": (None, "secondary"),
+    "SSC": (None, "secondary"),
+    "10th": (None, "secondary"),
+    "High School": (None, "secondary"),
+    "Secondary School": (None, "secondary"),
+    "GCSE": (None, "secondary"),
+    "IGCSE": (None, "secondary"),
+    "O Levels": (None, "secondary"),
+    "HSC": (None, "higher_secondary"),
+    "12th": (None, "higher_secondary"),
+    "Plus Two": (None, "higher_secondary"),
+    "Higher Secondary": (None, "higher_secondary"),
+    "Intermediate": (None, "higher_secondary"),
+    "A Levels": (None, "higher_secondary"),
+    "IB Diploma": (None, "higher_secondary"),
+    # Vocational
+    "Polytechnic": ("engineering", "diploma"),
+    "ITI": ("industrial training", "diploma"),
+    "Vocational Diploma": (None, "diploma"),
+    "Advanced Diploma": (None, "diploma"),
+    "Industrial Training": ("industrial training", "diploma"),
+    "Technical Certification": (None, "diploma"),
+    "GNIIT": ("information technology", "diploma"),
+    "NIIT Certification": ("information technology", "diploma"),
+    "Fashion Designing": ("fashion design", "diploma"),
+    "Interior Designing": ("interior design", "diploma"),
+    "D.Pharm": ("pharmacy", "diploma"),
+    "D.Ed": ("education", "diploma"),
+    "RN": ("nursing", "diploma"),
+    "CNA": ("nursing", "diploma"),
+    "TEFL": ("teaching english", "diploma"),
+    "TESOL": ("teaching english", "diploma"),
+    # Industry certifications
+    "CCNA": ("networking", "diploma"),
+    "CCNP": ("networking", "diploma"),
+    "CCIE": ("networking", "diploma"),
+    "AWS Certified": ("cloud computing", "diploma"),
+    "Azure Certified": ("cloud computing", "diploma"),
+    "Google Cloud Certified": ("cloud computing", "diploma"),
+    "PMP": ("project management", "diploma"),
+    "Six Sigma": ("quality management", "diploma"),
+    # Bachelor's degrees
+    "B.Tech": ("engineering", "bachelor"),
+    "B.E.": ("engineering", "bachelor"),
+    "B.Sc": ("science", "bachelor"),
+    "BCA": ("computer applications", "bachelor"),
+    "BBA": ("business administration", "bachelor"),
+    "BMS": ("management studies", "bachelor"),
+    "B.Com": ("commerce", "bachelor"),
+    "B.A.": ("arts", "bachelor"),
+    "BFA": ("fine arts", "bachelor"),
+    "B.Pharm": ("pharmacy", "bachelor"),
+    "B.Ed": ("education", "bachelor"),
+    "LLB": ("law", "bachelor"),
+    "BDS": ("dentistry", "bachelor"),
+    "MBBS": ("medicine", "bachelor"),
+    "BHMS": ("homeopathic medicine", "bachelor"),
+    "BAMS": ("ayurvedic medicine", "bachelor"),
+    "BUMS": ("unani medicine", "bachelor"),
+    "BVSc": ("veterinary science", "bachelor"),
+    "BPT": ("physiotherapy", "bachelor"),
+    "B.Arch": ("architecture", "bachelor"),
+    "BSN": ("nursing", "bachelor"),
+    # Postgraduate diplomas and professional qualifications
+    "PG Diploma": (None, "postgraduate"),
+    "PG Certificate": (None, "postgraduate"),
+    "Graduate Certificate": (None, "postgraduate"),
+    "CA": ("accounting", "postgraduate"),
+    "CPA": ("accounting", "postgraduate"),
+    "ICWA": ("accounting", "postgraduate"),
+    "CMA": ("accounting", "postgraduate"),
+    "ACCA": ("accounting", "postgraduate"),
+    "CS": ("corporate law", "postgraduate"),
+    "CFA": ("finance", "postgraduate"),
+    "CFP": ("financial planning", "postgraduate"),
+    "CISA": ("information systems audit", "postgraduate"),
+    "Chartered Engineer": ("engineering", "postgraduate"),
+    "Professional Engineer": ("engineering", "postgraduate"),
+    # Master's degrees
+    "M.Tech": ("engineering", "master"),
+    "M.E.": ("engineering", "master"),
+    "M.Sc": ("science", "master"),
+    "MS": ("science", "master"),
+    "MCA": ("computer applications", "master"),
+    "MBA": ("business administration", "master"),
+    "PGDM": ("business administration", "master"),
+    "M.Com": ("commerce", "master"),
+    "M.A.": ("arts", "master"),
+    "MFA": ("fine arts", "master"),
+    "M.Pharm": ("pharmacy", "master"),
+    "M.Ed": ("education", "master"),
+    "LLM": ("law", "master"),
+    "MDS": ("dentistry", "master"),
+    "MVSc": ("veterinary science", "master"),
+    "MPT": ("physiotherapy", "master"),
+    "M.Arch": ("architecture", "master"),
+    "MSN": ("nursing", "master"),
+    "MPH": ("public health", "master"),
+    "MHA": ("healthcare administration", "master"),
+    # Doctorates
+    "MD": ("medicine", "doctorate"),
+    "Pharm.D": ("pharmacy", "doctorate"),
+    "JD": ("law", "doctorate"),
+}
+
+# Other spellings of the degrees above
+ALIASES = {
+    "Doctorate": "PhD",
+    "Executive MBA": "MBA",
+    "Online MBA": "MBA",
+    "Bachelor of Arts": "B.A.",
+    "Bachelor of Science": "B.Sc",
+    "Bachelor of Commerce": "B.Com",
+    "Bachelor of Business Administration": "BBA",
+    "Bachelor of Computer Applications": "BCA",
+    "Bachelor of Engineering": "B.E.",
+    "Bachelor of Technology": "B.Tech",
+    "Bachelor of Architecture": "B.Arch",
+    "Bachelor of Fine Arts": "BFA",
+    "Bachelor of Pharmacy": "B.Pharm",
+    "Bachelor of Education": "B.Ed",
+    "Bachelor of Laws": "LLB",
+    "Bachelor of Dental Surgery": "BDS",
+    "Bachelor of Medicine": "MBBS",
+    "Bachelor of Surgery": "MBBS",
+    "Bachelor of Physiotherapy": "BPT",
+    "Bachelor of Veterinary Science": "BVSc",
+    "Bachelor of Ayurvedic Medicine and Surgery": "BAMS",
+    "Bachelor of Homeopathic Medicine and Surgery": "BHMS",
+    "Bachelor of Unani Medicine and Surgery": "BUMS",
+    "Bachelor of Management Studies": "BMS",
+}
+
+# Bachelor's degrees named "Bachelor of <field>" without a common abbreviation
+BACHELOR_FIELDS = [
+    "Occupational Therapy", "Social Work", "Hospitality Management", "Hotel Management",
+    "Tourism and Travel Management", "Journalism and Mass Communication", "Performing Arts", "Visual Arts",
+    "Business Studies", "International Business", "Financial Services", "Computer Science",
+    "Information Technology", "Data Science", "Cybersecurity", "Cloud Computing", "Artificial Intelligence",
+    "Machine Learning", "Digital Marketing", "Event Management", "Fashion Design", "Interior Design",
+    "Product Design", "Animation", "Multimedia", "Film Making", "Sports Management", "Physical Education",
+    "Fitness Management", "Agriculture", "Forestry", "Fisheries Science", "Biotechnology",
+    "Environmental Science", "Industrial Design", "Marine Engineering", "Naval Architecture", "Aviation",
+    "Aircraft Maintenance Engineering", "Economics", "Statistics", "Mathematics", "Political Science",
+    "Philosophy", "Sociology", "Psychology", "Anthropology", "History", "Public Administration", "Criminology",
+    "Forensic Science",
+]
+
+# Engineering disciplines mentioned on their own, read as a B.E. in that field
+ENGINEERING_FIELDS = [
+    "Automotive", "Aerospace", "Marine", "Electrical", "Civil", "Mechanical", "Biomedical", "Biotechnology",
+    "Chemical",
+]
+
+# Diplomas and certifications named "<field> Diploma" or "<field> Certification";
+# each is its own degree at the diploma level
+CERTIFICATES = [
+    "Artificial Intelligence Certification", "Data Science Certification", "Digital Marketing Certification",
+    "Cybersecurity Certification", "Blockchain Certification", "Environment Management Certification",
+    "Machine Learning Certification", "AI Certification", "Graphic Design Certification", "UI/UX Certification",
+    "Web Development Certification", "Full Stack Development Certification", "DevOps Certification",
+    "Data Analytics Certification", "Business Analytics Certification", "Supply Chain Management Certification",
+    "Logistics Certification", "Entrepreneurship Certification", "Public Relations Certification",
+    "Forex Certification", "Investment Banking Certification", "Stock Market Certification",
+    "Clinical Research Certification", "Phlebotomy Certification", "Legal Assistant Certification",
+    "Paralegal Certification", "Occupational Therapy Certification", "Speech Therapy Certification",
+    "Counseling Certification", "Yoga Certification", "Fitness Trainer Certification", "Big Data Certification",
+    "Statistics Certification", "Software Testing Certification", "Penetration Testing Certification",
+    "Ethical Hacking Certification", "Actuarial Science Certification", "Risk Management Certification",
+    "Child Development Certification", "Corporate Law Certification", "Solar Energy Certification",
+    "Wind Energy Certification", "Pilot Training Certification", "Cabin Crew Training Certification",
+    "Film Making Diploma", "Photography Diploma", "Animation Diploma", "Event Management Diploma",
+    "Hotel Management Diploma", "Fire and Safety Diploma", "Cloud Computing Diploma", "Foreign Language Diploma",
+    "Food Technology Diploma", "Agriculture Diploma", "Journalism Diploma", "Mass Communication Diploma",
+    "Sports Management Diploma", "Artificial Intelligence Diploma", "Nursing Diploma",
+    "Healthcare Management Diploma", "Law Enforcement Diploma", "Criminal Justice Diploma", "Psychology Diploma",
+    "Sociology Diploma", "Philosophy Diploma", "Library Science Diploma", "Mathematics Diploma",
+    "Tourism and Hospitality Diploma", "Culinary Arts Diploma", "UI/UX Design Diploma", "Game Development Diploma",
+    "Sound Engineering Diploma", "Music Production Diploma", "Agribusiness Diploma", "Nanotechnology Diploma",
+    "Geology Diploma", "Social Work Diploma", "Veterinary Science Diploma", "Environmental Science Diploma",
+    "Renewable Energy Diploma", "Construction Management Diploma", "Real Estate Management Diploma",
+    "Aviation Management Diploma",
+]
+
+
+# Abbreviations that are also ordinary words ("be", "me", "ma"), US states ("CA", "MS", "MD", "ME", "MA")
+# or other common initials ("CS", "RN"): scan_fields takes them only in capitals and in a degree context
+AMBIGUOUS_ABBREVIATIONS = {"be", "me", "ba", "ma", "ca", "cs", "ms", "md", "rn"}
+
+
+class UnknownQualification(ValueError):
+    """
+    Raised for a level or degree the taxonomy does not know
+    """
+
+
+def _key(name):
+    # Lowercased, without dots and with single spaces: "B.Tech", "BTech" and "b.tech" are all "btech"
+    return " ".join(name.lower().replace(".", "").split())
+
+
+def _build():
+    # Lookup key of every spelling -> (canonical degree, field, level)
+    entries = {}
+    for degree, (field, level) in DEGREES.items():
+        entries[_key(degree)] = (degree, field, LEVELS[level])
+    for alias, degree in ALIASES.items():
+        entries[_key(alias)] = entries[_key(degree)]
+    for field in BACHELOR_FIELDS:
+        entries[_key(f"Bachelor of {field}")] = (f"Bachelor of {field}", field.lower(), LEVELS["bachelor"])
+    for field in ENGINEERING_FIELDS:
+        entries[_key(f"{field} Engineering")] = ("B.E.", f"{field.lower()} engineering", LEVELS["bachelor"])
+    for certificate in CERTIFICATES:
+        field = re.sub(r"\s+(?:Certification|Diploma)$", "", certificate).lower()
+        entries[_key(certificate)] = (certificate, field, LEVELS["diploma"])
+    return entries
+
+
+_TAXONOMY = _build()
+
+# Changes whenever an entry is added or edited, so stored levels and degrees are refreshed
+VERSION = hashlib.sha256(repr(sorted(_TAXONOMY.items(), key=lambda item: item[0])).encode("utf-8")).hexdigest()[:8]
+
+
+def is_ambiguous(name):
+    """
+    Whether a spelling is one of the AMBIGUOUS_ABBREVIATIONS ("B.E.", "be", "MS")
+    """
+    return _key(name) in AMBIGUOUS_ABBREVIATIONS
+
+
+def lookup(name):
+    """
+    (canonical degree, field, level) of one qualification name, or None if unknown
+    """
+    return _TAXONOMY.get(_key(name))
+
+
+def canonical_qualifications(qualification):
+    """
+    Canonical (degree, field, level) of each known qualification in a stored
+    qualification string ("B.Tech, MBA"), one per degree. A degree mentioned
+    once with a field and once without keeps the field.
+    """
+    found = {}
+    for name in (qualification or "").split(","):
+        entry = lookup(name)
+        if entry is not None and (entry[0] not in found or found[entry[0]][1] is None):
+            found[entry[0]] = entry
+    return list(found.values())
+
+
+def highest_level(qualification):
+    """
+    Level of the highest known qualification in a stored qualification string;
+    NO_LEVEL if none is known, None if there is no qualification at all
+    """
+    if qualification is None:
+        return None
+    return max((level for _, _, level in canonical_qualifications(qualification)), default=NO_LEVEL)
+
+
+def parse_level(value):
+    """
+    Level number for a level name ("master", "Master's", "bachelors") or a
+    degree whose level is meant ("MBA", "PhD"); raises UnknownQualification
+    """
+    name = re.sub(r"['’]?s$", "", value.strip().lower()).replace(" ", "_").replace("-", "_")
+    if name in LEVELS:
+        return LEVELS[name]
+    entry = lookup(value)
+    if entry is None:
+        raise UnknownQualification(f"Unknown qualification level: {value}")
+    return entry[2]
+
+
+def parse_degrees(value):
+    """
+    Sorted canonical degrees of a comma-separated list ("MBA, b.tech" -> ["B.Tech", "MBA"]);
+    raises UnknownQualification for a name the taxonomy does not know
+    """
+    degrees = set()
+    for name in value.split(","):
+        if not name.strip():
+            continue
+        entry = lookup(name)
+        if entry is None:
+            raise UnknownQualification(f"Unknown degree: {name.strip()}")
+        degrees.add(entry[0])
+    return sorted(degrees)
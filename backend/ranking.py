@@ -0,0 +1,302 @@
+"""
+Side-effect-free ranking with a criteria-keyed score cache.
+
+A ranking is computed once per (criteria, dataset version) and kept in an
+in-memory LRU cache, so repeated or paginated /rank/ requests for the same
+criteria return without rescoring anyone. The dataset version is bumped in
+the database whenever resumes are added or deleted, which invalidates every
+cached ranking at once.
+
+Pages are selected with top-k partitioning, so only the requested window is
+ever sorted, and score+id cursors keep pagination stable.
+
+Criteria with a job_description are also matched against resume text by
+TF-IDF cosine similarity (see semantic.py), which takes a share of the skill
+points; only resumes sharing at least one term with the description are ranked.
+
+Minimum qualification level and exact degree filters are applied in SQL, on
+the canonical qualifications stored at ingestion (see qualification_index.py).
+
+With collapse_duplicates, only the best-ranked resume of each duplicate group
+(see duplicates.py) is kept, so one candidate's several uploads take one place.
+"""
+import base64
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from database import Resume, get_dataset_version
+from scoring import score_candidates
+import qualification_index
+import search
+import semantic
+import skill_index
+
+
+# Number of rankings (distinct criteria) kept in memory
+RANK_CACHE_SIZE = int(os.getenv("RANK_CACHE_SIZE", "32"))
+
+# Share of the 40 skill points given to job description similarity when the criteria
+# have both a description and required skills (a description alone gets all of them)
+RANK_DESCRIPTION_WEIGHT = float(os.getenv("RANK_DESCRIPTION_WEIGHT", "0.5"))
+
+# Only these columns are needed to score a candidate
+SCORING_COLUMNS = (Resume.id, Resume.qualification, Resume.skills, Resume.experience, Resume.duplicate_group)
+
+
+class Ranking:
+    """
+    Scores of every ranked candidate, in no particular order.
+    Candidates are ordered by score (highest first), then by id; only the
+    window a request asks for is ever selected and sorted.
+    """
+
+    def __init__(self, ids, scores):
+        self.ids = ids
+        self.scores = scores
+        # One integer sort key per candidate: ascending key = higher score, then lower id
+        self.keys = sort_key(scores, ids)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def window(self, limit, offset=0, after=None):
+        """
+        Positions of the candidates ranked [offset, offset + limit) after the
+        `after` sort key (or from the top), best first
+        """
+        positions = np.arange(len(self.keys)) if after is None else np.flatnonzero(self.keys > after)
+        k = min(offset + limit, len(positions))
+        if k <= 0:
+            return positions[:0]
+        keys = self.keys[positions]
+        if k < len(keys):
+            # Top-k selection: partition around the k-th key, then sort only those k
+            selected = np.argpartition(keys, k - 1)[:k]
+        else:
+            selected = np.arange(len(keys))
+        selected = selected[np.argsort(keys[selected])]
+        return positions[selected[offset:]]
+
+    def rank_of(self, key):
+        """
+        Number of candidates ranked at or before the given sort key
+        """
+        return int(np.count_nonzero(self.keys <= key))
+
+
+# Scores are rounded to 2 decimals and never exceed 100, so they fit in
+# 14 bits as hundredths; the candidate id fills the low 40 bits of the key
+MAX_SCORE_CENTS = 10000
+ID_BITS = 40
+
+
+def sort_key(scores, ids):
+    cents = np.rint(np.asarray(scores) * 100).astype(np.int64)
+    return ((MAX_SCORE_CENTS - cents) << ID_BITS) | np.asarray(ids, dtype=np.int64)
+
+
+def encode_cursor(score, resume_id):
+    """
+    Opaque cursor pointing just after the candidate with this score and id
+    """
+    payload = json.dumps({"score": score, "id": resume_id}).encode("utf-8")
+    return base64.urlsafe_b64encode(payload).decode("ascii")
+
+
+def decode_cursor(cursor):
+    """
+    Sort key of a cursor from encode_cursor; raises ValueError if it is malformed
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return int(sort_key([float(payload["score"])], [int(payload["id"])])[0])
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+class RankingCache:
+    """
+    Small thread-safe LRU cache of rankings keyed by (criteria key, dataset version)
+    """
+
+    def __init__(self, max_entries=RANK_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            ranking = self._entries.get(key)
+            if ranking is not None:
+                self._entries.move_to_end(key)
+            return ranking
+
+    def put(self, key, ranking):
+        with self._lock:
+            # Rankings computed on an older dataset version can never be used again
+            for stale in [k for k in self._entries if k[1] != key[1]]:
+                del self._entries[stale]
+            self._entries[key] = ranking
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+ranking_cache = RankingCache()
+
+
+def criteria_key(criteria):
+    """
+    Hash of the criteria fields that affect scores (not how many results are wanted)
+    """
+    # Normalized the same way scoring does, so equivalent criteria share an entry
+    fields = {
+        "qualification": criteria.qualification.lower(),
+        "skills": [skill.strip().lower() for skill in criteria.skills.split(",")],
+        "experience": criteria.experience,
+        "min_skill_overlap": effective_min_overlap(criteria),
+        "search": search.fts_query(search.parse_query(getattr(criteria, "search", None))),
+        "job_description": semantic.description_key(getattr(criteria, "job_description", None)),
+        "description_weight": description_weight(criteria),
+        "qualification_filter": qualification_filter(criteria),
+        "collapse_duplicates": bool(getattr(criteria, "collapse_duplicates", False)),
+    }
+    return hashlib.sha256(json.dumps(fields, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def effective_min_overlap(criteria):
+    if criteria.min_skill_overlap is None:
+        return skill_index.RANK_MIN_SKILL_OVERLAP
+    return criteria.min_skill_overlap
+
+
+def required_skill_names(criteria):
+    return [skill.strip().lower() for skill in criteria.skills.split(",") if skill.strip()]
+
+
+def description_weight(criteria):
+    """
+    Share of the skill points given to job description similarity (0 without a description)
+    """
+    if not semantic.description_key(getattr(criteria, "job_description", None)):
+        return 0.0
+    if getattr(criteria, "description_weight", None) is not None:
+        return criteria.description_weight
+    return RANK_DESCRIPTION_WEIGHT if required_skill_names(criteria) else 1.0
+
+
+def qualification_filter(criteria):
+    """
+    (minimum qualification level, canonical degrees) the criteria filter on;
+    raises qualifications.UnknownQualification for names the taxonomy does not know
+    """
+    return qualification_index.parse_filter(
+        getattr(criteria, "min_qualification_level", None), getattr(criteria, "qualification_degrees", None)
+    )
+
+
+def load_candidates(db, criteria, candidate_ids=None):
+    """
+    Fetch the scoring columns of the candidates worth scoring for these criteria,
+    optionally only among candidate_ids
+    """
+    required_skills = required_skill_names(criteria)
+    min_overlap = effective_min_overlap(criteria)
+    query = getattr(criteria, "search", None)
+    # Qualification filters are SQL conditions on the resumes table, so no string is compared in Python
+    conditions = qualification_index.filter_conditions(*qualification_filter(criteria))
+
+    if query and search.parse_query(query):
+        # Full-text pre-filter: only resumes whose text matches the search query
+        matching = set(search.matching_ids(db, query))
+        candidate_ids = matching if candidate_ids is None else candidate_ids.intersection(matching)
+    if required_skills and min_overlap > 0:
+        # Use the inverted skill index to fetch only candidates sharing enough required skills
+        skill_ids = skill_index.matching_candidate_ids(db, required_skills, min(min_overlap, len(required_skills)))
+        candidate_ids = set(skill_ids) if candidate_ids is None else candidate_ids.intersection(skill_ids)
+    if candidate_ids is not None:
+        return skill_index.load_resumes(db, sorted(candidate_ids), SCORING_COLUMNS, conditions)
+    # No other filter: every resume meeting the qualification filters is a candidate
+    return db.query(*SCORING_COLUMNS).filter(*conditions).all()
+
+
+def get_ranking(db, criteria):
+    """
+    Return the Ranking for these criteria, from the cache when the dataset has not changed
+    """
+    key = (criteria_key(criteria), get_dataset_version(db))
+    ranking = ranking_cache.get(key)
+    if ranking is None:
+        weight = description_weight(criteria)
+        if weight:
+            candidates, scores = _semantic_scores(db, criteria, weight)
+        else:
+            candidates = load_candidates(db, criteria)
+            scores = np.array(score_candidates(candidates, criteria), dtype=np.float64)
+        ids = np.fromiter((c.id for c in candidates), dtype=np.int64, count=len(candidates))
+        if getattr(criteria, "collapse_duplicates", False):
+            ids, scores = collapse_duplicates(candidates, ids, scores)
+        ranking = Ranking(ids, scores)
+        ranking_cache.put(key, ranking)
+    return ranking
+
+
+def collapse_duplicates(candidates, ids, scores):
+    """
+    Keep the best-ranked of the candidates in each duplicate group (a resume
+    not grouped yet stands alone); returns the kept (ids, scores)
+    """
+    groups = np.fromiter((c.duplicate_group or c.id for c in candidates), dtype=np.int64, count=len(candidates))
+    # In rank order, the first resume seen of each group is its best one
+    order = np.argsort(sort_key(scores, ids), kind="stable")
+    _, first = np.unique(groups[order], return_index=True)
+    keep = np.sort(order[first])
+    return ids[keep], scores[keep]
+
+
+def _semantic_scores(db, criteria, weight):
+    # Similarity of the description to every resume comes from one pass over the
+    # term matrix; resumes sharing no term with it are not ranked
+    vector_ids, similarities = semantic.index.similarities(db, criteria.job_description)
+    related = similarities > 0
+    vector_ids, similarities = vector_ids[related], similarities[related]
+    candidates = load_candidates(db, criteria, set(vector_ids.tolist()))
+    ids = np.fromiter((c.id for c in candidates), dtype=np.int64, count=len(candidates))
+    order = np.argsort(vector_ids)
+    similarity = similarities[order][np.searchsorted(vector_ids[order], ids)]
+    scores = np.array(score_candidates(candidates, criteria, similarity, weight), dtype=np.float64)
+    return candidates, scores
+
+
+def describe(db, ranking, positions):
+    """
+    Build the response rows (id, contact details, score) for ranking positions, in order
+    """
+    ids = ranking.ids[positions].tolist()
+    scores = ranking.scores[positions].tolist()
+    rows = {r.id: r for r in skill_index.load_resumes(db, ids, (Resume.id, Resume.name, Resume.phone, Resume.email))}
+    return [
+        {"id": resume_id, "name": rows[resume_id].name, "phone": rows[resume_id].phone,
+         "email": rows[resume_id].email, "score": score}
+        for resume_id, score in zip(ids, scores)
+        if resume_id in rows  # Skip resumes deleted since the ranking was computed
+    ]
+
+
+def persist_scores(db, ranking):
+    """
+    Write a ranking's scores back to the resumes table (legacy behaviour, opt-in)
+    """
+    db.bulk_update_mappings(
+        Resume, [{"id": resume_id, "score": score} for resume_id, score in zip(ranking.ids.tolist(), ranking.scores.tolist())]
+    )
+    db.commit()
@@ -0,0 +1,309 @@
+"""
+Re-extraction of stored resumes after an extractor or dictionary change.
+
+Every resume stores its extracted text (resume_texts) and the version of
+each field extractor that produced its fields (Resume.extractor_versions).
+A re-extraction job finds the resumes whose versions differ from the current
+ones and reruns only those field extractors on the stored text, in batches
+spread over the ingestion worker pool. The PDFs are never read again, so the
+name (which needs the first page's layout) is left as it is.
+
+Each batch is written in one commit and bumps the dataset version, so cached
+rankings never mix old and new fields. A job interrupted by a restart simply
+leaves some resumes stale; the next job picks them up.
+
+Only one job runs at a time across all server workers: the running job holds
+the re-extraction lease (see leases.py), and its batches take the write lease
+like the ingestion writer does.
+"""
+import datetime
+import json
+import os
+import threading
+import uuid
+from concurrent.futures import FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+from types import SimpleNamespace
+
+from database import (SessionLocal, Resume, ResumeQualification, ResumeSkill, ResumeText, bump_dataset_version,
+                      normalize_email, normalize_phone)
+from extraction import FIELD_EXTRACTORS, field_versions, reextract_batch
+from qualification_index import index_resume_qualifications
+from qualifications import highest_level
+from skill_index import index_resume_skills
+import ingestion
+import leases
+import metrics
+
+
+# Resumes re-extracted by one worker task, and written in one commit
+REEXTRACT_BATCH_SIZE = int(os.getenv("REEXTRACT_BATCH_SIZE", "500"))
+
+# SQLite limits the number of bound parameters in one statement
+QUERY_CHUNK_SIZE = 900
+
+# Columns the field extractors fill in, compared with their new values, and the qualification level derived from one
+FIELD_COLUMNS = (Resume.id, Resume.phone, Resume.email, Resume.qualification, Resume.skills, Resume.experience,
+                 Resume.extractor_versions, Resume.qualification_level)
+
+# Resumes whose fields were re-extracted, by outcome (changed, unchanged, failed, skipped)
+REEXTRACTED = metrics.Counter("hireai_reextracted_resumes_total", "Resumes processed by /reextract/ jobs", ["outcome"])
+
+
+
+class ReextractionRunning(Exception):
+    """
+    Raised by start_reextraction while another job (in any server worker) is running
+    """
+
+    def __init__(self, job_id):
+        super().__init__(f"A re-extraction is already running (job {job_id})")
+        self.job_id = job_id
+
+
+class ReextractionJob:
+    """
+    Progress of one re-extraction, in counts rather than per resume
+    """
+
+    def __init__(self, fields, force=False):
+        self.id = uuid.uuid4().hex
+        self.created_at = datetime.datetime.utcnow().isoformat()
+        self.finished_at = None
+        self.fields = fields  # Field extractors considered (FIELD_EXTRACTORS names)
+        self.force = force  # Rerun them even where the stored version is current
+        self.total = None  # Resumes to re-extract, once they have been found
+        self.changed = 0  # Resumes whose fields came out different
+        self.unchanged = 0
+        self.failed = 0
+        self.skipped = 0  # Resumes without stored text (stored before resume_texts existed)
+        self.error = None
+        self.saved_at = 0.0  # When the progress was last saved (see ingestion.save_job)
+        self.holder = leases.new_holder()  # Holder of the re-extraction lease while the job runs
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self):
+        # No uploaded file waits on this job, so shutdown does not wait for it either;
+        # an interrupted re-extraction is simply started again
+        return 0
+
+    def add(self, outcome, count=1):
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + count)
+        REEXTRACTED.inc(count, outcome=outcome)
+
+    @property
+    def processed(self):
+        return self.changed + self.unchanged + self.failed + self.skipped
+
+    @property
+    def status(self):
+        if self.total is None:
+            return "queued"
+        if not self.finished_at:
+            return "processing"
+        if self.error or self.failed:
+            return "completed_with_errors"
+        return "completed"
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                "job_id": self.id,
+                "kind": "reextract",
+                "status": self.status,
+                "fields": self.fields,
+                "total": self.total,
+                "processed": self.processed,
+                "changed": self.changed,
+                "unchanged": self.unchanged,
+                "failed": self.failed,
+                "skipped": self.skipped,
+                "created_at": self.created_at,
+                "finished_at": self.finished_at,
+                "error": self.error,
+            }
+
+
+def parse_versions(stored_versions):
+    # Resume.extractor_versions as a dict; rows stored before the column existed have none
+    try:
+        return json.loads(stored_versions) if stored_versions else {}
+    except ValueError:
+        return {}
+
+
+def stale_fields(stored_versions, current, fields, force=False):
+    """
+    The fields (among `fields`) whose stored extractor version is not the current one
+    """
+    stored = parse_versions(stored_versions)
+    return [field for field in fields if force or stored.get(field) != current[field]]
+
+
+def find_stale(db, fields, force=False):
+    """
+    (resume id, fields to re-extract) for every resume with a stale field, in id order
+    """
+    current = field_versions(refresh=True)  # A skills.json edited a moment ago counts already
+    query = db.query(Resume.id, Resume.extractor_versions).order_by(Resume.id)
+    if not force:
+        # Resumes extracted by the current versions of every extractor are skipped in SQL
+        query = query.filter(
+            (Resume.extractor_versions.is_(None)) |
+            (Resume.extractor_versions != json.dumps(current, sort_keys=True))
+        )
+    stale = []
+    for resume_id, stored_versions in query:
+        outdated = stale_fields(stored_versions, current, fields, force)
+        if outdated:
+            stale.append((resume_id, outdated))
+    return stale
+
+
+def _load_batch(db, batch):
+    # Stored text of a batch of (resume id, fields); resumes without text are left out
+    texts = {}
+    ids = [resume_id for resume_id, _ in batch]
+    for start in range(0, len(ids), QUERY_CHUNK_SIZE):
+        chunk = ids[start:start + QUERY_CHUNK_SIZE]
+        texts.update(db.query(ResumeText.resume_id, ResumeText.text).filter(ResumeText.resume_id.in_(chunk)))
+    return [(resume_id, texts[resume_id], fields) for resume_id, fields in batch if resume_id in texts]
+
+
+def _submit(rows):
+    # Returns (future, executor it runs in)
+    executor = ingestion.get_executor()
+    try:
+        return executor.submit(reextract_batch, rows), executor
+    except BrokenProcessPool:
+        ingestion.reset_broken_executor(executor)
+        executor = ingestion.get_executor()
+        return executor.submit(reextract_batch, rows), executor
+
+
+def write_batch(db, job, outcomes):
+    """
+    Store re-extracted fields of one batch in one commit
+    """
+    current = field_versions()
+    ids = [resume_id for resume_id, status, _ in outcomes if status == "ok"]
+    rows = {}
+    for start in range(0, len(ids), QUERY_CHUNK_SIZE):
+        chunk = ids[start:start + QUERY_CHUNK_SIZE]
+        rows.update((row.id, row) for row in db.query(*FIELD_COLUMNS).filter(Resume.id.in_(chunk)))
+
+    updates = []
+    reindex = []  # Resumes whose skills changed, for the skill index
+    requalified = []  # Resumes whose qualification was re-extracted, for the qualification index
+    for resume_id, status, values in outcomes:
+        if status != "ok":
+            job.add("failed")
+            print(f"Re-extraction failed for resume {resume_id}: {values}")
+            continue
+        row = rows.get(resume_id)
+        if row is None:
+            continue  # Deleted while the batch was being extracted
+        changes = {column: value for column, value in values.items() if getattr(row, column) != value}
+        stored = parse_versions(row.extractor_versions)
+        stored.update((field, current[field]) for field in job.fields)
+        update = {"id": resume_id, "extractor_versions": json.dumps(stored, sort_keys=True), **changes}
+        if "email" in changes:
+            update["email_normalized"] = normalize_email(changes["email"])
+        if "phone" in changes:
+            update["phone_normalized"] = normalize_phone(changes["phone"])
+        if "qualification" in values:
+            # Level and degrees are refreshed even if the text matched the same, as the taxonomy may have changed
+            level = highest_level(values["qualification"])
+            if level != row.qualification_level:
+                changes["qualification_level"] = update["qualification_level"] = level
+            requalified.append(SimpleNamespace(id=resume_id, qualification=values["qualification"]))
+        if "skills" in changes:
+            reindex.append(SimpleNamespace(id=resume_id, skills=changes["skills"]))
+        updates.append(update)
+        job.add("changed" if changes else "unchanged")
+
+    db.bulk_update_mappings(Resume, updates)
+    if reindex:
+        reindex_ids = [resume.id for resume in reindex]
+        for start in range(0, len(reindex_ids), QUERY_CHUNK_SIZE):
+            chunk = reindex_ids[start:start + QUERY_CHUNK_SIZE]
+            db.query(ResumeSkill).filter(ResumeSkill.resume_id.in_(chunk)).delete(synchronize_session=False)
+        index_resume_skills(db, reindex)
+    if requalified:
+        requalified_ids = [resume.id for resume in requalified]
+        for start in range(0, len(requalified_ids), QUERY_CHUNK_SIZE):
+            chunk = requalified_ids[start:start + QUERY_CHUNK_SIZE]
+            db.query(ResumeQualification).filter(ResumeQualification.resume_id.in_(chunk)).delete(
+                synchronize_session=False)
+        index_resume_qualifications(db, requalified)
+    if updates:
+        bump_dataset_version(db)  # Cached rankings were scored on the old fields
+    db.commit()
+
+
+def run_job(job):
+    """
+    Re-extract every stale resume, keeping the worker pool busy with a few batches at a time
+    """
+    db = SessionLocal()
+    try:
+        stale = find_stale(db, job.fields, job.force)
+        job.total = len(stale)
+        ingestion.save_job(job, force=True)
+
+        batches = (stale[start:start + REEXTRACT_BATCH_SIZE] for start in range(0, len(stale), REEXTRACT_BATCH_SIZE))
+        in_flight = {}  # future -> (number of resumes in its batch, executor)
+        while True:
+            # Two batches per worker process: one running, one ready to start
+            while len(in_flight) < 2 * ingestion.INGEST_WORKERS:
+                batch = next(batches, None)
+                if batch is None:
+                    break
+                rows = _load_batch(db, batch)
+                job.add("skipped", len(batch) - len(rows))
+                if rows:
+                    future, executor = _submit(rows)
+                    in_flight[future] = (len(rows), executor)
+            if not in_flight:
+                break
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                count, executor = in_flight.pop(future)
+                try:
+                    outcomes = future.result()
+                except Exception as e:
+                    if isinstance(e, BrokenProcessPool):
+                        ingestion.reset_broken_executor(executor)
+                    job.add("failed", count)
+                    print(f"A re-extraction batch of {count} resumes failed: {e}")
+                    continue
+                with leases.held(leases.WRITE_LEASE):
+                    write_batch(db, job, outcomes)
+            ingestion.save_job(job)
+            if not leases.acquire(leases.REEXTRACT_LEASE, job.holder, job.id):  # Renew it
+                raise RuntimeError("the re-extraction lease expired and was taken by another job")
+    except Exception as e:
+        db.rollback()
+        job.error = f"Re-extraction stopped: {e}"
+    finally:
+        db.close()
+        leases.release(leases.REEXTRACT_LEASE, job.holder)
+        job.finished_at = datetime.datetime.utcnow().isoformat()
+        ingestion.save_job(job, force=True)
+
+
+def start_reextraction(fields=None, force=False):
+    """
+    Start a re-extraction of the given fields (default: all of FIELD_EXTRACTORS)
+    in a background thread and return it; raises ReextractionRunning if one is
+    already running in any server worker.
+    """
+    job = ReextractionJob(list(fields or FIELD_EXTRACTORS), force=force)
+    if not leases.acquire(leases.REEXTRACT_LEASE, job.holder, job.id):
+        raise ReextractionRunning(leases.current_info(leases.REEXTRACT_LEASE))
+    ingestion.register_job(job)
+    ingestion.save_job(job, force=True)
+    threading.Thread(target=run_job, args=(job,), name=f"reextract-{job.id[:8]}", daemon=True).start()
+    return job
@@ -0,0 +1,150 @@
+"""
+Candidate scoring against ranking criteria.
+
+calculate_score scores one candidate at a time and is kept as the reference
+implementation. score_candidates produces exactly the same scores for a whole
+candidate set: fuzzy comparisons are done once per distinct string instead of
+once per candidate, and the 30/40/30 weighting is applied with NumPy arrays.
+"""
+import numpy as np
+from thefuzz import fuzz  # Library for fuzzy string matching
+
+from skill_index import SKILL_MATCH_THRESHOLD
+
+
+def calculate_score(candidate, criteria):
+    score = 0# Initialize total score
+
+    # Qualification Matching (Fuzzy Match)
+    candidate_qualification = candidate.qualification.lower()# Convert qualifications to lowercase for case-insensitive matching
+    criteria_qualification = criteria.qualification.lower()
+# Calculate similarity between candidate's qualification and required qualification
+    qualification_similarity = fuzz.partial_ratio(candidate_qualification, criteria_qualification)
+# Assign scores based on similarity level
+    if qualification_similarity >= 90:   # Very close match (almost identical)
+        score += 30
+    elif qualification_similarity >= 70:   # Partial match (some differences but relevant
+        score += 15
+    else:
+        score += 0# No match, no points awarded
+
+    # Skills Matching (Fuzzy Match per skill)
+    # Convert candidate's and required skills into lowercase and remove extra spaces
+    candidate_skills = [skill.strip().lower() for skill in candidate.skills.split(",")]
+    required_skills = [skill.strip().lower() for skill in criteria.skills.split(",")]
+
+# Initialize a counter for matched skills
+    matched_skills = 0
+    # Compare each required skill with the candidate's skills
+    for required_skill in required_skills:
+        for candidate_skill in candidate_skills:
+            # Calculate similarity score between candidate skill and required skill using fuzzy matching
+            skill_similarity = fuzz.ratio(candidate_skill, required_skill)
+            if skill_similarity >= SKILL_MATCH_THRESHOLD:  # A similarity of 85% or more is considered a match
+                matched_skills += 1# Increase match count
+                break# Stop checking other skills once a match is found
+
+# Calculate skill score: 
+# - If all required skills are matched, the candidate gets the full 40 points.
+# - If only some are matched, the score is proportional to the number of matches.
+    skill_score = (matched_skills / max(len(required_skills), 1)) * 40
+    # Add skill score to total score
+    score += skill_score
+
+    # Experience Matching (Modified to handle 4+ years)
+    # Check if the candidate meets or exceeds the required experience
+    if candidate.experience >= criteria.experience:
+        experience_score = 30 # Full points if the experience meets or exceeds the requirement
+    else:
+         # Calculate experience gap (difference between candidate's experience and required experience)
+        experience_gap = abs(candidate.experience - criteria.experience)
+        if experience_gap <= 5:
+            experience_score = 30 * (1 - (experience_gap / 5))
+        else:
+            experience_score = 0# No points if the gap is more than 5 years
+# Add the calculated experience score to the total score
+    score += experience_score
+# Return the final rounded score (up to 2 decimal places for precision)
+    return round(score, 2)
+
+
+def score_candidates(candidates, criteria, similarity=None, description_weight=1.0):
+    """
+    Score every candidate at once; returns a list of scores in candidate order,
+    identical to [calculate_score(c, criteria) for c in candidates].
+    Candidates only need qualification, skills and experience attributes,
+    so plain column rows work as well as Resume objects.
+
+    If similarity (each candidate's 0..1 similarity to a job description) is
+    given, description_weight of the 40 skill points come from it and the
+    rest from the skill matches.
+    """
+    candidates = list(candidates)
+    if not candidates:
+        return []
+
+    # Qualification: one partial_ratio per distinct qualification string
+    criteria_qualification = criteria.qualification.lower()
+    qualification_ids, qualifications = _encode(_lower_all([c.qualification for c in candidates]))
+    qualification_similarity = np.array(
+        [fuzz.partial_ratio(q, criteria_qualification) for q in qualifications], dtype=np.int64
+    )[qualification_ids]
+    qualification_score = np.where(
+        qualification_similarity >= 90, 30, np.where(qualification_similarity >= 70, 15, 0)
+    )
+
+    # Skills: compare each distinct required skill with the skill vocabulary once,
+    # then look up every candidate's skills in that table
+    required_skills = [skill.strip().lower() for skill in criteria.skills.split(",")]
+    skills = [c.skills for c in candidates]
+    # Splitting the joined strings yields every candidate's skills in order,
+    # and each candidate owns one more skill than it has commas
+    lengths = np.fromiter((s.count(",") + 1 for s in skills), dtype=np.int64, count=len(skills))
+    owners = np.repeat(np.arange(len(candidates)), lengths)  # Candidate index of every skill
+    skill_ids, vocabulary = _encode(map(str.strip, ",".join(skills).lower().split(",")))
+
+    matched_skills = np.zeros(len(candidates), dtype=np.int64)
+    for required_skill, count in _counts(required_skills).items():
+        in_vocabulary = np.fromiter(
+            (fuzz.ratio(skill, required_skill) >= SKILL_MATCH_THRESHOLD for skill in vocabulary),
+            dtype=bool, count=len(vocabulary),
+        )
+        # A candidate matches the required skill if any of its skills does
+        has_skill = np.bincount(owners, weights=in_vocabulary[skill_ids], minlength=len(candidates)) > 0
+        matched_skills += count * has_skill
+    skill_score = (matched_skills / max(len(required_skills), 1)) * 40
+    if similarity is not None:
+        skill_score = (1 - description_weight) * skill_score + description_weight * 40 * np.asarray(similarity)
+
+    # Experience: full points at or above the requirement, linear decay over a 5-year gap
+    experience = np.fromiter((c.experience for c in candidates), dtype=np.int64, count=len(candidates))
+    experience_gap = np.abs(experience - criteria.experience)
+    experience_score = np.where(
+        experience >= criteria.experience,
+        30.0,
+        np.where(experience_gap <= 5, 30 * (1 - (experience_gap / 5)), 0.0),
+    )
+
+    # Same summation order and Python rounding as calculate_score, so results match exactly
+    scores = (qualification_score + skill_score) + experience_score
+    return [round(score, 2) for score in scores.tolist()]
+
+
+def _lower_all(values):
+    # Lowercase many strings with one call; falls back if a value contains the separator
+    lowered = "\0".join(values).lower().split("\0")
+    return lowered if len(lowered) == len(values) else [value.lower() for value in values]
+
+
+def _encode(values):
+    # Map values to integer ids; returns (id array, list of distinct values)
+    index = {}
+    ids = [index.setdefault(value, len(index)) for value in values]
+    return np.array(ids, dtype=np.int64), list(index)
+
+
+def _counts(values):
+    counts = {}
+    for value in values:
+        counts[value] = counts.get(value, 0) + 1
+    return counts
@@ -0,0 +1,169 @@
+"""
+Full-text search over resume text.
+
+The text extracted from every resume is stored zlib-compressed in
+resume_texts and indexed in a contentless SQLite FTS5 table (resume_fts),
+so keyword and phrase queries are answered from the index with BM25
+ranking instead of scanning resumes. Snippets are cut from the stored text
+of the returned page only.
+"""
+import os
+import re
+import zlib
+
+from sqlalchemy import text
+
+from database import engine, Resume, ResumeText
+
+
+# Characters of context shown around the first match in a snippet
+SEARCH_SNIPPET_CHARS = int(os.getenv("SEARCH_SNIPPET_CHARS", "200"))
+
+# Markers put around matched terms in snippets
+HIGHLIGHT_START = "<b>"
+HIGHLIGHT_END = "</b>"
+
+# A query is a list of "quoted phrases" and bare keywords (keyword* for a prefix)
+QUERY_TOKEN = re.compile(r'"([^"]*)"|(\S+)')
+WORD = re.compile(r"\w+")
+
+# SQLite limits the number of bound parameters in one statement
+QUERY_CHUNK_SIZE = 900
+
+
+def available():
+    return engine.dialect.name == "sqlite"
+
+
+def compress_text(value):
+    return zlib.compress(value.encode("utf-8"))
+
+
+def decompress_text(value):
+    return zlib.decompress(value).decode("utf-8") if value else ""
+
+
+def parse_query(query):
+    """
+    Split a query into terms: (words, is_prefix) for each phrase or keyword.
+    Punctuation is dropped the same way the FTS5 tokenizer drops it, so
+    "node.js" becomes the phrase "node js".
+    """
+    terms = []
+    for phrase, keyword in QUERY_TOKEN.findall(query or ""):
+        words = WORD.findall(phrase or keyword)
+        if words:
+            terms.append((words, bool(keyword) and keyword.endswith("*") and len(words) == 1))
+    return terms
+
+
+def fts_query(terms, match_any=False):
+    """
+    FTS5 MATCH expression for parsed terms. Every term is quoted, so user
+    input can never be read as FTS5 syntax.
+    """
+    parts = ['"' + " ".join(words) + '"' + ("*" if prefix else "") for words, prefix in terms]
+    return (" OR " if match_any else " AND ").join(parts)
+
+
+def index_texts(db, texts):
+    """
+    Store and index the text of new resumes; `texts` maps resume id to text
+    """
+    rows = [(resume_id, value) for resume_id, value in texts.items() if value]
+    if not rows:
+        return
+    db.add_all(ResumeText(resume_id=resume_id, text=compress_text(value)) for resume_id, value in rows)
+    if available():
+        db.execute(
+            text("INSERT INTO resume_fts (rowid, text) VALUES (:id, :text)"),
+            [{"id": resume_id, "text": value} for resume_id, value in rows],
+        )
+
+
+def remove_texts(db, resume_ids):
+    """
+    Drop the stored text and index entries of the given resumes
+    """
+    resume_ids = list(resume_ids)
+    for start in range(0, len(resume_ids), QUERY_CHUNK_SIZE):
+        chunk = resume_ids[start:start + QUERY_CHUNK_SIZE]
+        stored = db.query(ResumeText).filter(ResumeText.resume_id.in_(chunk)).all()
+        if available() and stored:
+            # A contentless FTS5 table forgets a row only when given the text it indexed
+            db.execute(
+                text("INSERT INTO resume_fts (resume_fts, rowid, text) VALUES ('delete', :id, :text)"),
+                [{"id": row.resume_id, "text": decompress_text(row.text)} for row in stored],
+            )
+        for row in stored:
+            db.delete(row)
+
+
+def clear(db):
+    """
+    Drop every stored text and the whole index
+    """
+    db.query(ResumeText).delete()
+    if available():
+        db.execute(text("INSERT INTO resume_fts (resume_fts) VALUES ('delete-all')"))
+
+
+def matching_ids(db, query, match_any=False):
+    """
+    Ids of every resume matching the query (no ranking), e.g. to pre-filter /rank/
+    """
+    terms = parse_query(query)
+    if not terms:
+        return []
+    rows = db.execute(
+        text("SELECT rowid FROM resume_fts WHERE resume_fts MATCH :query"),
+        {"query": fts_query(terms, match_any)},
+    )
+    return [row[0] for row in rows]
+
+
+def make_snippet(value, terms, width=SEARCH_SNIPPET_CHARS):
+    """
+    About `width` characters of text around the first match, with matches highlighted
+    """
+    pattern = re.compile(
+        "|".join(r"\b" + r"\W+".join(map(re.escape, words)) + (r"\w*" if prefix else r"\b") for words, prefix in terms),
+        re.IGNORECASE,
+    )
+    match = pattern.search(value)
+    start = max(0, match.start() - width // 2) if match else 0
+    end = min(len(value), start + width)
+    window = " ".join(value[start:end].split())  # Collapse the PDF's line breaks and spacing
+    window = pattern.sub(lambda m: HIGHLIGHT_START + m.group(0) + HIGHLIGHT_END, window)
+    return ("..." if start > 0 else "") + window + ("..." if end < len(value) else "")
+
+
+def search(db, query, limit=20, offset=0, match_any=False):
+    """
+    BM25-ranked resumes matching the query, with snippets. Returns (total matches, results).
+    """
+    terms = parse_query(query)
+    if not terms:
+        return 0, []
+    expression = fts_query(terms, match_any)
+    total = db.execute(
+        text("SELECT count(*) FROM resume_fts WHERE resume_fts MATCH :query"), {"query": expression}
+    ).scalar()
+    hits = db.execute(
+        text("SELECT rowid, bm25(resume_fts) FROM resume_fts WHERE resume_fts MATCH :query "
+             "ORDER BY bm25(resume_fts) LIMIT :limit OFFSET :offset"),
+        {"query": expression, "limit": limit, "offset": offset},
+    ).all()
+
+    ids = [resume_id for resume_id, _ in hits]
+    resumes = {r.id: r for r in db.query(Resume.id, Resume.name, Resume.phone, Resume.email).filter(Resume.id.in_(ids))}
+    texts = dict(db.query(ResumeText.resume_id, ResumeText.text).filter(ResumeText.resume_id.in_(ids)))
+    results = [
+        {"id": resume_id, "name": resumes[resume_id].name, "phone": resumes[resume_id].phone,
+         "email": resumes[resume_id].email,
+         "relevance": round(-bm25, 4),  # bm25() is lower for better matches; flip it so higher is better
+         "snippet": make_snippet(decompress_text(texts.get(resume_id)), terms)}
+        for resume_id, bm25 in hits
+        if resume_id in resumes
+    ]
+    return total, results
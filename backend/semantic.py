@@ -0,0 +1,277 @@
+"""
+Semantic matching of free-text job descriptions against resume text.
+
+Every resume's text is turned into a sparse vector of hashed term counts
+(scikit-learn's HashingVectorizer, so there is no vocabulary to refit) and
+stored in resume_vectors when the resume is ingested. Each server process
+keeps all vectors in memory as a few CSR blocks plus the document frequency
+of every feature, and catches up with resumes added or removed by any
+process when the dataset version changes: new resumes are appended as a new
+block, the matrix is never rebuilt or refit.
+
+A job description is scored against every resume by TF-IDF cosine
+similarity. The IDF weights are applied to the query vector, so scoring the
+whole corpus is one sparse matrix-vector product per block; the document
+norms it is divided by are computed once per dataset version.
+"""
+import os
+import threading
+
+import numpy as np
+
+from database import ResumeText, ResumeVector, get_dataset_removals, get_dataset_version
+import search
+
+
+# Hashed feature space; larger spaces have fewer collisions between unrelated terms
+SEMANTIC_FEATURES = int(os.getenv("SEMANTIC_FEATURES", str(2 ** 18)))
+
+# Longest word n-gram used as a term (2 also matches phrases such as "machine learning")
+SEMANTIC_NGRAM_MAX = int(os.getenv("SEMANTIC_NGRAM_MAX", "1"))
+
+# Bump when the tokenization changes; stored vectors of another model are recomputed at startup
+VECTORIZER_VERSION = "1"
+MODEL_KEY = f"{VECTORIZER_VERSION}:{SEMANTIC_FEATURES}:{SEMANTIC_NGRAM_MAX}"
+
+# Appended blocks are merged once there are more than this many
+MAX_BLOCKS = 8
+
+# SQLite limits the number of bound parameters in one statement
+QUERY_CHUNK_SIZE = 900
+
+_vectorizer = None
+
+
+def get_vectorizer():
+    global _vectorizer
+    if _vectorizer is None:
+        # Heavy import, deferred until text is actually vectorized
+        from sklearn.feature_extraction.text import HashingVectorizer
+
+        _vectorizer = HashingVectorizer(
+            n_features=SEMANTIC_FEATURES,
+            ngram_range=(1, SEMANTIC_NGRAM_MAX),
+            stop_words="english",
+            alternate_sign=False,  # Plain counts, so TF-IDF weighting can be applied afterwards
+            norm=None,
+            dtype=np.float32,
+        )
+    return _vectorizer
+
+
+def encode_terms(row):
+    """
+    Bytes stored in resume_vectors.terms for one row of term counts
+    """
+    return row.indices.astype("<i4").tobytes() + row.data.astype("<f4").tobytes()
+
+
+def decode_terms(value):
+    """
+    (feature indices, counts) of a stored vector
+    """
+    words = np.frombuffer(value, dtype="<i4")
+    half = len(words) // 2
+    return words[:half], words[half:].view("<f4")
+
+
+def index_texts(db, texts):
+    """
+    Store the term vectors of new resumes; `texts` maps resume id to text
+    """
+    rows = [(resume_id, value) for resume_id, value in texts.items() if value]
+    if not rows:
+        return
+    counts = get_vectorizer().transform([value for _, value in rows])
+    db.add_all(
+        ResumeVector(resume_id=resume_id, model=MODEL_KEY, terms=encode_terms(counts[i]))
+        for i, (resume_id, _) in enumerate(rows)
+    )
+
+
+def clear(db):
+    """
+    Drop every stored vector (the in-memory index follows on its next sync)
+    """
+    db.query(ResumeVector).delete()
+
+
+def backfill_vectors(db, batch_size=500):
+    """
+    Vectorize the stored text of resumes that have no vector of the current model
+    (stored before semantic matching existed, or under other vectorizer settings).
+    Returns the number of resumes vectorized.
+    """
+    db.query(ResumeVector).filter(ResumeVector.model != MODEL_KEY).delete(synchronize_session=False)
+    db.commit()
+    vectorized = 0
+    while True:
+        rows = (
+            db.query(ResumeText.resume_id, ResumeText.text)
+            .outerjoin(ResumeVector, ResumeVector.resume_id == ResumeText.resume_id)
+            .filter(ResumeVector.resume_id.is_(None))
+            .limit(batch_size)
+            .all()
+        )
+        texts = {resume_id: search.decompress_text(value) for resume_id, value in rows}
+        # Resumes whose text is empty get an empty vector, so they are not fetched again
+        index_texts(db, {resume_id: value or " " for resume_id, value in texts.items()})
+        db.commit()
+        vectorized += len(rows)
+        if len(rows) < batch_size:
+            return vectorized
+
+
+def _block(rows):
+    """
+    (ids, CSR matrix of sublinear term frequencies) for stored (resume id, terms) rows
+    """
+    from scipy import sparse
+
+    ids = np.fromiter((resume_id for resume_id, _ in rows), dtype=np.int64, count=len(rows))
+    decoded = [decode_terms(terms) for _, terms in rows]
+    indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+    np.cumsum([len(indices) for indices, _ in decoded], out=indptr[1:])
+    if decoded:
+        indices = np.concatenate([indices for indices, _ in decoded])
+        counts = np.concatenate([counts for _, counts in decoded])
+    else:
+        indices, counts = np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.float32)
+    # A term seen n times weighs 1 + log(n), so repeated words do not dominate a resume
+    matrix = sparse.csr_matrix((1 + np.log(counts), indices, indptr), shape=(len(rows), SEMANTIC_FEATURES))
+    return ids, matrix
+
+
+def _document_frequency(matrix):
+    return np.bincount(matrix.indices, minlength=SEMANTIC_FEATURES)
+
+
+class SemanticIndex:
+    """
+    In-memory term matrix of every resume with a stored vector, kept in sync
+    with the database by dataset version
+    """
+
+    def __init__(self):
+        self.blocks = []  # (ids, CSR matrix) pairs; rows are resumes
+        self.df = np.zeros(SEMANTIC_FEATURES, dtype=np.int64)  # Resumes containing each feature
+        self.version = None  # Dataset version the blocks reflect
+        self.removals = None  # Dataset removal count the blocks reflect (see database.DatasetState)
+        self._weights = None  # (IDF weights, per-block document norms) for the current version
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return sum(len(ids) for ids, _ in self.blocks)
+
+    def ids(self):
+        if not self.blocks:
+            return np.zeros(0, dtype=np.int64)
+        return np.concatenate([ids for ids, _ in self.blocks])
+
+    def sync(self, db):
+        """
+        Load the vectors of resumes added since the last sync and drop removed ones
+        """
+        version = get_dataset_version(db)
+        removals = get_dataset_removals(db)
+        with self._lock:
+            if version == self.version and removals == self.removals:
+                return
+            if removals != self.removals:
+                # Resumes were deleted (/reset/), and SQLite reuses the ids of deleted rows, so a
+                # loaded id may now belong to another resume: start over rather than trust any
+                self.blocks = []
+                self.df = np.zeros(SEMANTIC_FEATURES, dtype=np.int64)
+            loaded = self.ids()
+            vectors = db.query(ResumeVector.resume_id, ResumeVector.terms).filter(ResumeVector.model == MODEL_KEY)
+            # Uploads get increasing ids, so new vectors are usually just the ones past the last loaded id
+            rows = vectors.filter(ResumeVector.resume_id > (int(loaded.max()) if len(loaded) else 0)).all()
+            if vectors.count() != len(loaded) + len(rows):
+                # Older resumes were vectorized (backfill), or vectors removed outside a counted
+                # deletion: compare every id
+                stored = np.fromiter((resume_id for resume_id, in vectors.with_entities(ResumeVector.resume_id)),
+                                     dtype=np.int64)
+                removed = np.setdiff1d(loaded, stored)
+                if len(removed):
+                    self._remove(removed)
+                older = np.setdiff1d(stored, loaded)
+                older = older[older <= (loaded.max() if len(loaded) else 0)].tolist()
+                for start in range(0, len(older), QUERY_CHUNK_SIZE):
+                    rows.extend(vectors.filter(ResumeVector.resume_id.in_(older[start:start + QUERY_CHUNK_SIZE])))
+            if rows:
+                self._append(rows)
+            self.version = version
+            self.removals = removals
+            self._weights = None
+
+    def _append(self, rows):
+        ids, matrix = _block(rows)
+        self.blocks.append((ids, matrix))
+        self.df += _document_frequency(matrix)
+        if len(self.blocks) > MAX_BLOCKS:
+            self._merge_small_blocks()
+
+    def _merge_small_blocks(self):
+        from scipy import sparse
+
+        # The largest block (usually everything loaded at startup) is kept as is, so its
+        # memory stays shared with the other server workers; the appended ones become one
+        largest = max(range(len(self.blocks)), key=lambda i: len(self.blocks[i][0]))
+        rest = [block for i, block in enumerate(self.blocks) if i != largest]
+        merged = (np.concatenate([ids for ids, _ in rest]), sparse.vstack([matrix for _, matrix in rest], format="csr"))
+        self.blocks = [self.blocks[largest], merged]
+
+    def _remove(self, resume_ids):
+        blocks = []
+        for ids, matrix in self.blocks:
+            keep = ~np.isin(ids, resume_ids)
+            if keep.all():
+                blocks.append((ids, matrix))
+            elif keep.any():
+                blocks.append((ids[keep], matrix[keep]))
+        self.blocks = blocks
+        self.df = np.zeros(SEMANTIC_FEATURES, dtype=np.int64)
+        for _, matrix in self.blocks:
+            self.df += _document_frequency(matrix)
+
+    def _idf_and_norms(self):
+        # Smoothed IDF, as scikit-learn's TfidfTransformer computes it, and ||row * idf||
+        # of every resume; both only change with the dataset version
+        if self._weights is None:
+            idf = np.log((1 + len(self)) / (1 + self.df)) + 1
+            squared = idf ** 2
+            self._weights = idf, [np.sqrt(matrix.multiply(matrix) @ squared) for _, matrix in self.blocks]
+        return self._weights
+
+    def similarities(self, db, description):
+        """
+        Cosine similarity (0..1) between the description and every indexed resume,
+        as (resume ids, similarities)
+        """
+        self.sync(db)
+        query = get_vectorizer().transform([description])
+        with self._lock:
+            if not self.blocks or not query.nnz:
+                return self.ids(), np.zeros(len(self), dtype=np.float64)
+            idf, norms = self._idf_and_norms()
+            weights = np.zeros(SEMANTIC_FEATURES, dtype=np.float64)
+            weights[query.indices] = (1 + np.log(query.data)) * idf[query.indices]
+            query_norm = np.linalg.norm(weights)
+            weights *= idf  # Applying the IDF to the query applies it to both sides of the dot product
+            weights = weights.astype(np.float32)  # Same type as the matrix, so scipy does not copy it per product
+            scores = []
+            for (_, matrix), block_norms in zip(self.blocks, norms):
+                dots = matrix @ weights  # One sparse matrix-vector product over the block
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    scores.append(np.where(block_norms > 0, dots / (block_norms * query_norm), 0.0))
+            return self.ids(), np.concatenate(scores)
+
+
+index = SemanticIndex()
+
+
+def description_key(description):
+    """
+    Normalized description, so equivalent descriptions share cached rankings
+    """
+    return " ".join((description or "").lower().split())
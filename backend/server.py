@@ -0,0 +1,210 @@
+"""
+Preforking production server.
+
+The master process imports the app, loads the spaCy model and the PDF
+libraries, compiles the patterns (the field scanner and the skill matcher),
+runs the startup tasks and loads the semantic term matrix once. It then
+forks WEB_WORKERS uvicorn workers that accept connections on one shared
+socket. The workers share the master's memory pages copy-on-write, so the
+model is held once per container instead of once per worker; gc.freeze()
+keeps the garbage collector from writing to (and so copying) those pages.
+
+A worker is recycled after WORKER_MAX_REQUESTS requests (plus a random
+jitter, so workers do not all restart at once) or once its private memory
+exceeds WORKER_MAX_PRIVATE_MB: it stops accepting connections, finishes its
+requests and queued uploads, exits, and the master forks a fresh one.
+
+Upload jobs are saved to the database so /jobs/{id} works from any worker,
+and the workers save their metrics to a shared directory so /metrics adds up
+all of them (see metrics.py); the master folds in the metrics of every worker
+it replaces.
+
+Usage (from the backend directory):
+    python server.py
+"""
+import gc
+import importlib
+import os
+import random
+import shutil
+import signal
+import socket
+import tempfile
+import threading
+import time
+import traceback
+
+
+# Address to listen on: the existing BACKEND_HOST/BACKEND_PORT settings, with
+# WEB_HOST/WEB_PORT still read when they are not set. Local only by default, as
+# with python main.py; Dockerfile.docker sets 0.0.0.0 to accept outside connections
+BACKEND_HOST = os.getenv("BACKEND_HOST") or os.getenv("WEB_HOST", "127.0.0.1")
+BACKEND_PORT = int(os.getenv("BACKEND_PORT") or os.getenv("WEB_PORT", "5000"))
+
+# Number of worker processes serving requests (defaults to one per CPU core)
+WEB_WORKERS = int(os.getenv("WEB_WORKERS", "0")) or (os.cpu_count() or 1)
+
+# Recycle a worker after this many requests, plus up to the jitter (0 disables)
+WORKER_MAX_REQUESTS = int(os.getenv("WORKER_MAX_REQUESTS", "5000"))
+WORKER_MAX_REQUESTS_JITTER = int(os.getenv("WORKER_MAX_REQUESTS_JITTER", "500"))
+
+# Recycle a worker once the memory only it uses (not the pages it still shares
+# with the master) exceeds this many MiB (0 disables), checked every few seconds
+WORKER_MAX_PRIVATE_MB = int(os.getenv("WORKER_MAX_PRIVATE_MB", "1024"))
+MEMORY_CHECK_SECONDS = 5
+
+# A worker that dies sooner than this after starting is restarted after a pause, not in a tight loop
+MIN_WORKER_LIFETIME = 1.0
+
+# Settings read when the app is imported: job progress and metrics are shared between the workers
+# (the metrics in a temporary directory unless METRICS_DIR is set), and the CPU cores are split
+# between the workers' extraction pools instead of each taking all of them
+CREATED_METRICS_DIR = None
+if WEB_WORKERS > 1:
+    os.environ.setdefault("INGEST_SHARED_JOB_STATE", "true")
+    if not os.getenv("METRICS_DIR"):
+        CREATED_METRICS_DIR = os.environ["METRICS_DIR"] = tempfile.mkdtemp(prefix="hireai-metrics-")
+os.environ.setdefault("INGEST_WORKERS", str(max(1, (os.cpu_count() or 1) // WEB_WORKERS)))
+
+
+def private_memory_mb():
+    """
+    Memory used by this process alone (private pages), in MiB; None if unknown (not Linux)
+    """
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            kb = sum(int(line.split()[1]) for line in f if line.startswith(("Private_Clean:", "Private_Dirty:")))
+    except OSError:
+        return None
+    return kb / 1024
+
+
+def preload():
+    """
+    Load everything the workers share, in the master, before forking; returns the app
+    """
+    import database
+    import extraction
+    import main
+    import semantic
+
+    if main.WARMUP_ON_STARTUP:
+        extraction.warm_up()  # spaCy model (a failure is reported by /ready/, as without preforking)
+    if extraction.nlp_loaded():
+        extraction.get_nlp()("John Smith")  # Let spaCy build its lazily created tables now, not in each worker
+    for module in ("fitz", "pdfplumber", "PyPDF2"):
+        try:
+            importlib.import_module(module)
+        except ImportError:
+            pass
+
+    main.index_existing_skills()
+    main.index_existing_qualifications()
+    main.group_stored_resumes()
+    main.migrate_stored_files()
+    main.vectorize_stored_texts()
+    main.STARTUP_TASKS_DONE = True
+
+    db = database.SessionLocal()
+    try:
+        semantic.index.sync(db)  # The term matrix loaded now is shared by every worker
+    finally:
+        db.close()
+
+    database.engine.dispose()  # Workers open their own connections; sockets must not be shared
+    gc.collect()
+    gc.freeze()  # Move everything loaded so far out of the collector's reach
+    return main.app
+
+
+def _watch_memory(server):
+    # Ask the worker's server to exit gracefully once its private memory is over the limit
+    while not server.should_exit:
+        time.sleep(MEMORY_CHECK_SECONDS)
+        used = private_memory_mb()
+        if used is not None and used > WORKER_MAX_PRIVATE_MB:
+            print(f"Worker {os.getpid()} uses {used:.0f} MiB of private memory; recycling it")
+            server.should_exit = True
+
+
+def run_worker(app, sock):
+    import uvicorn
+    import metrics
+
+    random.seed()  # Forked workers would otherwise share the master's random state
+    limit = WORKER_MAX_REQUESTS + random.randint(0, WORKER_MAX_REQUESTS_JITTER) if WORKER_MAX_REQUESTS else None
+    server = uvicorn.Server(uvicorn.Config(app, lifespan="on", limit_max_requests=limit))
+    if WORKER_MAX_PRIVATE_MB:
+        threading.Thread(target=_watch_memory, args=(server,), name="memory-watch", daemon=True).start()
+    if metrics.METRICS_DIR:
+        metrics.start_saving()
+    server.run(sockets=[sock])  # Returns after a signal, the request limit or the memory watch
+    if metrics.METRICS_DIR:
+        metrics.save()  # The counts since the last periodic save
+
+
+def serve():
+    import metrics
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((BACKEND_HOST, BACKEND_PORT))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+
+    start = time.perf_counter()
+    app = preload()
+    print(f"Loaded the app in {time.perf_counter() - start:.1f}s; starting {WEB_WORKERS} workers on {BACKEND_HOST}:{BACKEND_PORT}")
+
+    workers = {}  # pid -> time.monotonic() when it was started
+    stopping = False
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                signal.signal(signal.SIGTERM, signal.SIG_DFL)  # uvicorn installs its own handlers
+                signal.signal(signal.SIGINT, signal.SIG_DFL)
+                run_worker(app, sock)
+            except BaseException:
+                traceback.print_exc()
+                code = 1
+            finally:
+                os._exit(code)
+        workers[pid] = time.monotonic()
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(workers):
+            try:
+                os.kill(pid, signal.SIGTERM)  # Graceful: in-flight requests and queued uploads finish first
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    for _ in range(WEB_WORKERS):
+        spawn()
+
+    while workers:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        started = workers.pop(pid, None)
+        if metrics.METRICS_DIR:
+            metrics.retire(pid)
+        if started is None or stopping:
+            continue
+        if time.monotonic() - started < MIN_WORKER_LIFETIME:
+            time.sleep(MIN_WORKER_LIFETIME)
+        spawn()  # Replace the recycled (or crashed) worker
+    sock.close()
+    if CREATED_METRICS_DIR:
+        shutil.rmtree(CREATED_METRICS_DIR, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    serve()
@@ -0,0 +1,121 @@
+"""
+Inverted skill index over the resume_skills association table.
+
+Every resume's skills are stored as normalized rows, so /rank/ can fetch just
+the candidates that share at least a minimum number of required skills
+instead of loading and re-splitting the skills string of every resume.
+"""
+import os
+
+from sqlalchemy import exists, insert
+from thefuzz import fuzz
+
+from database import Resume, Skill, ResumeSkill
+
+
+# fuzz.ratio similarity at which two skills count as the same (shared with calculate_score)
+SKILL_MATCH_THRESHOLD = 85
+
+# Minimum number of required skills a candidate needs to be scored by /rank/ (0 scores everyone)
+RANK_MIN_SKILL_OVERLAP = int(os.getenv("RANK_MIN_SKILL_OVERLAP", "1"))
+
+# SQLite limits the number of bound parameters in one statement
+QUERY_CHUNK_SIZE = 900
+
+
+def _chunks(items, size=QUERY_CHUNK_SIZE):
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def normalize_skills(skills):
+    """
+    Split a comma-separated skills string into unique, lowercased skill names
+    """
+    names = []
+    for skill in (skills or "").split(","):
+        skill = skill.strip().lower()
+        if skill and skill not in names:
+            names.append(skill)
+    return names
+
+
+def _skill_ids(db, names):
+    # Look up vocabulary ids for the names, adding the ones not seen before
+    ids = {}
+    for chunk in _chunks(names):
+        ids.update(db.query(Skill.name, Skill.id).filter(Skill.name.in_(chunk)))
+    missing = [Skill(name=name) for name in names if name not in ids]
+    if missing:
+        db.add_all(missing)
+        db.flush()  # Assign ids to the new skills
+        ids.update((skill.name, skill.id) for skill in missing)
+    return ids
+
+
+def index_resume_skills(db, resumes):
+    """
+    Add resume_skills rows for resumes that already have an id (i.e. are flushed)
+    """
+    names_by_resume = {resume.id: normalize_skills(resume.skills) for resume in resumes}
+    skill_ids = _skill_ids(db, {name for names in names_by_resume.values() for name in names})
+    rows = [
+        {"resume_id": resume_id, "skill_id": skill_ids[name]}
+        for resume_id, names in names_by_resume.items()
+        for name in names
+    ]
+    if rows:
+        db.execute(insert(ResumeSkill), rows)  # One executemany, without building ORM objects
+
+
+def backfill_skill_index(db, batch_size=500):
+    """
+    Index resumes stored before the resume_skills table existed
+    """
+    while True:
+        resumes = (
+            db.query(Resume)
+            .filter(Resume.skills.isnot(None), Resume.skills != "")
+            .filter(~exists().where(ResumeSkill.resume_id == Resume.id))
+            .limit(batch_size)
+            .all()
+        )
+        if not resumes:
+            return
+        index_resume_skills(db, resumes)
+        db.commit()
+
+
+def matching_candidate_ids(db, required_skills, min_overlap=1):
+    """
+    Return the ids of resumes that match at least `min_overlap` of the required skills.
+    A resume skill matches a required skill under the same fuzzy rule as calculate_score,
+    so only the (small) skill vocabulary is compared, never the resumes themselves.
+    """
+    # Map each vocabulary skill to the required skills it matches
+    matched_by_skill = {}
+    for skill_id, name in db.query(Skill.id, Skill.name):
+        hits = {i for i, required in enumerate(required_skills) if fuzz.ratio(name, required) >= SKILL_MATCH_THRESHOLD}
+        if hits:
+            matched_by_skill[skill_id] = hits
+
+    # Walk the inverted index for those skills only
+    overlap = {}
+    for chunk in _chunks(matched_by_skill):
+        rows = db.query(ResumeSkill.resume_id, ResumeSkill.skill_id).filter(ResumeSkill.skill_id.in_(chunk))
+        for resume_id, skill_id in rows:
+            overlap.setdefault(resume_id, set()).update(matched_by_skill[skill_id])
+
+    return [resume_id for resume_id, hits in overlap.items() if len(hits) >= min_overlap]
+
+
+def load_resumes(db, resume_ids, columns=(Resume,), filters=()):
+    """
+    Fetch the resumes with the given ids (or just the given columns of them),
+    keeping only those that also meet the given SQL conditions
+    """
+    resumes = []
+    for chunk in _chunks(resume_ids):
+        resumes.extend(db.query(*columns).filter(Resume.id.in_(chunk), *filters))
+    return resumes
@@ -0,0 +1,160 @@
+"""
+Single-pass skill matcher.
+
+The skill dictionary (skills.json) is compiled into one regular expression
+whose alternatives are arranged as a trie, so the text is scanned once no
+matter how many skills the dictionary holds. Aliases map to their canonical
+skill ("k8s" -> Kubernetes), and the dictionary file is reloaded when it
+changes on disk.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+
+
+# Location of the skill dictionary and how often (in seconds) to check it for changes
+SKILL_DICTIONARY_PATH = os.getenv(
+    "SKILL_DICTIONARY_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "skills.json")
+)
+SKILL_RELOAD_INTERVAL = float(os.getenv("SKILL_RELOAD_INTERVAL", "5"))
+
+
+def load_dictionary(path):
+    """
+    Read skills.json into a {canonical skill: [aliases]} mapping.
+    Top-level keys are categories; keys starting with "_" are ignored.
+    """
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+
+    skills = {}
+    for category, entries in data.items():
+        if category.startswith("_"):
+            continue
+        if isinstance(entries, list):  # A category may also be a plain list of skills
+            entries = {skill: [] for skill in entries}
+        for skill, aliases in entries.items():
+            skills.setdefault(skill, []).extend(aliases or [])
+    return skills
+
+
+def trie_pattern(phrases):
+    # Build a trie of the phrases and turn it into nested alternations, so the
+    # regex engine follows one branch per character instead of trying every phrase
+    trie = {}
+    for phrase in phrases:
+        node = trie
+        for char in phrase:
+            node = node.setdefault(char, {})
+        node[""] = {}  # End-of-phrase marker
+    return _node_pattern(trie)
+
+
+def _node_pattern(node):
+    branches = [re.escape(char) + _node_pattern(child) for char, child in sorted(node.items()) if char]
+    if not branches:
+        return ""
+    pattern = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    if "" in node:
+        # A phrase can end here; the optional group is greedy, so longer phrases win
+        pattern = ("(?:" + pattern + ")" if len(branches) == 1 else pattern) + "?"
+    return pattern
+
+
+class SkillMatcher:
+    """
+    Finds every dictionary skill in a text with one regex scan
+    """
+
+    def __init__(self, path=SKILL_DICTIONARY_PATH, reload_interval=SKILL_RELOAD_INTERVAL):
+        self.path = path
+        self.reload_interval = reload_interval
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._checked_at = 0.0
+        self._state = None  # (compiled pattern, phrase -> canonical skills, skills, version)
+        self.reload()
+
+    @property
+    def skills(self):
+        self._maybe_reload()
+        return self._state[2]
+
+    @property
+    def version(self):
+        # Short fingerprint of the dictionary contents, used in cache keys. Checked for
+        # changes here too: the server process only asks for the version (extraction
+        # runs in the pool workers), and must not keep an edited dictionary's old one
+        self._maybe_reload()
+        return self._state[3]
+
+    def reload(self):
+        """
+        Recompile the matcher from the dictionary file
+        """
+        with self._lock:
+            mtime = os.path.getmtime(self.path)
+            with open(self.path, "rb") as f:
+                version = hashlib.sha256(f.read()).hexdigest()[:12]
+            self._state = self._compile(load_dictionary(self.path), version)
+            self._mtime = mtime
+            self._checked_at = time.monotonic()
+
+    def refresh(self):
+        """
+        Reload the dictionary now if the file changed, without waiting for the reload interval
+        """
+        self._maybe_reload(force=True)
+
+    def _maybe_reload(self, force=False):
+        # Hot reload: look at the file's mtime at most once per reload interval
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.reload_interval:
+            return
+        self._checked_at = now
+        try:
+            changed = os.path.getmtime(self.path) != self._mtime
+        except OSError:
+            return  # Keep the current dictionary if the file is briefly missing
+        if changed:
+            try:
+                self.reload()
+            except (OSError, ValueError) as e:
+                print(f"Skill dictionary reload failed, keeping the previous one: {e}")
+
+    @staticmethod
+    def _compile(dictionary, version):
+        # Every skill and alias is a lowercase phrase pointing to its canonical skill
+        canonical = {}
+        for skill, aliases in dictionary.items():
+            for phrase in [skill] + aliases:
+                canonical.setdefault(phrase.lower(), set()).add(skill)
+
+        # The scan reports the longest phrase at each position, so a phrase also
+        # counts for the shorter phrases it starts with ("react native" -> React)
+        matches = {}
+        for phrase, skills in canonical.items():
+            implied = set(skills)
+            for end in range(1, len(phrase)):
+                if not (phrase[end].isalnum() or phrase[end] == "_") and phrase[:end] in canonical:
+                    implied |= canonical[phrase[:end]]
+            matches[phrase] = frozenset(implied)
+
+        # A zero-width lookahead lets matches overlap, e.g. both "Google Cloud"
+        # and "Cloud Security" in "Google Cloud Security"
+        pattern = re.compile(r"(?<!\w)(?=(" + trie_pattern(canonical) + r")(?!\w))", re.IGNORECASE)
+        return pattern, matches, sorted(dictionary), version
+
+    def find(self, text):
+        """
+        Return the sorted canonical skills mentioned in the text
+        """
+        self._maybe_reload()
+        pattern, matches, _, _ = self._state
+        found = set()
+        for match in pattern.finditer(text):
+            found |= matches.get(match.group(1).lower(), frozenset())
+        return sorted(found)
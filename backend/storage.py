@@ -0,0 +1,137 @@
+"""
+Content-addressed resume storage.
+
+Every file is stored once, under the SHA-256 of its content, in sharded
+directories (uploaded_resumes/ab/cd/abcd....pdf) so no directory grows too
+large and same-named uploads can never collide. Files are served with a
+strong ETag (the content hash), Last-Modified, conditional GET and HTTP
+Range support, so clients only download bytes they do not already have.
+"""
+import hashlib
+import os
+import shutil
+import uuid
+from email.utils import formatdate, parsedate_to_datetime
+
+from fastapi import Response
+from fastapi.responses import FileResponse
+
+from database import Resume
+
+
+# Root directory of the stored resumes: the existing UPLOAD_DIR setting, with
+# RESUME_STORAGE_DIR still read when it is not set
+STORAGE_DIR = os.getenv("UPLOAD_DIR") or os.getenv("RESUME_STORAGE_DIR", "uploaded_resumes")
+
+# Size of the chunks read while hashing files already on disk
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def path_for(content_hash):
+    """
+    Storage path of the file with this content hash
+    """
+    return os.path.join(STORAGE_DIR, content_hash[:2], content_hash[2:4], f"{content_hash}.pdf")
+
+
+def temp_path():
+    # Temporary files live in the storage root, on the same filesystem, so the final rename is atomic
+    os.makedirs(STORAGE_DIR, exist_ok=True)
+    return os.path.join(STORAGE_DIR, f".upload-{uuid.uuid4().hex}.part")
+
+
+def is_stored(file_path, content_hash):
+    return bool(content_hash) and os.path.abspath(file_path) == os.path.abspath(path_for(content_hash))
+
+
+def hash_file(file_path):
+    hasher = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        while chunk := f.read(HASH_CHUNK_SIZE):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def remove_all():
+    """
+    Delete every stored file (and any unfinished upload)
+    """
+    if not os.path.isdir(STORAGE_DIR):
+        return
+    for entry in os.scandir(STORAGE_DIR):
+        if entry.is_dir(follow_symlinks=False):
+            shutil.rmtree(entry.path)
+        else:
+            os.remove(entry.path)
+
+
+def migrate_legacy_files(db, batch_size=100):
+    """
+    Move files stored flat under their upload name (before content-addressed storage)
+    into the sharded layout and point their resumes at the new paths
+    """
+    resumes = db.query(Resume).filter(Resume.file_path.isnot(None)).all()
+    moved = {}  # old path -> (new path, content hash), for resumes that shared a file
+    for resume in resumes:
+        if resume.file_path in moved:
+            resume.file_path, resume.content_hash = moved[resume.file_path]
+            continue
+        # Paths written on Windows use backslashes
+        legacy_path = os.path.normpath(resume.file_path.replace("\\", "/"))
+        if is_stored(legacy_path, resume.content_hash) or not os.path.isfile(legacy_path):
+            continue
+        content_hash = resume.content_hash or hash_file(legacy_path)
+        target = path_for(content_hash)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        if os.path.exists(target):
+            os.remove(legacy_path)  # The same content is already stored
+        else:
+            os.replace(legacy_path, target)
+        moved[resume.file_path] = (target, content_hash)
+        resume.file_path, resume.content_hash = target, content_hash
+        if len(moved) % batch_size == 0:
+            db.commit()
+    db.commit()
+    return len(moved)
+
+
+def _etag(file_path, content_hash, stat_result):
+    if is_stored(file_path, content_hash):
+        return f'"{content_hash}"'  # Strong validator: the name is the content
+    return f'W/"{int(stat_result.st_mtime)}-{stat_result.st_size}"'
+
+
+def _not_modified(request, etag, stat_result):
+    # If-None-Match takes precedence over If-Modified-Since (RFC 9110)
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        candidates = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in candidates or any(tag.removeprefix("W/") == etag.removeprefix("W/") for tag in candidates)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return int(stat_result.st_mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def file_response(request, file_path, content_hash, filename):
+    """
+    Serve a stored file: 304 when the client's copy is current, otherwise the
+    file (or the requested byte ranges, via FileResponse) with caching headers
+    """
+    stat_result = os.stat(file_path)
+    etag = _etag(file_path, content_hash, stat_result)
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(stat_result.st_mtime, usegmt=True),
+        # Clients may keep the file but must revalidate, since resume ids restart after /reset/
+        "Cache-Control": "private, no-cache",
+        "Accept-Ranges": "bytes",
+    }
+    if _not_modified(request, etag, stat_result):
+        return Response(status_code=304, headers=headers)
+    return FileResponse(
+        file_path, media_type="application/pdf", filename=filename, headers=headers, stat_result=stat_result
+    )
@@ -0,0 +1,150 @@
+"""
+Streaming upload writer.
+
+Uploaded files are copied to disk chunk by chunk with aiofiles, so the event
+loop is never blocked and memory stays constant however large the file is.
+The SHA-256 and an approximate page count are computed on the same chunks,
+size limits are enforced as the bytes arrive, and the file only appears
+at its content-addressed storage path (via an atomic rename) once it is complete.
+"""
+import hashlib
+import os
+import re
+
+import aiofiles
+import aiofiles.os
+
+import storage
+
+
+# Size of the chunks read from an upload while it is saved and hashed
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Largest accepted file, and largest total size of the files in one request (bytes)
+MAX_UPLOAD_FILE_BYTES = int(os.getenv("MAX_UPLOAD_FILE_BYTES", str(20 * 1024 * 1024)))
+MAX_UPLOAD_REQUEST_BYTES = int(os.getenv("MAX_UPLOAD_REQUEST_BYTES", str(500 * 1024 * 1024)))
+
+# Page objects in a PDF ("/Type /Pages" is the page tree, not a page)
+PAGE_OBJECT_PATTERN = re.compile(rb"/Type\s*/Page(?![a-zA-Z])")
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+class PageCounter:
+    """
+    Counts PDF page objects in a byte stream fed chunk by chunk. PDFs that keep
+    their page objects in compressed object streams count as 0 (unknown).
+    """
+
+    # Bytes kept from the end of the previous chunk, so a match split across chunks is still found
+    OVERLAP = 32
+
+    def __init__(self):
+        self.count = 0
+        self._tail = b""
+
+    def feed(self, chunk):
+        data = self._tail + chunk
+        # Only count matches that end past the overlap, so none is counted twice
+        self.count += sum(1 for m in PAGE_OBJECT_PATTERN.finditer(data) if m.end() > len(self._tail))
+        self._tail = data[-self.OVERLAP:]
+
+
+async def save_upload(file, max_bytes=MAX_UPLOAD_FILE_BYTES):
+    """
+    Stream an UploadFile into storage. Returns a dict with the original filename,
+    the stored path, content hash, size, page count (None if unknown) and whether
+    a new file was created. Raises UploadTooLarge once more than max_bytes arrive.
+    """
+    if file.size is not None and file.size > max_bytes:  # Known up front for multipart uploads
+        raise UploadTooLarge(f"{file.filename} exceeds the upload size limit ({max_bytes} bytes available)")
+    hasher = hashlib.sha256()  # Hash the content while it is copied, to spot re-uploads
+    pages = PageCounter()
+    size = 0
+    temp_path = storage.temp_path()
+    try:
+        async with aiofiles.open(temp_path, "wb") as buffer:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge(f"{file.filename} exceeds the upload size limit ({max_bytes} bytes available)")
+                hasher.update(chunk)
+                pages.feed(chunk)
+                await buffer.write(chunk)
+        content_hash = hasher.hexdigest()
+        # Stored under its content hash: same-named uploads never collide, identical content maps to one file
+        file_path = storage.path_for(content_hash)
+        await aiofiles.os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        created = not await aiofiles.os.path.exists(file_path)
+        await aiofiles.os.replace(temp_path, file_path)  # Atomic: readers never see a partial file
+    except BaseException:
+        if await aiofiles.os.path.exists(temp_path):
+            await aiofiles.os.remove(temp_path)
+        raise
+    return {
+        "filename": file.filename,
+        "path": file_path,
+        "content_hash": content_hash,
+        "size": size,
+        "pages": pages.count or None,
+        "created": created,
+    }
+
+
+def store_stream(fileobj, filename, max_bytes=MAX_UPLOAD_FILE_BYTES):
+    """
+    Blocking counterpart of save_upload for file objects read in a worker
+    thread (e.g. archive members); returns the same dict
+    """
+    hasher = hashlib.sha256()
+    pages = PageCounter()
+    size = 0
+    temp_path = storage.temp_path()
+    try:
+        with open(temp_path, "wb") as buffer:
+            while chunk := fileobj.read(UPLOAD_CHUNK_SIZE):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge(f"{filename} exceeds the upload size limit ({max_bytes} bytes available)")
+                hasher.update(chunk)
+                pages.feed(chunk)
+                buffer.write(chunk)
+        content_hash = hasher.hexdigest()
+        file_path = storage.path_for(content_hash)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        created = not os.path.exists(file_path)
+        os.replace(temp_path, file_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return {
+        "filename": filename,
+        "path": file_path,
+        "content_hash": content_hash,
+        "size": size,
+        "pages": pages.count or None,
+        "created": created,
+    }
+
+
+async def spool_upload(file, max_bytes):
+    """
+    Stream an UploadFile to a temporary file in storage, without hashing it; returns the temp path
+    """
+    temp_path = storage.temp_path()
+    size = 0
+    try:
+        async with aiofiles.open(temp_path, "wb") as buffer:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge(f"{file.filename} exceeds the upload size limit ({max_bytes} bytes available)")
+                await buffer.write(chunk)
+    except BaseException:
+        if await aiofiles.os.path.exists(temp_path):
+            await aiofiles.os.remove(temp_path)
+        raise
+    return temp_path
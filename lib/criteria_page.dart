@@ -30,22 +30,27 @@ class _CriteriaPageState extends State<CriteriaPage> {
 
   Future<void> _rankResumes() async {
     try {
+      final criteria = {
+        'qualification': _qualificationController.text.trim(),
+        'skills': _skillController.text.trim(),
+        'experience': int.parse(_experienceController.text),
+        'resumes_selected': int.parse(_resumesSelectedController.text),
+      };
+      // Fetch only the first page; the result page loads more while scrolling
       final response = await http.post(
-        Uri.parse('http://192.168.1.75:5000/rank/'),
+        Uri.parse('http://192.168.1.75:5000/rank/page/'),
         headers: {'Content-Type': 'application/json'},
-        body: json.encode({
-          'qualification': _qualificationController.text.trim(),
-          'skills': _skillController.text.trim(),
-          'experience': int.parse(_experienceController.text),
-          'resumes_selected': int.parse(_resumesSelectedController.text),
-        }),
+        body: json.encode({...criteria, 'limit': 50}),
       );
 
       if (response.statusCode == 200) {
         Navigator.pushNamed(
           context,
           '/result',
-          arguments: json.decode(response.body),
+          arguments: {
+            'criteria': criteria,
+            'page': json.decode(response.body),
+          },
         );
       } else {
         String errorMessage = 'Failed to rank resumes';
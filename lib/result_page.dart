@@ -1,19 +1,88 @@
 import 'package:flutter/material.dart';
 import 'package:flutter_pdfview/flutter_pdfview.dart';
+import 'dart:convert';
 import 'dart:io';
 import 'package:path_provider/path_provider.dart';
 import 'package:http/http.dart' as http;
 import 'package:permission_handler/permission_handler.dart'; // Import the permission_handler package
 import 'theme_constants.dart'; // Import the theme constants
 
-class ResultPage extends StatelessWidget {
+class ResultPage extends StatefulWidget {
   const ResultPage({Key? key}) : super(key: key);
 
   @override
-  Widget build(BuildContext context) {
-    final rankedResults =
-        ModalRoute.of(context)?.settings.arguments as List<dynamic>? ?? [];
+  _ResultPageState createState() => _ResultPageState();
+}
+
+class _ResultPageState extends State<ResultPage> {
+  final ScrollController _scrollController = ScrollController();
+  final List<dynamic> rankedResults = [];
+  Map<String, dynamic>? _criteria;
+  String? _nextCursor;
+  bool _initialized = false;
+  bool _isLoadingMore = false;
+
+  @override
+  void initState() {
+    super.initState();
+    _scrollController.addListener(_onScroll);
+  }
+
+  @override
+  void didChangeDependencies() {
+    super.didChangeDependencies();
+    if (_initialized) return;
+    _initialized = true;
 
+    final arguments = ModalRoute.of(context)?.settings.arguments;
+    if (arguments is Map) {
+      // First page from /rank/page/, plus the criteria needed to fetch the next ones
+      _criteria = Map<String, dynamic>.from(arguments['criteria']);
+      rankedResults.addAll(arguments['page']['results']);
+      _nextCursor = arguments['page']['next_cursor'];
+    } else if (arguments is List) {
+      rankedResults.addAll(arguments);
+    }
+  }
+
+  @override
+  void dispose() {
+    _scrollController.dispose();
+    super.dispose();
+  }
+
+  /// Loads the next page when the list is scrolled close to its end
+  void _onScroll() {
+    if (_scrollController.position.extentAfter < 500) {
+      _loadMore();
+    }
+  }
+
+  Future<void> _loadMore() async {
+    if (_isLoadingMore || _nextCursor == null || _criteria == null) return;
+    setState(() => _isLoadingMore = true);
+    try {
+      final response = await http.post(
+        Uri.parse('http://192.168.1.75:5000/rank/page/'),
+        headers: {'Content-Type': 'application/json'},
+        body: json.encode({..._criteria!, 'limit': 50, 'cursor': _nextCursor}),
+      );
+      if (response.statusCode == 200) {
+        final page = json.decode(response.body);
+        setState(() {
+          rankedResults.addAll(page['results']);
+          _nextCursor = page['next_cursor'];
+        });
+      }
+    } catch (e) {
+      debugPrint("Error loading more results: $e");
+    } finally {
+      if (mounted) setState(() => _isLoadingMore = false);
+    }
+  }
+
+  @override
+  Widget build(BuildContext context) {
     return Container(
       decoration: const BoxDecoration(
         gradient: AppTheme.backgroundGradient, // Apply theme gradient
@@ -40,11 +109,23 @@ class ResultPage extends StatelessWidget {
         ),
         body: rankedResults.isNotEmpty
             ? ListView.separated(
+                controller: _scrollController,
                 padding: const EdgeInsets.all(16.0),
-                itemCount: rankedResults.length,
+                itemCount: rankedResults.length + (_nextCursor != null ? 1 : 0),
                 separatorBuilder: (context, index) =>
                     const SizedBox(height: 10),
                 itemBuilder: (context, index) {
+                  if (index == rankedResults.length) {
+                    // Footer shown while more pages are available
+                    return const Center(
+                      child: Padding(
+                        padding: EdgeInsets.all(16.0),
+                        child: CircularProgressIndicator(
+                          color: AppTheme.accentPrimary,
+                        ),
+                      ),
+                    );
+                  }
                   final candidate = rankedResults[index];
 
                   return Container(
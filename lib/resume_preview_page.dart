@@ -16,36 +16,89 @@ class ResumePreviewPage extends StatefulWidget {
 class _ResumePreviewPageState extends State<ResumePreviewPage> {
   String? localFilePath; // Stores the path to the downloaded PDF
   bool isLoading = false; // Tracks whether the resume is being fetched
+  double? progress; // Download progress (0-1) when the size is known
 
-  // Function to fetch and save the resume from the backend
+  // Function to fetch and save the resume from the backend.
+  // The PDF is kept in the temporary directory together with its ETag:
+  // - a cached copy is revalidated (304 Not Modified = reuse it, no bytes sent)
+  // - an interrupted download is resumed with a Range request
+  // - the body is streamed to disk chunk by chunk with progress
   Future<void> _fetchAndSaveResume() async {
+    final client = http.Client();
     try {
       setState(() {
         isLoading = true; // Show loading indicator
+        progress = null;
       });
 
+      final dir = await getTemporaryDirectory();
+      final file = File("${dir.path}/resume_${widget.resumeId}.pdf");
+      final partFile = File("${file.path}.part");
+      final etagFile = File("${file.path}.etag");
+      final etag = await etagFile.exists() ? await etagFile.readAsString() : null;
+
       // Replace with your FastAPI endpoint
       final url = "http://192.168.1.75:5000/resume/${widget.resumeId}";
-      final response = await http.get(Uri.parse(url));
+      final request = http.Request("GET", Uri.parse(url));
+      int resumeFrom = 0;
+      if (etag != null && await file.exists()) {
+        request.headers["If-None-Match"] = etag; // Only download if the file changed
+      } else if (etag != null && await partFile.exists()) {
+        resumeFrom = await partFile.length(); // Continue an interrupted download
+        request.headers["Range"] = "bytes=$resumeFrom-";
+        request.headers["If-Range"] = etag; // ...unless the file changed meanwhile
+      }
 
-      if (response.statusCode == 200) {
-        // Save the PDF to a temporary location
-        final dir = await getTemporaryDirectory();
-        final file = File("${dir.path}/resume_${widget.resumeId}.pdf");
-        await file.writeAsBytes(response.bodyBytes);
+      final response = await client.send(request);
 
+      if (response.statusCode == 304) {
+        // The cached copy is still current
         setState(() {
-          localFilePath = file.path; // Set file path
+          localFilePath = file.path;
         });
-      } else {
+        return;
+      }
+      if (response.statusCode != 200 && response.statusCode != 206) {
         throw Exception("Failed to fetch resume");
       }
+
+      // 206 appends the missing bytes; 200 means a full (new) download
+      final append = response.statusCode == 206;
+      int received = append ? resumeFrom : 0;
+      final total = response.contentLength == null ? null : response.contentLength! + received;
+      final newEtag = response.headers["etag"];
+      if (newEtag != null) {
+        await etagFile.writeAsString(newEtag);
+      } else if (await etagFile.exists()) {
+        await etagFile.delete();
+      }
+
+      final sink = partFile.openWrite(mode: append ? FileMode.append : FileMode.write);
+      try {
+        await for (final chunk in response.stream) {
+          sink.add(chunk);
+          received += chunk.length;
+          if (total != null && total > 0) {
+            setState(() {
+              progress = received / total;
+            });
+          }
+        }
+      } finally {
+        await sink.close();
+      }
+      await partFile.rename(file.path); // Only complete downloads become the cached copy
+
+      setState(() {
+        localFilePath = file.path; // Set file path
+      });
     } catch (e) {
       debugPrint("Error fetching resume: $e");
       setState(() {
         localFilePath = null; // Reset file path on error
       });
     } finally {
+      client.close();
       setState(() {
         isLoading = false; // Hide loading indicator
       });
@@ -71,7 +124,7 @@ class _ResumePreviewPageState extends State<ResumePreviewPage> {
         mainAxisAlignment: MainAxisAlignment.center,
         children: [
           if (isLoading)
-            const Center(child: CircularProgressIndicator())
+            Center(child: CircularProgressIndicator(value: progress))
           else if (localFilePath != null)
             Expanded(
               child:
@@ -1,3 +1,4 @@
+import 'dart:convert';
 import 'package:flutter/material.dart';
 import 'package:file_picker/file_picker.dart';
 import 'package:http/http.dart' as http;
@@ -87,13 +88,41 @@ class _UploadPageState extends State<UploadPage> {
       logger.i("Response Status Code: ${response.statusCode}");
       logger.i("Response Body: ${response.body}");
 
-      return response.statusCode == 200;
+      if (response.statusCode != 200 && response.statusCode != 202) {
+        return false;
+      }
+      // Resumes are parsed in the background; wait for the job to finish
+      final jobId = json.decode(response.body)['job_id'];
+      return await _waitForJob(jobId);
     } catch (e) {
       logger.e("Error uploading files: $e");
       return false;
     }
   }
 
+  /// Polls the ingestion job until every file has been processed
+  Future<bool> _waitForJob(String jobId) async {
+    while (true) {
+      final response = await http
+          .get(Uri.parse('http://192.168.1.75:5000/jobs/$jobId'));
+      if (response.statusCode != 200) {
+        logger.e("Failed to fetch job status: ${response.body}");
+        return false;
+      }
+
+      final job = json.decode(response.body);
+      logger.i("Processed ${job['processed']} of ${job['total']} resumes");
+      if (job['status'] == 'completed') {
+        return true;
+      }
+      if (job['status'] == 'completed_with_errors') {
+        logger.w("Some resumes failed to process: ${job['files']}");
+        return job['failed'] < job['total'];
+      }
+      await Future.delayed(const Duration(seconds: 1));
+    }
+  }
+
   Future<void> _submitUpload() async {
     if (_selectedFiles.isNotEmpty) {
       setState(() => _isLoading = true);